@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Deferred AdSense
+Run from the ROOT of your site directory: python3 ads.py defer
+
+The AdSense script used to sit in every <head>, where its fetch and
+execution compete with first paint. This pass:
+
+  · removes the adsbygoogle.js <script> from each page's <head>
+  · adds <meta name="google-adsense-account"> (the account id js/main.js
+    loads the script with, and AdSense's own site-ownership tag)
+  · tags each .ad-slot with the display ad unit, if one is configured,
+    and drops any inline style: css/styles.css reserves a tagged slot's
+    height (so a filled ad can't shift the layout) and collapses untagged
+    slots, which nothing would ever fill
+
+js/main.js then loads the script on the first scroll/tap/key, when the
+browser goes idle after onload, or when a slot nears the viewport —
+whichever comes first — and fills slots only as they approach it.
+
+Edits are staged and validated like the fix scripts, and the run prints
+initial-load page weight before → after (see pageweight.py).
+
+  python3 ads.py defer [--unit 1234567890] [--dry-run]
+"""
+
+import os
+import re
+import sys
+import argparse
+
+import pageweight
+import pagecache
+import profiling
+import snapshots
+import staging
+from site_config import ADSENSE_CLIENT
+
+AD_UNIT = ""               # data-ad-slot of a responsive display unit; "" = Auto ads only
+
+ADSENSE_META = f'<meta content="{ADSENSE_CLIENT}" name="google-adsense-account"/>'
+SCRIPT_RE = re.compile(r'[ \t]*<script\b[^>]*adsbygoogle\.js[^>]*>\s*</script>[ \t]*(\r?\n)?', re.I)
+SLOT_RE = re.compile(r'<div class="ad-slot"( data-ad-unit="[^"]*")?( style="[^"]*")?>')
+HEAD_CLOSE = "</head>"
+
+
+def slot_tag(unit=AD_UNIT):
+    unit_attr = f' data-ad-unit="{unit}"' if unit else ""
+    return f'<div class="ad-slot"{unit_attr}>'
+
+
+def defer_ads(html, unit=AD_UNIT):
+    """Page text with AdSense deferred; unchanged if the page has no head."""
+    if HEAD_CLOSE not in html:
+        return html
+    head_end = html.index(HEAD_CLOSE)
+    head = SCRIPT_RE.sub("", html[:head_end])
+    if ADSENSE_META not in head:
+        newline = "\r\n" if "\r\n" in html else "\n"
+        head = head.rstrip(" \t") + ("" if head.endswith("\n") else newline) + ADSENSE_META + newline
+    return head + SLOT_RE.sub(slot_tag(unit), html[head_end:])
+
+
+def check_ads_deferred(tx):
+    """No written page may still load adsbygoogle.js from its <head>."""
+    problems = []
+    for path in tx.written:
+        if not path.endswith(".html"):
+            continue
+        html = tx.read(path, errors="replace")
+        head = html.split(HEAD_CLOSE, 1)[0]
+        if SCRIPT_RE.search(head):
+            problems.append(f"{path}: adsbygoogle.js still in <head>")
+        if ADSENSE_META not in head:
+            problems.append(f"{path}: missing google-adsense-account meta")
+    return problems
+
+
+def defer_site(tx, unit=AD_UNIT):
+    """Stage deferred pages; returns (pages seen, pages changed)."""
+    pages = pagecache.site_pages(tx.tree)
+    changed = 0
+    for path in profiling.each(pages):
+        with open(tx.path(path), encoding="utf-8", errors="replace", newline="") as f:
+            original = f.read()
+        updated = defer_ads(original, unit)
+        if updated != original:
+            tx.write(path, updated, newline="")
+            changed += 1
+    return pages, changed
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Defer AdSense loading to js/main.js.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("defer")
+    p.add_argument("--unit", default=AD_UNIT, help="AdSense display unit id (data-ad-slot) for .ad-slot")
+    p.add_argument("--dry-run", action="store_true", help="stage, validate and measure, but don't swap in")
+    profiling.add_profile_args(p)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    profiling.start("ads", args)
+    try:
+        return run(args)
+    finally:
+        profiling.finish()
+
+
+def run(args):
+    with profiling.span("measure_before"):
+        before = pageweight.measure()
+    snap_run = None if args.dry_run else snapshots.begin_run("ads")
+    tx = staging.Transaction("ads", run=snap_run).begin()
+    try:
+        with profiling.span("defer_site"):
+            pages, changed = defer_site(tx, args.unit)
+        with profiling.span("measure_after"):
+            after = pageweight.measure(tx.tree)
+        if args.dry_run:
+            problems = tx.validate([check_ads_deferred])
+            tx.abort()
+            print(f"🔍 Dry run: {changed} of {len(pages)} pages would change")
+            for problem in problems:
+                print(f"   · {problem}")
+            pageweight.print_compare(before, after)
+            return 1 if problems else 0
+        written, _ = tx.commit([check_ads_deferred])
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    print(f"✅ AdSense deferred: {len(written)} of {len(pages)} pages updated")
+    if written:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    pageweight.print_compare(before, after)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Record/Replay Harness for the Messages API
+Used by generate_articles.py and rewrite_site.py.
+
+  --record FILE    call the real API and append every request/response
+                   pair to FILE (JSON lines)
+  --replay FILE    answer every call from FILE — no network, no cost
+  --base-url URL   point the SDK at another endpoint, e.g. the local
+                   stand-in from fake_api.py
+
+Replay matches on a hash of the request (model, system, messages,
+max_tokens), so the same prompt always gets the same recorded answer.
+When a prompt was recorded more than once, answers are handed out in
+recording order and the last one repeats.
+
+Every client is wrapped in telemetry.InstrumentedClient when a Telemetry
+session is passed in; recording sits outside it, so cassettes hold the
+final (post-retry) response only.
+
+Inspect a cassette:
+  python3 api_harness.py show FILE
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from types import SimpleNamespace
+from datetime import datetime
+
+# Placeholder key for endpoints that don't check it (fake_api.py, replay)
+OFFLINE_API_KEY = "sk-ant-offline"
+
+
+def request_key(kwargs):
+    """Stable hash of the parts of a request that determine the answer."""
+    basis = {k: kwargs.get(k) for k in ("model", "system", "messages", "max_tokens")}
+    blob = json.dumps(basis, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def to_namespace(value):
+    """Recorded JSON → attribute access like the SDK's Message objects."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def _dump(message):
+    if hasattr(message, "model_dump"):
+        return message.model_dump(mode="json")
+    return json.loads(json.dumps(message, default=lambda o: o.__dict__))
+
+
+# ─────────────────────────────────────────
+# RECORD
+# ─────────────────────────────────────────
+class _RecordingMessages:
+    def __init__(self, inner, path):
+        self._inner = inner
+        self._path = path
+
+    def create(self, **kwargs):
+        message = self._inner.create(**kwargs)
+        entry = {
+            "key": request_key(kwargs),
+            "recorded_at": datetime.now().isoformat(),
+            "request": kwargs,
+            "response": _dump(message),
+        }
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return message
+
+    def __getattr__(self, name):
+        # count_tokens, stream, ... pass straight through
+        return getattr(self._inner, name)
+
+
+class RecordingClient:
+    def __init__(self, client, path):
+        self._client = client
+        self.messages = _RecordingMessages(client.messages, path)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ─────────────────────────────────────────
+# REPLAY
+# ─────────────────────────────────────────
+def load_cassette(path):
+    """key → [response dicts] in recording order."""
+    responses = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                responses.setdefault(entry["key"], []).append(entry["response"])
+    return responses
+
+
+class _ReplayMessages:
+    def __init__(self, responses):
+        self._responses = responses
+        self._served = {}
+
+    def create(self, **kwargs):
+        key = request_key(kwargs)
+        answers = self._responses.get(key)
+        if not answers:
+            raise KeyError(f"no recorded response for this request (key {key[:12]})")
+        i = self._served.get(key, 0)
+        self._served[key] = i + 1
+        return to_namespace(answers[min(i, len(answers) - 1)])
+
+    def count_tokens(self, **kwargs):
+        raise RuntimeError("count_tokens is not available in replay mode — use --plan without --exact")
+
+
+class ReplayClient:
+    def __init__(self, path):
+        self.messages = _ReplayMessages(load_cassette(path))
+
+
+# ─────────────────────────────────────────
+# CLIENT FACTORY
+# ─────────────────────────────────────────
+def add_client_args(parser):
+    group = parser.add_argument_group("API harness")
+    group.add_argument("--record", metavar="FILE",
+                       help="append every request/response pair to FILE (JSON lines)")
+    group.add_argument("--replay", metavar="FILE",
+                       help="serve responses from a recorded FILE instead of the API")
+    group.add_argument("--base-url", metavar="URL",
+                       help="send requests to URL, e.g. a fake_api.py stand-in")
+
+
+def offline(args):
+    """True when the run can't reach (or bill) the real API."""
+    return bool(args.replay or args.base_url)
+
+
+def make_client(args, api_key, telemetry=None, cost_fn=None):
+    """
+    SDK, replay or fake-endpoint client. With `telemetry`, calls are
+    instrumented and retried by telemetry.InstrumentedClient (the SDK's
+    own retries are switched off so every retry is counted).
+    """
+    if args.replay:
+        client = ReplayClient(args.replay)
+    else:
+        import anthropic
+        kwargs = {"api_key": api_key or OFFLINE_API_KEY}
+        if args.base_url:
+            kwargs["base_url"] = args.base_url
+        if telemetry is not None:
+            kwargs["max_retries"] = 0
+        client = anthropic.Anthropic(**kwargs)
+
+    if telemetry is not None:
+        from telemetry import InstrumentedClient
+        client = InstrumentedClient(client, telemetry, cost_fn or (lambda i, o: 0.0))
+    if args.record and not args.replay:
+        client = RecordingClient(client, args.record)
+    return client
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a record/replay cassette.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("show"); p.add_argument("file")
+    args = parser.parse_args(argv)
+
+    total_in = total_out = n = 0
+    with open(args.file, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            usage = entry["response"].get("usage", {})
+            total_in += usage.get("input_tokens", 0)
+            total_out += usage.get("output_tokens", 0)
+            n += 1
+            print(f"  {entry['key'][:12]}  {entry['request'].get('model', '?'):<28} "
+                  f"in {usage.get('input_tokens', 0):>6}  out {usage.get('output_tokens', 0):>6}  "
+                  f"{entry['response'].get('stop_reason', '')}")
+    print(f"\n  {n} recorded calls — {total_in:,} input / {total_out:,} output tokens")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Pipeline Benchmarks
+Measures how fix_final.py, fix_site.py, the sitemap builders and staging
+validation scale with site size.
+
+Synthetic sites are built from the real myhouseisburping/pages/*.html:
+the real pages come first under their own names (so every path the fix
+scripts expect exists), then templates are cycled with a new slug,
+title, canonical and og:url. Link patterns, head tags and page weight
+therefore match production.
+
+The synthetic site's page cache (pagecache.py) is warmed first, as it
+would be on any re-run; --cold measures a first run instead.
+
+Each stage is timed (median of --repeat passes) and its peak Python heap
+measured with tracemalloc in one extra pass, so tracing overhead never
+leaks into the timings. Every pass starts from a fresh hardlinked copy of
+the generated site (the scripts replace files, never write through them).
+
+  python3 bench.py run                          # 100 and 1k pages
+  python3 bench.py run --sizes 100,1k,10k,50k --repeat 1
+  python3 bench.py run --save-baseline          # record _bench/baseline.json
+  python3 bench.py run --threshold 0.25         # exit 1 if a stage is >25% worse
+  python3 bench.py synth 1k /tmp/site           # just generate a site
+  python3 bench.py startup                      # `burp <cmd> --help` wall time
+
+Baselines are machine-specific, so they live in _bench/ (not committed).
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import staging
+import snapshots
+import pagecache
+import fix_final
+import fix_site
+from site_config import load_json, save_json
+
+BENCH_DIR = "_bench"
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+SOURCE_SITE = "myhouseisburping"
+DEFAULT_SIZES = "100,1k"
+DEFAULT_THRESHOLD = 0.25
+# Ignore regressions smaller than this — timer and allocator noise
+MIN_SECONDS_DELTA = 0.010
+MIN_PEAK_KB_DELTA = 256
+
+# Startup: `burp <command> --help` wall time, and modules no offline
+# command may import (cli.py loads a tool only when it runs)
+STARTUP_COMMANDS = ("fix", "sitemap", "verify", "publish", "traffic",
+                    "redirects", "radon-states", "generate", "rewrite")
+STARTUP_BUDGET_MS = 150
+MIN_STARTUP_MS_DELTA = 15
+HEAVY_IMPORTS = ("anthropic", "http.server", "sqlite3")
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    return int(float(text[:-1]) * 1000) if text.endswith("k") else int(text)
+
+
+def size_label(n):
+    return f"{n // 1000}k" if n >= 1000 and n % 1000 == 0 else str(n)
+
+
+# ─────────────────────────────────────────
+# SYNTHETIC SITE
+# ─────────────────────────────────────────
+def _retarget(html, slug, n):
+    """Give a template page its own identity: slug in canonical/og:url, numbered title."""
+    url = f"https://www.myhouseisburping.com/pages/{slug}.html"
+    html = re.sub(r'(<link rel="canonical" href=")[^"]*(")', rf"\g<1>{url}\g<2>", html, count=1)
+    html = re.sub(r'(<link href=")[^"]*(" rel="canonical")', rf"\g<1>{url}\g<2>", html, count=1)
+    html = re.sub(r'(<meta property="og:url" content=")[^"]*(")', rf"\g<1>{url}\g<2>", html, count=1)
+    html = re.sub(r'(<meta content=")[^"]*(" property="og:url")', rf"\g<1>{url}\g<2>", html, count=1)
+    return re.sub(r"<title>([^<]*)</title>", rf"<title>\g<1> (Part {n})</title>", html, count=1)
+
+
+def synth_site(dest, pages, source=SOURCE_SITE):
+    """Write a `pages`-page site modeled on `source` into `dest`. Returns dest."""
+    if os.path.exists(dest):
+        shutil.rmtree(dest)
+    os.makedirs(os.path.join(dest, "pages"))
+
+    # Everything except pages/ is copied as-is (index.html, radon/, css, js, ...)
+    for name in os.listdir(source):
+        src = os.path.join(source, name)
+        if name == "pages" or name.startswith((".", "_")):
+            continue
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(dest, name))
+        else:
+            shutil.copy2(src, os.path.join(dest, name))
+
+    real = sorted(f for f in os.listdir(os.path.join(source, "pages")) if f.endswith(".html"))
+    templates = []
+    for name in real:
+        with open(os.path.join(source, "pages", name), encoding="utf-8", errors="replace") as f:
+            templates.append((name[:-5], f.read()))
+
+    for i in range(pages):
+        slug, html = templates[i % len(templates)]
+        if i >= len(templates):
+            slug = f"{slug}-{i // len(templates)}"
+            html = _retarget(html, slug, i // len(templates))
+        with open(os.path.join(dest, "pages", f"{slug}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+    return dest
+
+
+def link_tree(src, dest):
+    """Hardlinked copy of `src` — a fresh, writable site in O(files) metadata ops."""
+    if os.path.exists(dest):
+        shutil.rmtree(dest)
+    shutil.copytree(src, dest, copy_function=os.link)
+
+
+# ─────────────────────────────────────────
+# PIPELINE STAGES
+# ─────────────────────────────────────────
+def pipeline():
+    """
+    [(stage name, callable)] run in order from the site root. State is
+    threaded through module globals exactly as the scripts' own main()s do.
+    """
+    state = {}
+
+    def final_begin():
+        state["run"] = snapshots.begin_run("fix_final")
+        fix_final.TX = staging.Transaction("fix_final", run=state["run"]).begin()
+
+    def final_commit():
+        fix_final.TX.commit()
+        state["run"].save()
+
+    def site_begin():
+        state["run"] = snapshots.begin_run("fix_site")
+        fix_site.TX = staging.Transaction("fix_site", run=state["run"]).begin()
+
+    def site_commit():
+        fix_site.TX.commit()
+        state["run"].save()
+
+    return [
+        ("fix_final.stage_tree", final_begin),
+        ("fix_final.step1_move_radon", fix_final.step1_move_radon),
+        ("fix_final.step2_fix_mice_page", fix_final.step2_fix_mice_page),
+        ("fix_final.step3_fix_links", fix_final.step3_fix_links),
+        ("fix_final.step4_fix_radon_internal_links", fix_final.step4_fix_radon_internal_links),
+        ("fix_final.step5_rebuild_sitemap", fix_final.step5_rebuild_sitemap),
+        ("fix_final.step6_verify", fix_final.step6_verify),
+        ("fix_final.validate", lambda: fix_final.TX.validate()),
+        ("fix_final.commit", final_commit),
+        ("fix_site.stage_tree", site_begin),
+        ("fix_site.fix_all", fix_site.fix_all),
+        ("fix_site.generate_sitemap", fix_site.generate_sitemap),
+        ("fix_site.validate", lambda: fix_site.TX.validate()),
+        ("fix_site.commit", site_commit),
+    ]
+
+
+def run_pass(site, trace_memory):
+    """One full pipeline pass in `site`. Returns {stage: seconds or peak bytes}."""
+    results = {}
+    cwd = os.getcwd()
+    os.chdir(site)
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            for name, fn in pipeline():
+                if trace_memory:
+                    tracemalloc.start()
+                    fn()
+                    results[name] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                else:
+                    start = time.perf_counter()
+                    fn()
+                    results[name] = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def warm_page_cache(site):
+    """Pre-parse every page, as any earlier tool run would have."""
+    cwd = os.getcwd()
+    os.chdir(site)
+    try:
+        cache = pagecache.PageCache()
+        for path in pagecache.site_pages():
+            cache.get(path)
+        cache.save()
+    finally:
+        os.chdir(cwd)
+
+
+def bench_size(pages, repeat, work_dir, cold=False):
+    template = os.path.join(work_dir, f"site-{pages}")
+    start = time.perf_counter()
+    synth_site(template, pages)
+    synth_seconds = time.perf_counter() - start
+    if not cold:
+        warm_page_cache(template)
+
+    timings = []
+    for i in range(repeat + 1):
+        site = os.path.join(work_dir, "pass")
+        link_tree(template, site)
+        trace = i == repeat  # last pass measures memory only
+        result = run_pass(site, trace)
+        if trace:
+            peaks = result
+        else:
+            timings.append(result)
+    shutil.rmtree(os.path.join(work_dir, "pass"), ignore_errors=True)
+    shutil.rmtree(template, ignore_errors=True)
+
+    stages = {}
+    for name in timings[0]:
+        samples = [t[name] for t in timings]
+        stages[name] = {
+            "seconds": statistics.median(samples),
+            "min_seconds": min(samples),
+            "peak_kb": round(peaks[name] / 1024, 1),
+        }
+    return {"pages": pages, "synth_seconds": synth_seconds, "cold": cold, "stages": stages}
+
+
+# ─────────────────────────────────────────
+# STARTUP
+# ─────────────────────────────────────────
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+
+def median_ms(args, repeat):
+    """Median wall time of running `args` from the site root, in ms."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=SOURCE_SITE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def heavy_imports(command):
+    """HEAVY_IMPORTS that `burp <command> --help` loads (from -X importtime)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", CLI, command, "--help"], cwd=SOURCE_SITE,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    loaded = {line.rsplit("|", 1)[-1].strip() for line in out.splitlines() if "|" in line}
+    return [m for m in HEAVY_IMPORTS if m in loaded]
+
+
+def bench_startup(args):
+    baseline = load_json(args.baseline) or {}
+    base = baseline.get("startup", {})
+    bare = median_ms([sys.executable, "-c", "pass"], args.repeat)
+    result, problems = {}, []
+    print(f"🚀 Startup (median of {args.repeat}, bare python {bare:.0f} ms)")
+    for command in STARTUP_COMMANDS:
+        ms = result[command] = round(median_ms([sys.executable, CLI, command, "--help"], args.repeat), 1)
+        then = base.get(command)
+        delta = f"{(ms - then) / then:+.0%}" if then else ""
+        print(f"   {command:<14} {ms:>7.1f} ms {delta:>7}")
+        if ms > args.budget:
+            problems.append(f"{command}: {ms:.0f} ms over the {args.budget} ms budget")
+        if then and ms > then * (1 + args.threshold) and ms - then > MIN_STARTUP_MS_DELTA:
+            problems.append(f"{command}: {then:.0f} → {ms:.0f} ms")
+        for module in heavy_imports(command):
+            problems.append(f"{command}: imports {module} before it runs")
+
+    if args.save_baseline:
+        baseline["startup"] = result
+        save_json(args.baseline, baseline, indent=1)
+        print(f"\n📌 Baseline saved: {args.baseline}")
+        return 0
+    if problems:
+        print(f"\n❌ {len(problems)} startup problem(s):")
+        for problem in problems:
+            print(f"   · {problem}")
+        return 1
+    print("\n✅ Every command starts within budget")
+    return 0
+
+
+# ─────────────────────────────────────────
+# BASELINES
+# ─────────────────────────────────────────
+def regressions(result, baseline, threshold):
+    """[(size, stage, metric, old, new)] for every stage past the threshold."""
+    found = []
+    for label, size in result["sizes"].items():
+        base = (baseline or {}).get("sizes", {}).get(label)
+        if not base:
+            continue
+        for stage, now in size["stages"].items():
+            then = base["stages"].get(stage)
+            if not then:
+                continue
+            checks = (("seconds", MIN_SECONDS_DELTA), ("peak_kb", MIN_PEAK_KB_DELTA))
+            for metric, floor in checks:
+                old, new = then[metric], now[metric]
+                if new > old * (1 + threshold) and new - old > floor:
+                    found.append((label, stage, metric, old, new))
+    return found
+
+
+def print_size(label, size, base):
+    print(f"\n  {label} pages (synthetic site built in {size['synth_seconds']:.2f}s)")
+    print(f"    {'stage':<42} {'seconds':>9} {'Δ':>8} {'peak KB':>10} {'Δ':>8}")
+    for stage, m in size["stages"].items():
+        then = (base or {}).get("stages", {}).get(stage)
+        d_t = f"{(m['seconds'] - then['seconds']) / then['seconds']:+.0%}" if then and then["seconds"] else ""
+        d_m = f"{(m['peak_kb'] - then['peak_kb']) / then['peak_kb']:+.0%}" if then and then["peak_kb"] else ""
+        print(f"    {stage:<42} {m['seconds']:>9.4f} {d_t:>8} {m['peak_kb']:>10,.1f} {d_m:>8}")
+    total = sum(m["seconds"] for m in size["stages"].values())
+    print(f"    {'total':<42} {total:>9.4f}")
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the site pipeline on synthetic sites.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("run")
+    p.add_argument("--sizes", default=DEFAULT_SIZES,
+                   help=f"comma-separated page counts, e.g. 100,1k,10k,50k (default: {DEFAULT_SIZES})")
+    p.add_argument("--repeat", type=int, default=3, help="timed passes per size (default: 3)")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="allowed slowdown/growth vs baseline (default: 0.25 = 25%%)")
+    p.add_argument("--baseline", default=BASELINE_FILE)
+    p.add_argument("--save-baseline", action="store_true",
+                   help="store this run as the new baseline")
+    p.add_argument("--work-dir", default=os.path.join(BENCH_DIR, "work"))
+    p.add_argument("--cold", action="store_true",
+                   help="start without a parsed-page cache (default: warm, as on a re-run)")
+    p = sub.add_parser("synth")
+    p.add_argument("pages")
+    p.add_argument("dest")
+    p = sub.add_parser("startup")
+    p.add_argument("--repeat", type=int, default=9, help="runs per command (default: 9)")
+    p.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                   help=f"ms any command may take (default: {STARTUP_BUDGET_MS})")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    p.add_argument("--baseline", default=BASELINE_FILE)
+    p.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "startup":
+        return bench_startup(args)
+
+    if not os.path.isdir(os.path.join(SOURCE_SITE, "pages")):
+        print(f"❌ Run from the repo root (needs {SOURCE_SITE}/pages/ as templates)")
+        return 1
+
+    if args.cmd == "synth":
+        n = parse_size(args.pages)
+        synth_site(args.dest, n)
+        print(f"✅ {n} pages written to {args.dest}")
+        return 0
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    baseline = load_json(args.baseline)
+    result = {
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+
+    print("=" * 60)
+    print("MyHouseIsBurping.com — Pipeline Benchmarks")
+    print(f"Sizes: {', '.join(size_label(n) for n in sizes)} | repeat {args.repeat}"
+          f" | baseline: {'yes' if baseline else 'none'}")
+    print("=" * 60)
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    try:
+        for n in sizes:
+            label = size_label(n)
+            result["sizes"][label] = bench_size(n, args.repeat, args.work_dir, args.cold)
+            print_size(label, result["sizes"][label], (baseline or {}).get("sizes", {}).get(label))
+    finally:
+        shutil.rmtree(args.work_dir, ignore_errors=True)
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    save_json(os.path.join(BENCH_DIR, "results", f"{stamp}.json"), result, indent=1)
+
+    if args.save_baseline:
+        merged = baseline or {}
+        merged.setdefault("sizes", {}).update(result["sizes"])
+        merged.update({k: result[k] for k in ("created", "python", "machine", "repeat")})
+        save_json(args.baseline, merged, indent=1)
+        print(f"\n📌 Baseline saved: {args.baseline}")
+        return 0
+
+    found = regressions(result, baseline, args.threshold)
+    if found:
+        print(f"\n❌ {len(found)} regression(s) beyond {args.threshold:.0%}:")
+        for label, stage, metric, old, new in found:
+            print(f"   · {label} {stage} {metric}: {old:,.4g} → {new:,.4g}")
+        return 1
+    if baseline:
+        print(f"\n✅ No stage regressed beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
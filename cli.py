@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — One Entry Point for Every Tool
+Installed as `burp` (pip install -e .), or run as python3 cli.py.
+Run from the ROOT of your site directory, like the scripts themselves:
+
+  burp generate --plan              # generate_articles.py
+  burp rewrite --plan               # rewrite_site.py
+  burp fix                          # fix_site.py
+  burp sitemap                      # fix_final.py --only 5
+  burp verify                       # fix_final.py --only 6
+  burp publish plan --to ../_host   # publish.py
+  burp serve                        # devserver.py
+  burp <command> --help             # that tool's own options
+
+Commands are a table of module names. A tool's module — and whatever it
+pulls in (the anthropic SDK, http.server, sqlite3, ...) — is imported
+only when its command runs, so offline commands start in tens of
+milliseconds. `python3 bench.py startup` guards that.
+
+The scripts still run on their own (python3 fix_site.py); this only
+dispatches to their main().
+"""
+
+import sys
+import importlib
+
+# command → (module, fixed leading args, summary)
+COMMANDS = {
+    "generate":     ("generate_articles", [], "generate new articles with the API"),
+    "rewrite":      ("rewrite_site", [], "AEO-rewrite existing pages with the API"),
+    "fix":          ("fix_site", [], "fix canonicals, links and metadata; rebuild sitemap"),
+    "fix-final":    ("fix_final", [], "move radon/ into pages/, fix links, rebuild sitemap"),
+    "sitemap":      ("fix_final", ["--only", "5"], "rebuild sitemap.xml"),
+    "verify":       ("fix_final", ["--only", "6"], "check expected pages and leftover /radon/ links"),
+    "publish":      ("publish", [], "deploy only what changed since the last publish"),
+    "indexnow":     ("indexnow", [], "submit changed URLs to IndexNow; sitemap lastmods"),
+    "serve":        ("devserver", [], "dev server: rebuild what a save affects, live reload"),
+    "radon-states": ("radon_states", [], "render per-state radon pages from EPA zone data"),
+    "hubs":         ("hubs", [], "generate hub listings and topic pages from page metadata"),
+    "traffic":      ("traffic", [], "import GSC exports / access logs, rank opportunities"),
+    "links":        ("linkcheck", [], "check outbound links (cached, conditional requests)"),
+    "fingerprint":  ("fingerprint", [], "content-hash assets and write cache headers"),
+    "redirects":    ("redirects", [], "compile legacy URLs into one-hop redirects"),
+    "speculation":  ("speculation", [], "write per-page speculation rules"),
+    "offline":      ("offline", [], "write the versioned service worker (sw.js)"),
+    "search":       ("search_index", [], "build or query the search index"),
+    "ads":          ("ads", [], "defer AdSense loading"),
+    "pageweight":   ("pageweight", [], "initial-load page weight"),
+    "snapshots":    ("snapshots", [], "list, diff and roll back runs"),
+    "staging":      ("staging", [], "leftover staging trees / interrupted commits"),
+    "pagecache":    ("pagecache", [], "parsed-page cache"),
+    "telemetry":    ("telemetry", [], "per-call API metrics"),
+}
+
+
+def print_help():
+    print("usage: burp <command> [args...]   (run from the site root)\n")
+    for name, (module, fixed, summary) in COMMANDS.items():
+        print(f"  {name:<14} {summary}")
+    print("\n  burp <command> --help for that command's options")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print_help()
+        return 0 if argv else 1
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"❌ Unknown command: {name}\n")
+        print_help()
+        return 2
+
+    module, fixed, _ = COMMANDS[name]
+    tool = importlib.import_module(module)
+    # argparse names itself after argv[0]; profiling records the rest
+    sys.argv = [f"burp {name}"] + fixed + rest
+    result = tool.main(fixed + rest)
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
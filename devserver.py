@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Dev Server with Incremental Rebuild and Live Reload
+Run from the ROOT of your site directory: python3 devserver.py
+then open http://127.0.0.1:8000/
+
+Serves the site and watches it — inotify (through ctypes) on Linux,
+mtime polling elsewhere or with --poll. Saving a file rebuilds only what
+depends on it, then every open tab reloads:
+
+  page saved        fix_site.py / fix_final.py link and metadata fixes,
+                    ads.py deferral and fingerprinted asset URLs, for
+                    that page only
+  listing changed   hubs.py listings, the affected topic pages, chunks
+                    and sitemap-topics.xml — when a page's title,
+                    description or canonical changed, or a page came or
+                    went (the topics are kept in memory between saves)
+  asset saved       fingerprint.py over the whole site, since every page
+                    references css/ and js/
+
+A page save stages only what it writes (staging's overlay mode), so its
+cost doesn't grow with the site: ~10 ms on a 10k-page synthetic site
+(bench.py synth 10k). A save that moves a card re-renders only the topic
+pages between its old and new place — 0.1–0.5 s in a 2,800-card topic.
+Speculation rules, sw.js and the search index are whole-site passes —
+run them before publishing as usual.
+
+The hub outputs are taken to be current at startup (run hubs.py build
+first if pages changed while the server was down).
+
+Rebuilds are validated and swapped in like any staged run, but not
+snapshotted: one run per save would bury the real ones. Stages left by
+runs that died are recovered once, at startup; a save's transaction
+owns only its own stage, so a `burp fix` or `hubs.py build` running
+alongside the server keeps its staging tree. If that run commits a file
+the rebuild also changes, the rebuild's commit hits a staging conflict
+and is re-staged from the new version (up to CONFLICT_RETRIES times);
+the other run's commit refuses the same way and can simply be re-run.
+Files a rebuild wrote are remembered by hash, so their own watch events
+are ignored.
+
+Served HTML gets a small EventSource script before </body> (on the wire,
+never on disk), and /sw.js is answered with a worker that unregisters
+itself, so a cached page never hides an edit.
+
+  python3 devserver.py [--port 8000] [--poll] [--interval 0.5]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import select
+import struct
+import ctypes
+import ctypes.util
+import argparse
+import threading
+from urllib.parse import urlsplit
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import ads
+import fingerprint
+import fix_final
+import fix_site
+import hubs
+import pagecache
+import snapshots
+import staging
+from search_index import OUT_DIR as SEARCH_DIR
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+DEBOUNCE = 0.05        # s of quiet that ends a burst of saves
+POLL_INTERVAL = 0.5    # s between scans when polling
+KEEPALIVE = 15         # s between comments on an idle reload stream
+CONFLICT_RETRIES = 3   # re-stages when another run commits a file a rebuild changes
+RELOAD_PATH = "/__livereload"
+SW_PATH = "/sw.js"
+
+RELOAD_SCRIPT = f"""<script>
+new EventSource("{RELOAD_PATH}").addEventListener("reload", function () {{ location.reload(); }});
+</script>
+"""
+DEV_SW = """// devserver.py: no caching while developing
+self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', () => self.registration.unregister());
+"""
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct("iIII")   # wd, mask, cookie, len — then the name
+
+
+def site_files(root="."):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not staging._skip_dir(d)]
+        for name in filenames:
+            yield staging._norm(os.path.join(dirpath, name))
+
+
+def watched(path):
+    """Is `path` a source a rebuild depends on? (not an output, not an editor temp file)"""
+    if path.startswith((hubs.CHUNK_DIR + "/", SEARCH_DIR + "/")):
+        return False
+    if path.endswith(".html"):
+        return True
+    return (path.startswith(tuple(d + "/" for d in fingerprint.ASSET_DIRS))
+            and fingerprint.is_asset(path) and not fingerprint.HASHED_RE.match(path))
+
+
+# ─────────────────────────────────────────
+# WATCHERS
+# Both answer changes(timeout): the site paths touched by the next burst
+# of events, or an empty set if nothing happened within `timeout` s.
+# ─────────────────────────────────────────
+class Inotify:
+    """Recursive inotify watch (Linux). Raises OSError where it isn't available."""
+
+    def __init__(self, root="."):
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            init = self.libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError("inotify is not available")
+        self.root = root
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        self.watch_tree(root)
+
+    def watch_tree(self, top):
+        """Watch `top` and every directory below it. Returns the files already there."""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not staging._skip_dir(d)]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed on {dirpath}")
+            self.dirs[wd] = dirpath
+            found += [os.path.join(dirpath, name) for name in filenames]
+        return found
+
+    def changes(self, timeout):
+        changed = set()
+        wait = timeout
+        while select.select([self.fd], [], [], wait)[0]:
+            changed |= self._read()
+            wait = DEBOUNCE
+        return changed
+
+    def _read(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed, i = set(), 0
+        while i < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, i)
+            name = os.fsdecode(data[i + EVENT.size:i + EVENT.size + length].rstrip(b"\0"))
+            i += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return set(site_files(self.root))  # events were lost: treat everything as touched
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not staging._skip_dir(name):
+                    changed.update(self.watch_tree(path))
+            elif not mask & IN_CREATE:   # the close-write that follows carries the content
+                changed.add(path)
+        return {staging._norm(p) for p in changed}
+
+
+class Poller:
+    """Size + mtime scan — where inotify isn't available."""
+
+    def __init__(self, root=".", interval=POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.seen = self.scan()
+
+    def scan(self):
+        seen = {}
+        for path in site_files(self.root):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            seen[path] = (st.st_size, st.st_mtime_ns)
+        return seen
+
+    def changes(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0, min(self.interval, deadline - time.monotonic())))
+            current = self.scan()
+            changed = {p for p in current.keys() | self.seen.keys() if current.get(p) != self.seen.get(p)}
+            self.seen = current
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+
+def make_watcher(poll=False, interval=POLL_INTERVAL):
+    """(watcher, description)"""
+    if not poll:
+        try:
+            return Inotify(), "inotify"
+        except OSError as e:
+            print(f"⚠️  {e} — polling instead")
+    return Poller(interval=interval), f"polling every {interval:g}s"
+
+
+# ─────────────────────────────────────────
+# INCREMENTAL REBUILD
+# ─────────────────────────────────────────
+class SessionPageCache(pagecache.PageCache):
+    """Kept in memory for the whole session; written once, on exit."""
+
+    def save(self):
+        pass
+
+    def flush(self):
+        super().save()
+
+
+class Rebuilder:
+    def __init__(self):
+        self.cache = SessionPageCache()
+        self.entries = {path: hubs.listing_entry(path, record)
+                        for path, record in hubs.listed_pages(cache=self.cache)}
+        # what the served hub outputs were built from — assumed current (hubs.py build)
+        self.topics = hubs.arrange(self.entries.values())
+        self.own = {}        # path → sha256 this process wrote (None = removed)
+
+    def own_write(self, path):
+        """Is this watch event just a file we swapped in ourselves?"""
+        if path not in self.own:
+            return False
+        sha = snapshots.sha256_file(path) if os.path.exists(path) else None
+        if sha != self.own[path]:
+            return False
+        del self.own[path]
+        return True
+
+    def fix(self, tx, path):
+        """The fix scripts' per-page edits, for one page."""
+        with open(tx.path(path), encoding="utf-8", errors="replace", newline="") as f:
+            original = f.read()
+        html, _ = fix_site.fix_page(path, original)
+        html, _ = fix_final.fix_links(path, html)
+        html = ads.defer_ads(html)
+        if html != original:
+            tx.write(path, html, newline="")
+
+    def point_at_hashed(self, tx, paths, missing):
+        """fingerprint.py's reference rewrite, for the pages this rebuild touched."""
+        manifest = fingerprint.read_manifest()
+        for path in sorted(paths):
+            if not path.endswith(".html") or not tx.exists(path):
+                continue
+            with open(tx.path(path), encoding="utf-8", errors="replace", newline="") as f:
+                original = f.read()
+            html = fingerprint.rewrite_refs(original, path, manifest, fingerprint.ATTR_RE, 2, missing)
+            if html != original:
+                tx.write(path, html, newline="")
+
+    def relist(self, tx, pages):
+        """Listing entries after `pages` changed, or None if the hubs show the same thing."""
+        entries, touched = dict(self.entries), False
+        for path in pages:
+            if path in hubs.NOT_LISTED or hubs.TOPIC_PAGE_RE.match(path):
+                touched = True   # a hub or generated page was edited: put the listing back
+                continue
+            if not hubs.is_listable(path):
+                continue
+            record = tx.page(path) if tx.exists(path) else None
+            entry = hubs.listing_entry(path, record) if record and hubs.is_listed(path, record) else None
+            if entry != entries.get(path):
+                touched = True
+                if entry is None:
+                    entries.pop(path, None)
+                else:
+                    entries[path] = entry
+        return entries if touched else None
+
+    def previous_topics(self, pages):
+        """self.topics, minus any topic whose generated pages were edited by hand."""
+        previous = dict(self.topics)
+        for path in pages:
+            if hubs.TOPIC_PAGE_RE.match(path):
+                slug = hubs._slug(path)
+                for key in previous:
+                    if slug == hubs.topic_slug(key) or slug.startswith(hubs.topic_slug(key) + "-"):
+                        previous[key] = None
+        return previous
+
+    def rebuild(self, paths):
+        """
+        Stage, validate and swap in whatever depends on `paths`, re-staging
+        if another run commits one of the same files first.
+        Returns (written, removed, missing asset refs); raises staging.ValidationError.
+        """
+        for attempt in range(1, CONFLICT_RETRIES + 1):
+            try:
+                return self._rebuild(paths)
+            except staging.ConflictError:
+                if attempt == CONFLICT_RETRIES:
+                    raise
+
+    def _rebuild(self, paths):
+        pages = sorted(p for p in paths if p.endswith(".html"))
+        assets = sorted(p for p in paths if not p.endswith(".html"))
+        tx = staging.Transaction("devserver", pages=self.cache).begin(
+            overlay=not assets, recover_stale=False)  # once, at startup
+        missing, validators = [], []
+        try:
+            for path in pages:
+                if tx.exists(path):
+                    self.fix(tx, path)
+            entries, topics = self.relist(tx, pages), None
+            if entries is not None:
+                topics = hubs.arrange(entries.values())
+                hubs.build(tx, topics, self.previous_topics(pages))
+                validators.append(hubs.check_hub_links)
+            if assets:
+                fingerprint.build(tx)
+                validators.append(fingerprint.check_references)
+            else:
+                self.point_at_hashed(tx, tx.written, missing)
+            written, removed = tx.commit(validators)
+        except BaseException:
+            tx.abort()
+            raise
+        if entries is not None:
+            self.entries, self.topics = entries, topics
+        for path in written:
+            self.own[path] = snapshots.sha256_file(path)
+        for path in removed:
+            self.own[path] = None
+        return written, removed, missing
+
+
+# ─────────────────────────────────────────
+# SERVER
+# ─────────────────────────────────────────
+class Clients:
+    """Open live-reload streams, one queue each."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queues = set()
+
+    def join(self):
+        q = queue.Queue()
+        with self.lock:
+            self.queues.add(q)
+        return q
+
+    def leave(self, q):
+        with self.lock:
+            self.queues.discard(q)
+
+    def send(self, event, data):
+        """Queue an event for every open tab. Returns how many there are."""
+        with self.lock:
+            for q in self.queues:
+                q.put((event, data))
+            return len(self.queues)
+
+
+def inject_reload(html):
+    at = html.lower().rfind("</body>")
+    return html + RELOAD_SCRIPT if at < 0 else html[:at] + RELOAD_SCRIPT + html[at:]
+
+
+def make_handler(clients, quiet=True):
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=".", **kwargs)
+
+        def end_headers(self):
+            self.send_header("cache-control", "no-store")
+            super().end_headers()
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path == RELOAD_PATH:
+                return self._stream()
+            if path == SW_PATH:
+                return self._send(DEV_SW.encode("utf-8"), "text/javascript")
+            fs_path = self.translate_path(self.path)
+            if os.path.isdir(fs_path) and path.endswith("/"):
+                fs_path = os.path.join(fs_path, "index.html")
+            if fs_path.endswith(".html") and os.path.isfile(fs_path):
+                with open(fs_path, encoding="utf-8", errors="replace", newline="") as f:
+                    html = f.read()
+                return self._send(inject_reload(html).encode("utf-8"), "text/html; charset=utf-8")
+            return super().do_GET()
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self):
+            q = clients.join()
+            try:
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                self.wfile.write(b"retry: 500\n\n")
+                self.wfile.flush()
+                while True:
+                    try:
+                        event, data = q.get(timeout=KEEPALIVE)
+                        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                    except queue.Empty:
+                        message = ": keepalive\n\n"
+                    self.wfile.write(message.encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                clients.leave(q)
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+    return Handler
+
+
+def serve(clients, host="127.0.0.1", port=8000, quiet=True):
+    """Start the server on a background thread. Returns it (call .shutdown())."""
+    server = ThreadingHTTPServer((host, port), make_handler(clients, quiet))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def report(label, rebuilder, paths):
+    """Run one rebuild and print what it did. Returns True if it swapped anything in."""
+    start = time.perf_counter()
+    try:
+        written, removed, missing = rebuilder.rebuild(paths)
+    except staging.ValidationError as e:
+        print(f"❌ {label}: rebuild failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return False
+    except Exception as e:
+        print(f"❌ {label}: rebuild failed ({type(e).__name__}: {e}) — staging discarded")
+        return False
+    ms = (time.perf_counter() - start) * 1000
+    print(f"⚡ {label}: {len(written)} file(s) written, {len(removed)} removed in {ms:.0f} ms")
+    for ref in missing:
+        print(f"   ⚠️  {ref} — no such asset")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the site, rebuild what a save affects, live-reload tabs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--poll", action="store_true", help="poll for changes instead of inotify")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between polls")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+
+    rolled, discarded = staging.recover()
+    for name in rolled:
+        print(f"↪️  Finished interrupted commit: {name}")
+    if discarded:
+        print(f"🗑️  Dropped {len(discarded)} aborted stage(s)")
+    watcher, how = make_watcher(args.poll, args.interval)
+    rebuilder = Rebuilder()
+    clients = Clients()
+    server = serve(clients, args.host, args.port, not args.verbose)
+    print(f"🔧 Dev server on http://{args.host}:{args.port}/ — watching with {how}, "
+          f"{len(rebuilder.entries)} listed pages  (Ctrl-C to stop)")
+    try:
+        while True:
+            paths = {p for p in watcher.changes(1.0) if watched(p) and not rebuilder.own_write(p)}
+            if not paths:
+                continue
+            label = ", ".join(sorted(paths)[:3]) + (f" (+{len(paths) - 3})" if len(paths) > 3 else "")
+            if report(label, rebuilder, paths):
+                tabs = clients.send("reload", {"changed": sorted(paths)})
+                if tabs:
+                    print(f"   🔄 {tabs} tab(s) reloaded")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.shutdown()
+        rebuilder.cache.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Local Stand-in for the Anthropic Messages API
+For load-testing the generators offline: no key, no cost, no network.
+
+Serves POST /v1/messages and /v1/messages/count_tokens with configurable
+latency, error rates and token usage, and answers with synthetic HTML in
+the site's patterns (.direct-answer, question H2s, howto-steps, ...), so
+the whole pipeline — head rendering, staging, validation — is exercised.
+
+  python3 fake_api.py --port 8765 --latency lognormal:900,0.4 \\
+      --output-tokens normal:3600,300 --error-rate 0.02 --seed 1
+
+  # then, in a scratch directory:
+  python3 generate_articles.py --base-url http://127.0.0.1:8765 --synthetic 2000 --delay 0
+
+Distributions: fixed:V | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA
+(latency in milliseconds, output tokens capped at the request's max_tokens)
+
+Requests with "stream": true get server-sent events in the Messages
+streaming format; the first text delta arrives after a --ttft sample and
+the rest of --latency is spread over the remaining chunks.
+
+GET /__stats returns request/error counts so far.
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 3.7
+
+ERROR_TYPES = {
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+
+# ─────────────────────────────────────────
+# DISTRIBUTIONS
+# ─────────────────────────────────────────
+def parse_distribution(spec):
+    """'lognormal:900,0.4' → callable(rng) returning a float."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"unknown distribution '{spec}'")
+
+
+# ─────────────────────────────────────────
+# SYNTHETIC CONTENT
+# ─────────────────────────────────────────
+TOPICS = [
+    ("attic", "attic noises"), ("pipes", "pipes banging"), ("furnace", "furnace popping"),
+    ("roof", "roof creaking"), ("floor", "floor squeaking"), ("window", "window rattling"),
+    ("radon", "radon testing"), ("siding", "siding popping"), ("duct", "duct ticking"),
+    ("foundation", "foundation settling"), ("water-heater", "water heater rumbling"),
+    ("deck", "deck cracking"), ("chimney", "chimney whistling"), ("garage", "garage door banging"),
+]
+
+FILLER = ("Your house is built from wood, metal and drywall that all expand and contract "
+          "at different rates as temperature and humidity change. That movement releases "
+          "stored stress as small pops, ticks and creaks. Most of these sounds are harmless, "
+          "but a few patterns are worth checking. ").split()
+
+
+def synthetic_articles(n, seed=0):
+    """n ARTICLES-shaped plan entries for load tests."""
+    rng = random.Random(seed)
+    articles = []
+    for i in range(n):
+        slug_part, phrase = TOPICS[i % len(TOPICS)]
+        articles.append({
+            "slug": f"synthetic-{slug_part}-{i:05d}",
+            "title": f"Why Is My House Making {phrase.title()} Sounds? (Guide {i})",
+            "keyword": f"{phrase} in house {i}",
+            "intent": f"Synthetic load-test article about {phrase}.",
+            "internal_links": [
+                ("/pages/house-burping-causes.html", "causes of house noises"),
+                ("/pages/when-to-call-a-professional.html", "when to call a professional"),
+            ],
+            "word_count": rng.choice([1200, 1400, 1600, 1800]),
+            "schema_type": rng.choice(["FAQPage", "HowTo"]),
+        })
+    return articles
+
+
+def _prose(rng, words):
+    return " ".join(rng.choice(FILLER) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_body(rng, target_chars):
+    parts = [
+        "<h1>Synthetic Article</h1>",
+        '<div class="direct-answer"><p><strong>' + _prose(rng, 18) + "</strong> "
+        + _prose(rng, 20) + "</p></div>",
+        '<div class="ad-slot"><span>Advertisement Space</span></div>',
+        '<ol class="howto-steps">'
+        + "".join(f"<li><strong>Step {i}</strong> {_prose(rng, 15)}</li>" for i in range(1, 5))
+        + "</ol>",
+    ]
+    n = 1
+    while sum(len(p) for p in parts) < target_chars:
+        parts.append(f"<h2>What Causes Noise Number {n}?</h2><p>{_prose(rng, 40)}</p>")
+        n += 1
+    return "\n".join(parts)[:max(target_chars, 0)]
+
+
+def synthetic_page(rng, target_chars):
+    body = synthetic_body(rng, max(0, target_chars - 120))
+    return f"<!DOCTYPE html>\n<html lang=\"en\">\n<head><title>Synthetic</title></head>\n<body>\n{body}\n</body>\n</html>"
+
+
+def estimate_input_tokens(payload):
+    text = payload.get("system") or ""
+    if not isinstance(text, str):
+        text = json.dumps(text)
+    for message in payload.get("messages", []):
+        content = message.get("content", "")
+        text += content if isinstance(content, str) else json.dumps(content)
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+# ─────────────────────────────────────────
+# SERVER
+# ─────────────────────────────────────────
+class FakeMessagesAPI:
+    def __init__(self, latency="lognormal:900,0.4", output_tokens="normal:3600,300",
+                 error_rate=0.0, error_codes=(429, 529), seed=0, ttft="lognormal:350,0.3"):
+        self.latency = parse_distribution(latency)
+        self.ttft = parse_distribution(ttft)
+        self.output_tokens = parse_distribution(output_tokens)
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.stats = {"requests": 0, "errors": 0, "count_tokens": 0,
+                      "input_tokens": 0, "output_tokens": 0}
+
+    def _rng(self, payload):
+        # Per-request RNG: reproducible for a given seed and arrival order
+        with self.lock:
+            self.counter += 1
+            n = self.counter
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).digest()
+        return random.Random(f"{self.seed}:{n}:{digest.hex()[:16]}")
+
+    def _respond(self, payload):
+        """(status, headers, body dict, latency_ms, ttft_ms) — nothing slept yet."""
+        rng = self._rng(payload)
+        latency = self.latency(rng)
+        ttft = min(latency, self.ttft(rng))
+
+        with self.lock:
+            self.stats["requests"] += 1
+        if self.error_rate and rng.random() < self.error_rate:
+            status = rng.choice(self.error_codes)
+            with self.lock:
+                self.stats["errors"] += 1
+            headers = {"retry-after": "1"} if status == 429 else {}
+            return status, headers, {
+                "type": "error",
+                "error": {"type": ERROR_TYPES.get(status, "api_error"),
+                          "message": f"synthetic {status} from fake_api"},
+            }, latency, ttft
+
+        max_tokens = payload.get("max_tokens", 4096)
+        out_tokens = max(1, min(max_tokens, round(self.output_tokens(rng))))
+        in_tokens = estimate_input_tokens(payload)
+        prompt = json.dumps(payload.get("messages", []))
+        target_chars = round(out_tokens * CHARS_PER_TOKEN)
+        if "CURRENT PAGE HTML" in prompt and out_tokens < max_tokens:
+            text = synthetic_page(rng, target_chars)
+        else:
+            text = synthetic_body(rng, target_chars)
+
+        with self.lock:
+            self.stats["input_tokens"] += in_tokens
+            self.stats["output_tokens"] += out_tokens
+        return 200, {}, {
+            "id": f"msg_fake_{rng.getrandbits(64):016x}",
+            "type": "message",
+            "role": "assistant",
+            "model": payload.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "max_tokens" if out_tokens >= max_tokens else "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": in_tokens, "output_tokens": out_tokens,
+                      "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0},
+        }, latency, ttft
+
+    def messages(self, payload):
+        """Returns (status, headers, body dict)."""
+        status, headers, body, latency, _ = self._respond(payload)
+        time.sleep(latency / 1000)
+        return status, headers, body
+
+    def messages_stream(self, payload, chunks=20):
+        """
+        Returns (status, headers, body) for errors, else (200, headers, events)
+        where events is a generator of (event name, data dict) that sleeps
+        between events to reproduce TTFT and total latency.
+        """
+        status, headers, body, latency, ttft = self._respond(payload)
+        if status != 200:
+            time.sleep(ttft / 1000)
+            return status, headers, body
+
+        def events():
+            text = body["content"][0]["text"]
+            start = dict(body, content=[], stop_reason=None,
+                         usage=dict(body["usage"], output_tokens=1))
+            yield "message_start", {"type": "message_start", "message": start}
+            yield "content_block_start", {"type": "content_block_start", "index": 0,
+                                          "content_block": {"type": "text", "text": ""}}
+            time.sleep(ttft / 1000)
+            step = max(1, -(-len(text) // chunks))
+            pieces = [text[i:i + step] for i in range(0, len(text), step)] or [""]
+            gap = (latency - ttft) / 1000 / len(pieces)
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(gap)
+                yield "content_block_delta", {"type": "content_block_delta", "index": 0,
+                                              "delta": {"type": "text_delta", "text": piece}}
+            yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+            yield "message_delta", {"type": "message_delta",
+                                    "delta": {"stop_reason": body["stop_reason"],
+                                              "stop_sequence": None},
+                                    "usage": {"output_tokens": body["usage"]["output_tokens"]}}
+            yield "message_stop", {"type": "message_stop"}
+
+        return 200, headers, events()
+
+    def count_tokens(self, payload):
+        with self.lock:
+            self.stats["count_tokens"] += 1
+        return 200, {}, {"input_tokens": estimate_input_tokens(payload)}
+
+
+def make_handler(api, quiet=True):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, headers, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_events(self, events):
+            self.send_response(200)
+            self.send_header("content-type", "text/event-stream")
+            self.send_header("cache-control", "no-cache")
+            self.send_header("connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            for name, data in events:
+                self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            path = self.path.split("?")[0]
+            if path == "/v1/messages" and payload.get("stream"):
+                status, headers, result = api.messages_stream(payload)
+                if status == 200:
+                    self._send_events(result)
+                else:
+                    self._send(status, headers, result)
+            elif path == "/v1/messages":
+                self._send(*api.messages(payload))
+            elif path == "/v1/messages/count_tokens":
+                self._send(*api.count_tokens(payload))
+            else:
+                self._send(404, {}, {"type": "error", "error": {"type": "not_found_error",
+                                                                 "message": path}})
+
+        def do_GET(self):
+            if self.path == "/__stats":
+                with api.lock:
+                    self._send(200, {}, dict(api.stats))
+            else:
+                self._send(404, {}, {"type": "error", "error": {"type": "not_found_error",
+                                                                 "message": self.path}})
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+    return Handler
+
+
+def serve(api, host="127.0.0.1", port=8765, quiet=True):
+    """Start the stand-in on a background thread. Returns the server (call .shutdown())."""
+    server = ThreadingHTTPServer((host, port), make_handler(api, quiet))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Messages API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:900,0.4",
+                        help="latency distribution in ms (default: lognormal:900,0.4)")
+    parser.add_argument("--ttft", default="lognormal:350,0.3",
+                        help="time-to-first-token distribution in ms for streamed calls "
+                             "(default: lognormal:350,0.3)")
+    parser.add_argument("--output-tokens", default="normal:3600,300",
+                        help="output token distribution (default: normal:3600,300)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of calls that fail (default: 0)")
+    parser.add_argument("--error-codes", default="429,529",
+                        help="HTTP statuses to fail with (default: 429,529)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    api = FakeMessagesAPI(
+        latency=args.latency,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        error_codes=[int(c) for c in args.error_codes.split(",")],
+        seed=args.seed,
+        ttft=args.ttft,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(api, not args.verbose))
+    server.daemon_threads = True
+    print(f"🧪 Fake Messages API on http://{args.host}:{args.port}  "
+          f"(latency {args.latency}, output {args.output_tokens}, errors {args.error_rate:.1%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{json.dumps(api.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Local Stand-in for Outbound Sites
+For exercising linkcheck.py offline: one server answers for every host
+(it goes by the Host header), so `linkcheck.py check --via` runs the
+real checker — pooling, politeness, conditional requests — with no
+network.
+
+Every path answers 200 with a stable ETag and Last-Modified, and 304 to
+a matching If-None-Match / If-Modified-Since. A few path prefixes
+behave differently:
+
+  /status/<code>...      that status (e.g. /status/404/gone.html)
+  /redirect/<n>/...      n redirect hops, then 200
+  /nohead/...            405 to HEAD, 200 to GET
+  /slow/...              --slow-ms before answering
+
+  python3 fake_web.py --port 8790 --latency 20
+
+GET /__stats returns per-host request, 304, connection and peak
+concurrency counts — what the checker's politeness limits promise.
+
+It also stands in for IndexNow, for `indexnow.py submit --endpoint
+http://127.0.0.1:8790/indexnow`: POST /indexnow checks the payload the
+way the real endpoint does (403 bad key, 400 bad urlList, 422 URL off
+the host, else 200), and --indexnow-failures N answers the first N
+posts 429 to exercise the retries. GET /__indexnow returns what was
+accepted.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAST_MODIFIED = "Mon, 05 Jan 2026 12:00:00 GMT"
+INDEXNOW_MAX = 10_000
+
+
+class FakeWeb:
+    def __init__(self, latency_ms=0, slow_ms=3000, indexnow_failures=0):
+        self.latency_ms = latency_ms
+        self.slow_ms = slow_ms
+        self.indexnow_failures = indexnow_failures
+        self.indexnow = {"requests": 0, "throttled": 0, "rejected": 0, "batches": 0, "urls": []}
+        self.lock = threading.Lock()
+        self.active = defaultdict(int)
+        self.stats = defaultdict(lambda: {"requests": 0, "not_modified": 0,
+                                          "connections": 0, "peak_concurrent": 0})
+
+    def connected(self, host):
+        with self.lock:
+            self.stats[host]["connections"] += 1
+
+    def begin(self, host):
+        with self.lock:
+            self.active[host] += 1
+            s = self.stats[host]
+            s["requests"] += 1
+            s["peak_concurrent"] = max(s["peak_concurrent"], self.active[host])
+
+    def end(self, host):
+        with self.lock:
+            self.active[host] -= 1
+
+    def respond(self, method, host, path, headers):
+        """(status, headers) — body is left to the handler."""
+        parts = path.split("?")[0].strip("/").split("/")
+        etag = '"' + hashlib.sha256(f"{host}{path}".encode()).hexdigest()[:16] + '"'
+        delay = self.latency_ms
+        if parts[0] == "slow":
+            delay += self.slow_ms
+        time.sleep(delay / 1000)
+
+        if parts[0] == "status" and len(parts) > 1 and parts[1].isdigit():
+            return int(parts[1]), {}
+        if parts[0] == "redirect" and len(parts) > 1 and parts[1].isdigit():
+            n = int(parts[1])
+            rest = "/".join(parts[2:])
+            target = f"/redirect/{n - 1}/{rest}" if n > 1 else f"/{rest}"
+            return 301, {"location": target}
+        if parts[0] == "nohead" and method == "HEAD":
+            return 405, {"allow": "GET"}
+
+        validators = {"etag": etag, "last-modified": LAST_MODIFIED}
+        if headers.get("if-none-match") == etag or (
+                "if-none-match" not in headers and headers.get("if-modified-since") == LAST_MODIFIED):
+            with self.lock:
+                self.stats[host]["not_modified"] += 1
+            return 304, validators
+        return 200, validators
+
+    def submit(self, body):
+        """(status, headers) for an IndexNow POST."""
+        with self.lock:
+            s = self.indexnow
+            s["requests"] += 1
+            if s["requests"] <= self.indexnow_failures:
+                s["throttled"] += 1
+                return 429, {"retry-after": "0"}
+            try:
+                payload = json.loads(body)
+                host, key, urls = payload["host"], payload["key"], payload["urlList"]
+            except (ValueError, KeyError, TypeError):
+                s["rejected"] += 1
+                return 400, {}
+            if not (isinstance(key, str) and 8 <= len(key) <= 128
+                    and str(payload.get("keyLocation", "")).endswith(f"/{key}.txt")):
+                s["rejected"] += 1
+                return 403, {}
+            if not isinstance(urls, list) or not 1 <= len(urls) <= INDEXNOW_MAX:
+                s["rejected"] += 1
+                return 400, {}
+            if any(urlsplit(str(url)).hostname != host for url in urls):
+                s["rejected"] += 1
+                return 422, {}
+            s["batches"] += 1
+            s["urls"].extend(urls)
+            return 200, {}
+
+
+def make_handler(web, quiet=True):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.counted = set()
+
+        def _host(self):
+            return (self.headers.get("host") or "localhost").lower()
+
+        def _answer(self, method):
+            host = self._host()
+            if host not in self.counted:
+                self.counted.add(host)
+                web.connected(host)
+            if self.path in ("/__stats", "/__indexnow"):
+                with web.lock:
+                    data = web.stats if self.path == "/__stats" else web.indexnow
+                    body = json.dumps(data).encode("utf-8")
+                status, headers = 200, {"content-type": "application/json"}
+            else:
+                web.begin(host)
+                try:
+                    status, headers = web.respond(method, host, self.path,
+                                                  {k.lower(): v for k, v in self.headers.items()})
+                finally:
+                    web.end(host)
+                body = b"" if status == 304 else f"<p>{status} {host}{self.path}</p>".encode("utf-8")
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            if method == "GET":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._answer("GET")
+
+        def do_HEAD(self):
+            self._answer("HEAD")
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("content-length") or 0))
+            if self.path.split("?")[0] == "/indexnow":
+                status, headers = web.submit(body)
+            else:
+                status, headers = 405, {"allow": "GET, HEAD"}
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("content-length", "0")
+            self.end_headers()
+
+        def log_message(self, fmt, *args):
+            if not quiet:
+                super().log_message(fmt, *args)
+
+    return Handler
+
+
+def serve(web, host="127.0.0.1", port=8790, quiet=True):
+    """Start the stand-in on a background thread. Returns the server (call .shutdown())."""
+    server = ThreadingHTTPServer((host, port), make_handler(web, quiet))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the sites the pages link to.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency", type=float, default=0, help="ms added to every answer")
+    parser.add_argument("--slow-ms", type=float, default=3000, help="ms added under /slow/")
+    parser.add_argument("--indexnow-failures", type=int, default=0,
+                        help="answer the first N IndexNow posts 429")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    web = FakeWeb(args.latency, args.slow_ms, args.indexnow_failures)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(web, not args.verbose))
+    server.daemon_threads = True
+    print(f"🧪 Fake outbound web on http://{args.host}:{args.port}  (latency {args.latency:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{json.dumps(web.stats, indent=1)}")
+        if web.indexnow["requests"]:
+            print(f"IndexNow: {web.indexnow['batches']} batch(es), {len(web.indexnow['urls'])} URL(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
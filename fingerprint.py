@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Fingerprinted Assets + Cache Headers
+Run from the ROOT of your site directory: python3 fingerprint.py build
+
+  1. Copy every static asset under css/, js/ and assets/ to a
+     content-hashed name next to it: css/styles.css → css/styles.<hash>.css.
+     Stylesheets are hashed after their url(...) references are rewritten,
+     so a changed image also changes the CSS that points at it.
+  2. Rewrite src/href/srcset references in every page to the hashed URL
+     (root-relative, so it works from any folder).
+  3. Write asset-manifest.json (logical name → hashed name) and the
+     "headers" section of ../vercel.json:
+       hashed assets  public, max-age=31536000, immutable
+       HTML           max-age=0, s-maxage=300, stale-while-revalidate=86400
+       sw.js          max-age=0 (offline.py; its URL never changes)
+       everything else (unhashed originals, search index) short + SWR
+  4. Verify that every asset a page or stylesheet references is in the
+     manifest — the run aborts and nothing is swapped in otherwise.
+
+Originals stay in place (generated pages and old cached HTML still point
+at them), and the previous build's hashed files are kept one generation
+so HTML cached at the edge keeps working during a deploy.
+
+  python3 fingerprint.py build [--vercel ../vercel.json] [--dry-run]
+  python3 fingerprint.py check           # references vs. the current manifest
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import posixpath
+
+import pagecache
+import profiling
+import snapshots
+import staging
+from site_config import BASE_URL
+
+MANIFEST = "asset-manifest.json"
+VERCEL_JSON = "../vercel.json"
+ASSET_DIRS = ("css", "js", "assets")
+ASSET_EXTS = (".css", ".js", ".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg", ".ico",
+              ".woff", ".woff2")
+HASH_LEN = 10
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+HTML_CACHE = "public, max-age=0, s-maxage=300, stale-while-revalidate=86400"
+DEFAULT_CACHE = "public, max-age=3600, stale-while-revalidate=86400"
+# sw.js keeps a fixed URL; browsers must see a new version on the next visit
+SW_CACHE = "public, max-age=0, must-revalidate"
+
+HASHED_RE = re.compile(r"^(.*)\.([0-9a-f]{%d})(\.[A-Za-z0-9]+)$" % HASH_LEN)
+ATTR_RE = re.compile(r'\b(src|href|srcset)="([^"]*)"', re.I)
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+SOCIAL_RE = re.compile(r'<meta\b[^>]*\b(?:og:image|twitter:image)\b[^>]*>', re.I)
+CONTENT_RE = re.compile(r'\bcontent="([^"]*)"')
+
+
+# ─────────────────────────────────────────
+# NAMES
+# ─────────────────────────────────────────
+def logical(path):
+    """css/styles.0123456789.css → css/styles.css (unhashed names unchanged)."""
+    m = HASHED_RE.match(path)
+    return m.group(1) + m.group(3) if m else path
+
+
+def hashed_name(path, data):
+    base, ext = posixpath.splitext(path)
+    return f"{base}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}{ext}"
+
+
+def is_asset(path):
+    return path.lower().endswith(ASSET_EXTS)
+
+
+def resolve(url, from_path):
+    """Site path of a same-site reference, or None for external/data URLs."""
+    url = url.strip().split("#")[0].split("?")[0]
+    if url.startswith(BASE_URL):
+        url = url[len(BASE_URL):]
+    if not url or ":" in url or url.startswith("//"):
+        return None
+    if not url.startswith("/"):
+        url = "/" + posixpath.join(posixpath.dirname(from_path), url)
+    return posixpath.normpath(url).lstrip("/")
+
+
+def source_assets(tree):
+    """Logical asset paths present in `tree` (hashed copies excluded)."""
+    found = []
+    for folder in ASSET_DIRS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(tree, folder)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = os.path.relpath(os.path.join(dirpath, name), tree).replace(os.sep, "/")
+                if is_asset(path) and not HASHED_RE.match(path):
+                    found.append(path)
+    return found
+
+
+# ─────────────────────────────────────────
+# REWRITING
+# ─────────────────────────────────────────
+def rewrite_refs(text, from_path, manifest, pattern, group, missing):
+    """Point every asset reference matched by `pattern` at its hashed name."""
+    def repl(m):
+        values = m.group(group)
+        parts = []
+        # srcset: "a.webp 1x, b.webp 2x"
+        for candidate in values.split(",") if m.group(0).lower().startswith("srcset") else [values]:
+            url = candidate.strip().split(" ")[0] if candidate.strip() else candidate
+            target = resolve(url, from_path)
+            if target and is_asset(target):
+                key = logical(target)
+                if key in manifest:
+                    candidate = candidate.replace(url, "/" + manifest[key], 1)
+                else:
+                    missing.append(f"{from_path}: {url}")
+            parts.append(candidate)
+        return m.group(0).replace(values, ",".join(parts), 1)
+    return pattern.sub(repl, text)
+
+
+def social_refs(html, from_path):
+    """og:image / twitter:image URLs on this site that point at no file."""
+    out = []
+    for tag in SOCIAL_RE.findall(html):
+        m = CONTENT_RE.search(tag)
+        if m and m.group(1).startswith(BASE_URL):
+            target = resolve(m.group(1), from_path)
+            if target and is_asset(target):
+                out.append(target)
+    return out
+
+
+# ─────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────
+def read_manifest(root="."):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def build(tx):
+    """Stage hashed assets, rewritten pages and the manifest. Returns (manifest, pages, missing)."""
+    previous = read_manifest(tx.tree)
+    manifest, missing = {}, []
+    assets = source_assets(tx.tree)
+
+    # binary assets first, then CSS (whose url()s must point at hashed images)
+    with profiling.span("hash_assets"):
+        for path in sorted(assets, key=lambda p: p.endswith(".css")):
+            if path.endswith(".css"):
+                with open(tx.path(path), encoding="utf-8", newline="") as f:
+                    css = rewrite_refs(f.read(), path, manifest, CSS_URL_RE, 2, missing)
+                data = css.encode("utf-8")
+                manifest[path] = hashed_name(path, data)
+                if not tx.exists(manifest[path]):
+                    tx.write(manifest[path], css, newline="")
+            else:
+                with open(tx.path(path), "rb") as f:
+                    manifest[path] = hashed_name(path, f.read())
+                if not tx.exists(manifest[path]):
+                    tx.copy(path, manifest[path])
+
+    keep = set(manifest.values()) | set(previous.values())
+    for path in assets:
+        folder = posixpath.dirname(path)
+        for name in os.listdir(tx.path(folder)):
+            old = posixpath.join(folder, name)
+            if HASHED_RE.match(old) and logical(old) == path and old not in keep:
+                tx.remove(old)
+
+    pages = pagecache.site_pages(tx.tree)
+    with profiling.span("rewrite_pages"):
+        for path in profiling.each(pages):
+            with open(tx.path(path), encoding="utf-8", errors="replace", newline="") as f:
+                original = f.read()
+            updated = rewrite_refs(original, path, manifest, ATTR_RE, 2, missing)
+            if updated != original:
+                tx.write(path, updated, newline="")
+
+    if manifest != previous:
+        tx.write(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return manifest, pages, missing
+
+
+def headers_config():
+    hashed_exts = "|".join(e.lstrip(".") for e in ASSET_EXTS)
+    rule = lambda source, value: {"source": source,
+                                  "headers": [{"key": "Cache-Control", "value": value}]}
+    # Vercel applies every matching rule in order; later rules win.
+    return [
+        rule("/(.*)", DEFAULT_CACHE),
+        rule("/", HTML_CACHE),
+        rule("/(.*)/", HTML_CACHE),
+        rule("/(.*)\\.html", HTML_CACHE),
+        rule(f"/(.*)\\.([0-9a-f]{{{HASH_LEN}}})\\.({hashed_exts})", IMMUTABLE),
+        rule("/sw.js", SW_CACHE),
+    ]
+
+
+def write_vercel_section(section, value, path=VERCEL_JSON):
+    """Replace one top-level key of vercel.json, keeping everything else."""
+    config = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            config = json.load(f)
+    if config.get(section) == value:
+        return False
+    config[section] = value
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return True
+
+
+def check_references(tx):
+    """Every asset referenced by a written page or stylesheet must be in the manifest."""
+    manifest = set(json.loads(tx.read(MANIFEST)).values())
+    problems = []
+    for path in sorted(tx.written):
+        if path.endswith(".html"):
+            refs = [m.group(2) for m in ATTR_RE.finditer(tx.read(path, errors="replace"))]
+        elif path.endswith(".css"):
+            refs = [m.group(2) for m in CSS_URL_RE.finditer(tx.read(path))]
+        else:
+            continue
+        for ref in refs:
+            for url in ref.split(","):
+                target = resolve(url.strip().split(" ")[0], path)
+                if target and is_asset(target) and target not in manifest:
+                    problems.append(f"{path}: {url.strip()} is not a fingerprinted asset")
+    return problems
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fingerprint static assets and write cache headers.")
+    parser.add_argument("--vercel", default=VERCEL_JSON, help=f"vercel.json to update (default {VERCEL_JSON})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--dry-run", action="store_true", help="stage and verify, but don't swap in")
+    profiling.add_profile_args(p)
+    sub.add_parser("check")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    if args.cmd == "check":
+        return check(args)
+    profiling.start("fingerprint", args)
+    try:
+        return run(args)
+    finally:
+        profiling.finish()
+
+
+def run(args):
+    snap_run = None if args.dry_run else snapshots.begin_run("fingerprint")
+    tx = staging.Transaction("fingerprint", run=snap_run).begin()
+    try:
+        manifest, pages, missing = build(tx)
+        problems = [f"{m} is not a site asset" for m in missing]
+        if args.dry_run:
+            problems += tx.validate([check_references])
+            tx.abort()
+            print(f"🔍 Dry run: {len(manifest)} assets, {len(tx.written)} files would change")
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1 if problems else 0
+        if problems:
+            raise staging.ValidationError(problems)
+        written, removed = tx.commit([check_references])
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Broken asset references — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    rewritten = sum(p.endswith(".html") for p in written)
+    print(f"✅ {len(manifest)} assets fingerprinted, {rewritten} of {len(pages)} pages rewritten, "
+          f"{len(removed)} stale hashed files removed → {MANIFEST}")
+    if write_vercel_section("headers", headers_config(), args.vercel):
+        print(f"   {args.vercel}: cache headers updated")
+    if written:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    warn_social(pages)
+    return 0
+
+
+def warn_social(pages, root="."):
+    """og:image URLs aren't fingerprinted (crawlers cache them by URL) — just flag dead ones."""
+    dead = []
+    for path in pages:
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            dead += [f"{path}: /{t}" for t in sorted(set(social_refs(f.read(), path)))
+                     if not os.path.exists(os.path.join(root, t))]
+    if dead:
+        print(f"⚠️  {len(dead)} og:image/twitter:image URLs point at missing files:")
+        for line in dead[:10]:
+            print(f"   · {line}")
+
+
+def check(args):
+    manifest = read_manifest()
+    if not manifest:
+        print(f"❌ No {MANIFEST} — run: python3 fingerprint.py build")
+        return 1
+    hashed = set(manifest.values())
+    problems = []
+    for path in pagecache.site_pages():
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for m in ATTR_RE.finditer(f.read()):
+                for url in m.group(2).split(","):
+                    target = resolve(url.strip().split(" ")[0], path)
+                    if target and is_asset(target) and target not in hashed:
+                        problems.append(f"{path}: {url.strip()}")
+    for path in sorted(hashed):
+        if not os.path.exists(path):
+            problems.append(f"{MANIFEST}: {path} missing on disk")
+    print(f"{'✅' if not problems else '❌'} {len(manifest)} assets in manifest, "
+          f"{len(problems)} unfingerprinted or missing references")
+    for problem in problems:
+        print(f"   · {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
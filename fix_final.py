@@ -2,6 +2,8 @@
 # MyHouseIsBurping.com - TARGETED FIX SCRIPT
 # Run from site root (where index.html lives):
 #   python fix_final.py
+#   python fix_final.py --profile     # per-step/per-file trace (see profiling.py)
+#   python fix_final.py --only 5      # just rebuild sitemap.xml (--only 6: just verify)
 #
 # What this does:
 #   1. Moves radon/ files into pages/ with correct slugs
@@ -9,11 +11,22 @@
 #   3. Fixes ALL internal links across every HTML file
 #   4. Fixes radon/ path refs to /pages/ throughout
 #   5. Rebuilds sitemap.xml with correct paths
+#
+# All steps run against a hardlinked staging tree; nothing on the served
+# site changes until every step has succeeded and the staged tree passes
+# validation, then the changed files are swapped in together.
+# Every replaced file is snapshotted. Undo the whole run:
+#   python snapshots.py rollback last
 
-import os, re, shutil, glob
+import os, re, argparse
 from datetime import datetime
 
-BACKUP = f"_fix_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+import profiling
+import snapshots
+import staging
+from site_config import BASE_URL, ADSENSE_CLIENT
+
+TX = None  # staging.Transaction for this invocation, set in main()
 
 # ── Radon file mapping: radon/source → pages/destination ─────────────────────
 # Based on your actual /radon/ folder contents
@@ -26,6 +39,9 @@ RADON_MOVES = {
     "radon/radon-levels-by-state.html":  "pages/radon-levels-by-state.html",
 }
 
+# ── Page renamed by step 2: old slug → new slug ──────────────────────────────
+MICE_PAGE_MOVE = ("pages/pest-noises-vs-house-settling.html", "pages/house-burping-or-mice.html")
+
 # ── All URL fixes: wrong href → correct href ──────────────────────────────────
 LINK_FIXES = {
     # Radon folder → pages folder
@@ -130,20 +146,20 @@ SITEMAP_URLS = [
 
 
 # ─────────────────────────────────────────────────────────────────────────────
+# All file access goes through the staging transaction
 def rread(path):
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()
+    return TX.read(path, errors="replace")
 
 def wwrite(path, text):
-    os.makedirs(os.path.dirname(path) if os.path.dirname(path) else ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(text)
+    if exists(path) and rread(path) == text:
+        return  # unchanged: keep it out of the swap and the snapshot
+    TX.write(path, text)
 
-def backup(path):
-    if os.path.exists(path):
-        dest = os.path.join(BACKUP, path)
-        os.makedirs(os.path.dirname(dest), exist_ok=True)
-        shutil.copy2(path, dest)
+def exists(path):
+    return TX.exists(path)
+
+def page(path):
+    return TX.page(path)  # cached facts, see pagecache.py
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -153,22 +169,21 @@ def step1_move_radon():
     print("\n── STEP 1: Move radon/ → pages/ ──────────────────────────")
     moved = 0
     for src, dst in RADON_MOVES.items():
-        if not os.path.exists(src):
+        if not exists(src):
             print(f"  SKIP (not found): {src}")
             continue
-        backup(dst)  # backup destination if it exists
-        shutil.copy2(src, dst)
+        TX.copy(src, dst)
         moved += 1
         print(f"  ✅ {src} → {dst}")
 
     # Also handle carbon-monoxide if it's in radon/
     co_src = "radon/carbon-monoxide-vs-radon-home.html"
     co_dst = "pages/carbon-monoxide-vs-radon-home.html"
-    if os.path.exists(co_src) and not os.path.exists(co_dst):
-        shutil.copy2(co_src, co_dst)
+    if exists(co_src) and not exists(co_dst):
+        TX.copy(co_src, co_dst)
         print(f"  ✅ {co_src} → {co_dst}")
         moved += 1
-    elif os.path.exists(co_dst):
+    elif exists(co_dst):
         print(f"  OK (already exists): {co_dst}")
 
     print(f"  Moved: {moved} files")
@@ -179,13 +194,11 @@ def step1_move_radon():
 # ─────────────────────────────────────────────────────────────────────────────
 def step2_fix_mice_page():
     print("\n── STEP 2: Fix house-burping-or-mice.html ─────────────────")
-    src = "pages/pest-noises-vs-house-settling.html"
-    dst = "pages/house-burping-or-mice.html"
+    src, dst = MICE_PAGE_MOVE
 
-    if os.path.exists(dst):
+    if exists(dst):
         print(f"  OK (already exists): {dst}")
-    elif os.path.exists(src):
-        backup(dst)
+    elif exists(src):
         content = rread(src)
         # Fix canonical to point to correct URL
         content = re.sub(
@@ -208,70 +221,92 @@ def step2_fix_mice_page():
 # ─────────────────────────────────────────────────────────────────────────────
 # STEP 3: Fix all links across all HTML files
 # ─────────────────────────────────────────────────────────────────────────────
+LINK_FIX_TARGETS = {wrong.strip('"') for wrong in LINK_FIXES}
+
+
+def needs_link_fixes(filepath):
+    """Decide from the cached page record whether any step-3 fix applies."""
+    rec = page(filepath)
+    return (
+        filepath in CANONICAL_FIXES
+        or not LINK_FIX_TARGETS.isdisjoint(rec.urls)
+        or (not rec.adsense and rec.head_close)
+        or (not rec.hub_link and rec.home_nav)
+    )
+
+
+def fix_links(filepath, content):
+    """Step-3 fixes for one page. Returns (content, [change descriptions])."""
+    file_changes = []
+
+    # Apply all link fixes
+    for wrong, correct in LINK_FIXES.items():
+        if wrong in content:
+            content = content.replace(wrong, correct)
+            file_changes.append(f"link: {wrong} → {correct}")
+
+    # Fix canonical for files with known correct canonicals
+    if filepath in CANONICAL_FIXES:
+        correct_url = CANONICAL_FIXES[filepath]
+        new = re.sub(
+            r'<link rel="canonical" href="[^"]*"',
+            f'<link rel="canonical" href="{correct_url}"',
+            content
+        )
+        if new != content:
+            content = new
+            file_changes.append(f"canonical fixed")
+
+        # Fix og:url to match
+        new = re.sub(
+            r'(<meta property="og:url" content=")[^"]*(")',
+            rf'\g<1>{correct_url}\g<2>',
+            content
+        )
+        if new != content:
+            content = new
+            file_changes.append("og:url fixed")
+
+    # Ensure the AdSense account tag is present (js/main.js loads the
+    # ad script itself after first paint — see ads.py)
+    if ADSENSE_CLIENT not in content and '</head>' in content:
+        adsense = f'\n  <meta content="{ADSENSE_CLIENT}" name="google-adsense-account"/>'
+        content = content.replace('</head>', f'{adsense}\n</head>')
+        file_changes.append("AdSense account tag added")
+
+    # Ensure hub nav link exists in nav
+    if 'href="/pages/"' not in content and 'All Articles' not in content:
+        # Try to inject after Home nav link
+        for pattern in ['<li><a href="/">Home</a></li>', "<li><a href='/'>Home</a></li>"]:
+            if pattern in content:
+                content = content.replace(
+                    pattern,
+                    pattern + '\n        <li><a href="/pages/">All Articles</a></li>'
+                )
+                file_changes.append("hub nav link added")
+                break
+
+    return content, file_changes
+
+
 def step3_fix_links():
     print("\n── STEP 3: Fix all internal links ─────────────────────────")
 
     # All HTML files in root, pages/, and radon/
     all_files = (
-        glob.glob("*.html") +
-        glob.glob("pages/*.html") +
-        glob.glob("radon/*.html")
+        TX.glob("*.html") +
+        TX.glob("pages/*.html") +
+        TX.glob("radon/*.html")
     )
 
     total_changes = 0
-    for filepath in sorted(all_files):
+    for filepath in profiling.each(sorted(all_files)):
+        if not needs_link_fixes(filepath):
+            continue
         original = rread(filepath)
-        content  = original
-        file_changes = []
-
-        # Apply all link fixes
-        for wrong, correct in LINK_FIXES.items():
-            if wrong in content:
-                content = content.replace(wrong, correct)
-                file_changes.append(f"link: {wrong} → {correct}")
-
-        # Fix canonical for files with known correct canonicals
-        if filepath in CANONICAL_FIXES:
-            correct_url = CANONICAL_FIXES[filepath]
-            new = re.sub(
-                r'<link rel="canonical" href="[^"]*"',
-                f'<link rel="canonical" href="{correct_url}"',
-                content
-            )
-            if new != content:
-                content = new
-                file_changes.append(f"canonical fixed")
-
-            # Fix og:url to match
-            new = re.sub(
-                r'(<meta property="og:url" content=")[^"]*(")',
-                rf'\g<1>{correct_url}\g<2>',
-                content
-            )
-            if new != content:
-                content = new
-                file_changes.append("og:url fixed")
-
-        # Ensure AdSense tag is present
-        if 'ca-pub-3688809656284836' not in content and '</head>' in content:
-            adsense = '\n  <script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-3688809656284836" crossorigin="anonymous"></script>'
-            content = content.replace('</head>', f'{adsense}\n</head>')
-            file_changes.append("AdSense tag added")
-
-        # Ensure hub nav link exists in nav
-        if 'href="/pages/"' not in content and 'All Articles' not in content:
-            # Try to inject after Home nav link
-            for pattern in ['<li><a href="/">Home</a></li>', "<li><a href='/'>Home</a></li>"]:
-                if pattern in content:
-                    content = content.replace(
-                        pattern,
-                        pattern + '\n        <li><a href="/pages/">All Articles</a></li>'
-                    )
-                    file_changes.append("hub nav link added")
-                    break
+        content, file_changes = fix_links(filepath, original)
 
         if content != original:
-            backup(filepath)
             wwrite(filepath, content)
             total_changes += len(file_changes)
             print(f"  ✅ {filepath}")
@@ -316,7 +351,7 @@ def step4_fix_radon_internal_links():
     }
 
     for filepath in radon_in_pages:
-        if not os.path.exists(filepath):
+        if not exists(filepath):
             continue
         original = rread(filepath)
         content  = original
@@ -336,7 +371,6 @@ def step4_fix_radon_internal_links():
             changes.append("js path fixed")
 
         if content != original:
-            backup(filepath)
             wwrite(filepath, content)
             print(f"  ✅ {filepath}")
             for c in changes:
@@ -350,11 +384,18 @@ def step4_fix_radon_internal_links():
 # ─────────────────────────────────────────────────────────────────────────────
 def step5_rebuild_sitemap():
     print("\n── STEP 5: Rebuild sitemap.xml ─────────────────────────────")
-    backup("sitemap.xml")
+    import indexnow  # only this step needs it
     today = datetime.now().strftime("%Y-%m-%d")
+    ledger = indexnow.load_ledger()
+
+    def lastmod(url):
+        """The day the page's content last changed (indexnow.py ledger), else today."""
+        path = url[len(BASE_URL) + 1:]
+        path = path + "index.html" if path.endswith("/") or not path else path
+        return indexnow.lastmod(path, TX.path(path), ledger) or today
 
     entries = "\n".join(
-        f"  <url>\n    <loc>{url}</loc>\n    <lastmod>{today}</lastmod>\n    <priority>{pri}</priority>\n  </url>"
+        f"  <url>\n    <loc>{url}</loc>\n    <lastmod>{lastmod(url)}</lastmod>\n    <priority>{pri}</priority>\n  </url>"
         for url, pri in SITEMAP_URLS
     )
 
@@ -366,6 +407,13 @@ def step5_rebuild_sitemap():
     wwrite("sitemap.xml", sitemap)
     print(f"  ✅ sitemap.xml rebuilt with {len(SITEMAP_URLS)} URLs")
 
+    for url, _ in SITEMAP_URLS:
+        path = url[len(BASE_URL) + 1:] or "index.html"
+        if not exists(path):
+            print(f"  ⚠️  In sitemap but missing: {path}")
+        elif page(path).canonical not in ("", url):
+            print(f"  ⚠️  {path} canonical is {page(path).canonical}")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # STEP 6: Verify — print any remaining issues
@@ -395,20 +443,19 @@ def step6_verify():
 
     all_ok = True
     for f in expected_files:
-        exists = os.path.exists(f)
-        size   = os.path.getsize(f) if exists else 0
-        status = "✅" if exists and size > 500 else ("⚠️ TINY" if exists else "❌ MISSING")
-        if not exists or size < 500:
+        found  = exists(f)
+        size   = TX.getsize(f) if found else 0
+        status = "✅" if found and size > 500 else ("⚠️ TINY" if found else "❌ MISSING")
+        if not found or size < 500:
             all_ok = False
-        print(f"  {status}  {f}  ({size:,} bytes)" if exists else f"  {status}  {f}")
+        print(f"  {status}  {f}  ({size:,} bytes)" if found else f"  {status}  {f}")
 
     # Check for radon/ links still in pages/
     print("\n  Checking for leftover /radon/ links in pages/...")
-    pages = glob.glob("pages/*.html")
+    pages = TX.glob("pages/*.html")
     radon_link_found = False
-    for filepath in pages:
-        content = rread(filepath)
-        if '/radon/' in content or '../radon/' in content:
+    for filepath in profiling.each(pages):
+        if page(filepath).links_to('/radon/'):
             print(f"  ⚠️  Still has /radon/ link: {filepath}")
             radon_link_found = True
     if not radon_link_found:
@@ -419,13 +466,39 @@ def step6_verify():
     else:
         print("\n  ⚠️  Some issues remain — see above.")
 
-    print(f"\n  Backups saved at: {BACKUP}/")
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────────────────────────────────────────
-def main():
+STEPS = [
+    step1_move_radon,
+    step2_fix_mice_page,
+    step3_fix_links,
+    step4_fix_radon_internal_links,
+    step5_rebuild_sitemap,
+    step6_verify,
+]
+READ_ONLY_STEPS = {step6_verify}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Move radon/ into pages/, fix links, rebuild sitemap.")
+    parser.add_argument("--only", type=int, action="append", metavar="STEP", choices=range(1, len(STEPS) + 1),
+                        help="run just this step (repeatable): --only 5 rebuilds the sitemap, --only 6 verifies")
+    profiling.add_profile_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiling.start("fix_final", args)
+    try:
+        run_steps([STEPS[n - 1] for n in sorted(set(args.only))] if args.only else STEPS)
+    finally:
+        profiling.finish()
+
+
+def run_steps(steps=STEPS):
     print("=" * 60)
     print("MyHouseIsBurping.com — Final Fix Script")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -440,14 +513,42 @@ def main():
         print("          python fix_final.py")
         return
 
-    os.makedirs(BACKUP, exist_ok=True)
-
-    step1_move_radon()
-    step2_fix_mice_page()
-    step3_fix_links()
-    step4_fix_radon_internal_links()
-    step5_rebuild_sitemap()
-    step6_verify()
+    global TX
+    # Verification only reads: no mirrored tree, no snapshot
+    read_only = all(step in READ_ONLY_STEPS for step in steps)
+    snap_run = None if read_only else snapshots.begin_run("fix_final")
+    TX = staging.Transaction("fix_final", run=snap_run).begin(overlay=read_only)
+    if not read_only:
+        print(f"\nStaging tree: {TX.tree} ({TX.linked} hardlinked, {TX.copied} copied)")
+    saved = None
+    try:
+        for step in steps:
+            with profiling.span(step.__name__):
+                step()
+        if read_only:
+            TX.abort()
+            return
+        changed, removed = TX.commit()
+    except staging.ValidationError as e:
+        TX.abort()
+        print("\n❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return
+    except BaseException:
+        TX.abort()
+        print("\n❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            saved = snap_run.save()
+
+    print(f"\n✅ Swapped {len(changed)} changed files into place")
+    if saved:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python snapshots.py rollback {snap_run.id})")
+    if not changed and not removed:
+        print("   Nothing changed — the site is already up to date.")
+        return
 
     print("\n" + "=" * 60)
     print("DONE — Now run:")
@@ -458,7 +559,7 @@ def main():
     print()
     print("Then in Google Search Console:")
     print("  → Sitemaps → Submit: https://www.myhouseisburping.com/sitemap.xml")
-    print("  → URL Inspection → Request indexing on radon-hub.html and pages/index.html")
+    print("And tell search engines what changed: python3 indexnow.py submit")
     print("=" * 60)
 
 
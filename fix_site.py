@@ -1,22 +1,25 @@
 #!/usr/bin/env python3
 """
 MyHouseIsBurping.com - Technical SEO Fix Script
-Run from the ROOT of your site directory: python3 fix_site.py
-Creates backups before making any changes.
+Run from the ROOT of your site directory: python3 fix_site.py [--profile]
+All edits are staged and swapped in together only if the whole run succeeds.
+Every replaced file is snapshotted (undo: python3 snapshots.py rollback last).
 """
 
 import os
 import re
-import shutil
-import glob
-from datetime import datetime
+import argparse
+
+import profiling
+import snapshots
+import staging
+from site_config import BASE_URL
 
 # ─────────────────────────────────────────
 # CONFIGURATION
 # ─────────────────────────────────────────
 SITE_ROOT = "."  # Run from site root
-BASE_URL = "https://www.myhouseisburping.com"
-BACKUP_DIR = f"_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+TX = None  # staging.Transaction for this invocation, set in main()
 
 # ─────────────────────────────────────────
 # URL FIXES: wrong slug → correct slug
@@ -34,6 +37,8 @@ URL_FIXES = {
 
 # ─────────────────────────────────────────
 # CORRECT METADATA for pages with wrong title/description
+# (hand-written legacy pages only — generated articles get their head,
+#  canonical and og:url rendered correctly by page_head.py)
 # ─────────────────────────────────────────
 METADATA_FIXES = {
     "pages/house-burping-allergies-ventilation.html": {
@@ -82,19 +87,27 @@ SITEMAP_PAGES = [
 # ─────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────
-def backup_file(path):
-    dest = os.path.join(BACKUP_DIR, path)
-    os.makedirs(os.path.dirname(dest), exist_ok=True)
-    if os.path.exists(path):
-        shutil.copy2(path, dest)
-
 def read(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    return TX.read(path)
 
 def write(path, content):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    TX.write(path, content)
+
+def needs_fixes(filepath):
+    """
+    Decide from the cached page record (pagecache.py) whether fix_all
+    has anything to do here, so untouched pages are never opened.
+    """
+    if filepath in METADATA_FIXES:
+        return True
+    rec = TX.page(filepath)
+    for wrong in URL_FIXES:
+        if wrong == "is-house-burping-normal.html" and "allergies-ventilation" not in filepath:
+            continue
+        if any(f"pages/{wrong}" in ref for ref in rec.refs):
+            return True
+    return False
+
 
 def fix_urls_in_content(content, filename):
     """Replace all wrong URLs with correct ones in HTML content."""
@@ -158,6 +171,58 @@ def fix_og_description(content, new_desc):
     return re.sub(pattern, replacement, content)
 
 
+def fix_page(filepath, content):
+    """URL and metadata fixes for one page. Returns (content, [change descriptions])."""
+    file_changes = []
+
+    # Fix broken internal links in ALL files
+    content, link_changes = fix_urls_in_content(content, filepath)
+    file_changes.extend(link_changes)
+
+    # Apply per-file metadata fixes
+    if filepath in METADATA_FIXES:
+        fixes = METADATA_FIXES[filepath]
+        
+        if "canonical" in fixes:
+            content, changed = fix_canonical(content, fixes["canonical"])
+            if changed:
+                file_changes.append(f"  Canonical → {fixes['canonical']}")
+        
+        if "title" in fixes:
+            new = fix_title(content, fixes["title"])
+            if new != content:
+                content = new
+                file_changes.append(f"  Title → {fixes['title']}")
+        
+        if "description" in fixes:
+            new = fix_meta_description(content, fixes["description"])
+            if new != content:
+                content = new
+                file_changes.append(f"  Meta description updated")
+        
+        if "og_title" in fixes:
+            new = fix_og_title(content, fixes["og_title"])
+            if new != content:
+                content = new
+                file_changes.append(f"  OG title updated")
+        
+        if "og_description" in fixes:
+            new = fix_og_description(content, fixes["og_description"])
+            if new != content:
+                content = new
+                file_changes.append(f"  OG description updated")
+
+    # Always fix og:url to match canonical for metadata-listed pages
+    if filepath in METADATA_FIXES and "canonical" in METADATA_FIXES[filepath]:
+        canonical_url = METADATA_FIXES[filepath]["canonical"]
+        new, changed = fix_og_url(content, canonical_url)
+        if changed:
+            content = new
+            file_changes.append(f"  OG URL → {canonical_url}")
+
+    return content, file_changes
+
+
 def generate_sitemap():
     entries = []
     for path, priority, lastmod in SITEMAP_PAGES:
@@ -181,7 +246,22 @@ def generate_sitemap():
 # ─────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fix canonicals, links and metadata; rebuild sitemap.")
+    profiling.add_profile_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiling.start("fix_site", args)
+    try:
+        run()
+    finally:
+        profiling.finish()
+
+
+def run():
     print("=" * 60)
     print("MyHouseIsBurping.com — Technical SEO Fix Script")
     print("=" * 60)
@@ -191,65 +271,61 @@ def main():
         print("   Expected to find index.html in the current folder.")
         return
 
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-    print(f"\n✅ Backup directory created: {BACKUP_DIR}/")
+    global TX
+    snap_run = snapshots.begin_run("fix_site")
+    TX = staging.Transaction("fix_site", run=snap_run).begin()
+    saved = None
+    print(f"\n✅ Staging tree: {TX.tree} ({TX.linked} hardlinked, {TX.copied} copied)")
+    try:
+        with profiling.span("fix_all"):
+            html_files, total_changes = fix_all()
+        changed, _ = TX.commit()
+    except staging.ValidationError as e:
+        TX.abort()
+        print("\n❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return
+    except BaseException:
+        TX.abort()
+        print("\n❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        saved = snap_run.save()
+
+    # ── 4. Summary ─────────────────────────────────────────
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    print(f"  Files scanned:    {len(html_files) + 1}")
+    print(f"  Total fixes made: {total_changes}")
+    print(f"  Files swapped in: {len(changed)}")
+    print(f"  Sitemap entries:  {len(SITEMAP_PAGES)}")
+    if saved:
+        print(f"  Snapshot run:     {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    print("""
+NEXT STEPS:
+  1. Upload changed files: python3 publish.py publish --to <host>
+  2. Go to Google Search Console → Sitemaps
+  3. Submit: https://www.myhouseisburping.com/sitemap.xml
+  4. Tell search engines what changed: python3 indexnow.py submit
+  5. Run generate_articles.py to start content expansion
+""")
+
 
+def fix_all():
     # ── 1. Fix all HTML files ──────────────────────────────
-    html_files = glob.glob("*.html") + glob.glob("pages/*.html")
+    html_files = TX.glob("*.html") + TX.glob("pages/*.html")
     print(f"\n📄 Processing {len(html_files)} HTML files...\n")
 
     total_changes = 0
 
-    for filepath in sorted(html_files):
-        backup_file(filepath)
-        content = read(filepath)
-        original = content
-        file_changes = []
-
-        # Fix broken internal links in ALL files
-        content, link_changes = fix_urls_in_content(content, filepath)
-        file_changes.extend(link_changes)
-
-        # Apply per-file metadata fixes
-        if filepath in METADATA_FIXES:
-            fixes = METADATA_FIXES[filepath]
-            
-            if "canonical" in fixes:
-                content, changed = fix_canonical(content, fixes["canonical"])
-                if changed:
-                    file_changes.append(f"  Canonical → {fixes['canonical']}")
-            
-            if "title" in fixes:
-                new = fix_title(content, fixes["title"])
-                if new != content:
-                    content = new
-                    file_changes.append(f"  Title → {fixes['title']}")
-            
-            if "description" in fixes:
-                new = fix_meta_description(content, fixes["description"])
-                if new != content:
-                    content = new
-                    file_changes.append(f"  Meta description updated")
-            
-            if "og_title" in fixes:
-                new = fix_og_title(content, fixes["og_title"])
-                if new != content:
-                    content = new
-                    file_changes.append(f"  OG title updated")
-            
-            if "og_description" in fixes:
-                new = fix_og_description(content, fixes["og_description"])
-                if new != content:
-                    content = new
-                    file_changes.append(f"  OG description updated")
-
-        # Always fix og:url to match canonical for metadata-listed pages
-        if filepath in METADATA_FIXES and "canonical" in METADATA_FIXES[filepath]:
-            canonical_url = METADATA_FIXES[filepath]["canonical"]
-            new, changed = fix_og_url(content, canonical_url)
-            if changed:
-                content = new
-                file_changes.append(f"  OG URL → {canonical_url}")
+    for filepath in profiling.each(sorted(html_files)):
+        if not needs_fixes(filepath):
+            print(f"   OK:    {filepath} (no changes needed)")
+            continue
+        original = read(filepath)
+        content, file_changes = fix_page(filepath, original)
 
         if content != original:
             write(filepath, content)
@@ -262,14 +338,19 @@ def main():
 
     # ── 2. Rebuild sitemap.xml ─────────────────────────────
     print("\n🗺️  Rebuilding sitemap.xml...")
-    backup_file("sitemap.xml")
     sitemap_content = generate_sitemap()
     write("sitemap.xml", sitemap_content)
     print(f"✅ sitemap.xml rebuilt with {len(SITEMAP_PAGES)} correct URLs")
+    for path, _, _ in SITEMAP_PAGES:
+        path = path or "index.html"
+        url = f"{BASE_URL}/{path}" if path != "index.html" else BASE_URL + "/"
+        if not TX.exists(path):
+            print(f"⚠️  In sitemap but missing: {path}")
+        elif TX.page(path).canonical not in ("", url):
+            print(f"⚠️  {path} canonical is {TX.page(path).canonical}")
 
     # ── 3. Fix robots.txt ─────────────────────────────────
-    if os.path.exists("robots.txt"):
-        backup_file("robots.txt")
+    if TX.exists("robots.txt"):
         robots = read("robots.txt")
         # Ensure sitemap URL is www version
         if "myhouseisburping.com/sitemap.xml" in robots and "www." not in robots.split("Sitemap:")[1]:
@@ -280,22 +361,7 @@ def main():
             write("robots.txt", robots)
             print("✅ robots.txt: Fixed sitemap URL to www version")
 
-    # ── 4. Summary ─────────────────────────────────────────
-    print("\n" + "=" * 60)
-    print("SUMMARY")
-    print("=" * 60)
-    print(f"  Files scanned:    {len(html_files) + 1}")
-    print(f"  Total fixes made: {total_changes}")
-    print(f"  Sitemap entries:  {len(SITEMAP_PAGES)}")
-    print(f"  Backup saved to:  {BACKUP_DIR}/")
-    print("""
-NEXT STEPS:
-  1. Upload all changed files to your host
-  2. Go to Google Search Console → Sitemaps
-  3. Submit: https://www.myhouseisburping.com/sitemap.xml
-  4. Request indexing on the 4 pages with fixed canonicals
-  5. Run generate_articles.py to start content expansion
-""")
+    return html_files, total_changes
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Pre-flight Cost Forecast
+Shared by generate_articles.py and rewrite_site.py (--plan mode).
+
+Counts input tokens for every rendered prompt BEFORE any paid call and
+predicts output tokens from the ratios recorded in the cost logs, so the
+todo list can be scheduled to fit inside the remaining budget.
+
+Token counting:
+  - Local (default): chars-per-token ratio calibrated against the
+    input_tokens actually billed in the cost log.
+  - Exact (--exact):  Anthropic's free count_tokens endpoint, cached on disk
+    by prompt hash so each distinct prompt is only ever counted once.
+"""
+
+import os
+import hashlib
+import statistics
+
+from site_config import load_json, save_json
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+TOKEN_CACHE_FILE = os.path.join("_cache", "token_counts.json")
+
+# Fallback when the cost log has nothing to calibrate against.
+# English prose + HTML markup averages ~3.5-4 chars per Claude token.
+DEFAULT_CHARS_PER_TOKEN = 3.7
+
+
+# ─────────────────────────────────────────
+# TOKEN COUNTING
+# ─────────────────────────────────────────
+def estimate_tokens(text, chars_per_token=DEFAULT_CHARS_PER_TOKEN):
+    """Local token estimate — no network, no tokenizer download."""
+    return max(1, round(len(text) / chars_per_token))
+
+
+def calibrate_chars_per_token(samples):
+    """
+    samples: [(prompt_chars, billed_input_tokens), ...] — the length of
+    the prompt that was actually billed, not of a re-rendered one.
+    Returns the median chars-per-token ratio, or the default if no samples.
+    """
+    ratios = [chars / tokens for chars, tokens in samples if tokens]
+    if not ratios:
+        return DEFAULT_CHARS_PER_TOKEN
+    return statistics.median(ratios)
+
+
+def _prompt_key(model, system, prompt):
+    h = hashlib.sha256()
+    for part in (model, system, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def load_token_cache():
+    return load_json(TOKEN_CACHE_FILE, {})
+
+
+def save_token_cache(cache):
+    save_json(TOKEN_CACHE_FILE, cache, sort_keys=True)
+
+
+def count_tokens_exact(client, model, system, prompt, cache):
+    """
+    Exact input token count via the count_tokens endpoint (free, no
+    generation). Results are cached by prompt hash in `cache`.
+    """
+    key = _prompt_key(model, system, prompt)
+    if key not in cache:
+        result = client.messages.count_tokens(
+            model=model,
+            system=system,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        cache[key] = result.input_tokens
+    return cache[key]
+
+
+# ─────────────────────────────────────────
+# OUTPUT PREDICTION
+# ─────────────────────────────────────────
+def median_ratio(pairs, default):
+    """Median of numerator/denominator over logged (num, den) pairs."""
+    ratios = [num / den for num, den in pairs if den]
+    return statistics.median(ratios) if ratios else default
+
+
+def predict_output_tokens(basis, ratio, max_tokens):
+    """Output tokens predicted as basis * ratio, capped at max_tokens."""
+    return min(max_tokens, max(1, round(basis * ratio)))
+
+
+# ─────────────────────────────────────────
+# SCHEDULING
+# ─────────────────────────────────────────
+def schedule(rows, budget):
+    """
+    rows: forecast dicts in priority order, each with a "worst_cost" key.
+    Walks the list in priority order and takes every item whose worst-case
+    cost still fits; items that don't fit are deferred (a cheaper,
+    lower-priority item may still fit behind them).
+    Returns (scheduled, deferred).
+    """
+    scheduled, deferred = [], []
+    remaining = budget
+    for row in rows:
+        if row["worst_cost"] <= remaining:
+            scheduled.append(row)
+            remaining -= row["worst_cost"]
+        else:
+            deferred.append(row)
+    return scheduled, deferred
+
+
+def print_forecast(rows, scheduled, deferred, budget_remaining, label):
+    """Per-item and total forecast table."""
+    scheduled_ids = {id(r) for r in scheduled}
+
+    print(f"\n{'':2} {label:<52} {'in':>6} {'out':>6} {'cost':>9} {'worst':>9}")
+    print("  " + "─" * 90)
+    for row in rows:
+        mark = "✅" if id(row) in scheduled_ids else "⏭️ "
+        name = row["name"] if len(row["name"]) <= 52 else row["name"][:49] + "..."
+        print(f"{mark} {name:<52} {row['input_tokens']:>6} {row['output_tokens']:>6} "
+              f"${row['cost']:>8.5f} ${row['worst_cost']:>8.5f}")
+    print("  " + "─" * 90)
+
+    def total(items, key):
+        return sum(r[key] for r in items)
+
+    print(f"  Forecast (all {len(rows)}):       ${total(rows, 'cost'):.4f} "
+          f"(worst case ${total(rows, 'worst_cost'):.4f})")
+    print(f"  Forecast (scheduled {len(scheduled)}): ${total(scheduled, 'cost'):.4f} "
+          f"(worst case ${total(scheduled, 'worst_cost'):.4f})")
+    print(f"  Budget remaining:         ${budget_remaining:.4f}")
+    if deferred:
+        print(f"\n  ⏭️  {len(deferred)} deferred — would exceed the remaining budget:")
+        for row in deferred:
+            print(f"     · {row['name']}")
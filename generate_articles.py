@@ -12,35 +12,55 @@ Usage:
   pip install anthropic
   export ANTHROPIC_API_KEY=sk-ant-...
   python3 generate_articles.py
+  python3 generate_articles.py --plan          # forecast cost, no paid calls
+  python3 generate_articles.py --plan --exact  # exact input counts (free endpoint)
+
+Offline / load testing (see api_harness.py, fake_api.py):
+  python3 generate_articles.py --record calls.jsonl   # capture real calls
+  python3 generate_articles.py --replay calls.jsonl   # re-run them for free
+  python3 generate_articles.py --base-url http://127.0.0.1:8765 --synthetic 2000 --delay 0
+
+--synthetic refuses to run without --base-url or --replay, and writes its
+pages and cost log to a fresh temporary directory, never ./pages/.
 """
 
-import anthropic
+import argparse
 import os
-import json
 import time
+import tempfile
 from datetime import datetime
 
+import profiling
+from api_harness import add_client_args, make_client, offline
+from site_config import MODEL, BUDGET, api_cost, load_json, save_json
+from telemetry import Telemetry
+from page_head import render_head, wrap_page
+from forecast import (
+    estimate_tokens, calibrate_chars_per_token, count_tokens_exact,
+    load_token_cache, save_token_cache, median_ratio,
+    predict_output_tokens, schedule, print_forecast,
+)
+
 # ─────────────────────────────────────────
 # CONFIGURATION
 # ─────────────────────────────────────────
-MODEL = "claude-haiku-4-5-20251001"  # Cheapest — use for bulk generation
-# MODEL = "claude-sonnet-4-6"        # Smarter — use for highest-priority pages
-
+# Model, pricing and BUDGET live in site_config.py (shared with rewrite_site.py)
 PAGES_DIR = "pages"
-BASE_URL = "https://www.myhouseisburping.com"
 TODAY = datetime.now().strftime("%Y-%m-%d")
 
 # Track spend
 COST_LOG_FILE = "api_cost_log.json"
-# Haiku pricing (per million tokens)
-INPUT_COST_PER_M  = 0.80
-OUTPUT_COST_PER_M = 4.00
+MAX_TOKENS = 4096
+
+# Output tokens per target word, used until the cost log has history
+DEFAULT_OUTPUT_TOKENS_PER_WORD = 2.7
 
 
 # ─────────────────────────────────────────
 # CONTENT PLAN: Priority articles to generate
 # Format: (slug, title, target_keyword, search_intent, notes)
-# Ordered by SEO priority (GSC data + keyword research)
+# Ordered by SEO priority (GSC data + keyword research); once traffic.py
+# has imported GSC data, generate() re-orders by measured opportunity
 # ─────────────────────────────────────────
 ARTICLES = [
     # ── TIER 1: High-impression, low-ranking (quick wins) ──
@@ -338,142 +358,240 @@ def build_prompt(article):
         for url, anchor_text in article["internal_links"]
     )
     
-    return f"""Write a complete, SEO-optimized HTML article for MyHouseIsBurping.com.
+    if article["schema_type"] == "HowTo":
+        schema_rule = ('Put the main fix in ONE <ol class="howto-steps">; start each <li> '
+                       'with a <strong>short step name</strong>, then the instructions')
+    else:
+        schema_rule = ("Phrase every H2 as a full question, and make the first <p> after "
+                       "each H2 a direct 1-3 sentence answer to it")
+
+    return f"""Write the BODY of an SEO-optimized HTML article for MyHouseIsBurping.com.
 
 TARGET KEYWORD: "{article['keyword']}"
 PAGE TITLE: {article['title']}
-SLUG: /pages/{article['slug']}.html
-CANONICAL URL: {BASE_URL}/pages/{article['slug']}.html
 TARGET WORD COUNT: ~{article['word_count']} words
-SCHEMA TYPE: {article['schema_type']}
 SEARCH INTENT: {article['intent']}
 
 REQUIRED INTERNAL LINKS (use all of them naturally in the body):
 {internal_links_str}
 
 OUTPUT REQUIREMENTS:
-1. Output ONLY the content inside <main>...</main> plus the <head> metadata block
+1. Start with the <h1> (the page title) and end with the last section — nothing else
 2. Follow the exact HTML structure of the existing site pages
-3. Include proper Schema.org JSON-LD for {article['schema_type']}
-4. Include a breadcrumb: Home > Causes > {article['title']}
-5. Include a `.direct-answer` box immediately after h1
-6. Include at least one `.comparison-table` with thead/tbody
-7. End with a `.related-questions` section with 3 question cards
-8. Include one `.ad-slot` div (just placeholder text: <span>Advertisement Space</span>)
-9. The <title> tag must contain the target keyword
-10. The meta description must be 150-160 chars and contain the keyword
+3. Include a `.direct-answer` box immediately after h1; its first sentence must contain
+   the target keyword and read well on its own (it becomes the meta description)
+4. Include at least one `.comparison-table` with thead/tbody
+5. End with a `.related-questions` section with 3 question cards
+6. Include one `.ad-slot` div (just placeholder text: <span>Advertisement Space</span>)
+7. {schema_rule}
 
-Start your output with the complete <head> block, then the <body> content.
-Do NOT include <html>, <header nav>, or <footer> — those are added by the template system.
-DO include the full <head> with all meta tags, canonical, og tags, and schema JSON-LD."""
+Do NOT output <html>, <head>, meta tags, JSON-LD, a breadcrumb, <header nav>, <main>,
+or <footer> — the template system renders all of those from the page plan."""
 
 
 # ─────────────────────────────────────────
 # COST TRACKING
 # ─────────────────────────────────────────
 def load_cost_log():
-    if os.path.exists(COST_LOG_FILE):
-        with open(COST_LOG_FILE) as f:
-            return json.load(f)
-    return {"total_spent": 0.0, "articles_generated": [], "sessions": []}
+    return load_json(COST_LOG_FILE, {"total_spent": 0.0, "articles_generated": [], "sessions": []})
 
 
 def save_cost_log(log):
-    with open(COST_LOG_FILE, "w") as f:
-        json.dump(log, f, indent=2)
+    save_json(COST_LOG_FILE, log)
+
 
+# ─────────────────────────────────────────
+# PRE-FLIGHT FORECAST
+# ─────────────────────────────────────────
+def forecast_articles(todo, cost_log, client=None):
+    """
+    Forecast input/output tokens and cost for each article in `todo`.
+    Input tokens: local estimate calibrated against the prompt_chars and
+    input_tokens logged for each generated article (or exact counts if
+    `client` is given). Re-rendering an old article's prompt would measure
+    today's prompt template, not the one that was billed.
+    Output tokens: historical output_tokens / word_count ratio.
+    """
+    by_slug = {a["slug"]: a for a in ARTICLES}
+    history = [e for e in cost_log["articles_generated"] if e["slug"] in by_slug]
+
+    chars_per_token = calibrate_chars_per_token([
+        (e["prompt_chars"], e["input_tokens"])
+        for e in cost_log["articles_generated"] if "prompt_chars" in e
+    ])
+    tokens_per_word = median_ratio(
+        [(e["output_tokens"], by_slug[e["slug"]]["word_count"]) for e in history],
+        DEFAULT_OUTPUT_TOKENS_PER_WORD,
+    )
 
-def calculate_cost(input_tokens, output_tokens):
-    return (input_tokens / 1_000_000 * INPUT_COST_PER_M) + \
-           (output_tokens / 1_000_000 * OUTPUT_COST_PER_M)
+    token_cache = load_token_cache() if client else None
+    rows = []
+    for article in todo:
+        prompt = build_prompt(article)
+        if client:
+            input_tokens = count_tokens_exact(client, MODEL, SYSTEM_PROMPT, prompt, token_cache)
+        else:
+            input_tokens = estimate_tokens(SYSTEM_PROMPT + prompt, chars_per_token)
+        output_tokens = predict_output_tokens(article["word_count"], tokens_per_word, MAX_TOKENS)
+        rows.append({
+            "name": article["slug"],
+            "article": article,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": api_cost(input_tokens, output_tokens),
+            "worst_cost": api_cost(input_tokens, MAX_TOKENS),
+        })
+    if client:
+        save_token_cache(token_cache)
+    return rows
 
 
 # ─────────────────────────────────────────
-# PAGE WRAPPER (adds nav/footer around generated content)
+# MODEL OUTPUT CLEANUP
 # ─────────────────────────────────────────
-def wrap_page(head_content, body_content, article):
-    """Wraps generated content in the site's nav and footer."""
-    return f"""<!DOCTYPE html>
-<html lang="en">
-{head_content}
-
-<body>
-   <header class="site-header">
-      <div class="container nav-container" style="display: flex; justify-content: space-between; align-items: center;">
-         <a href="/" class="logo" aria-label="MyHouseIsBurping Home">
-            MyHouseIsBurping<span class="accent-orange">.com</span>
-         </a>
-         <button class="nav-toggle" aria-label="Toggle navigation" aria-expanded="false">
-            <span class="sr-only">Menu</span>☰
-         </button>
-         <nav aria-label="Main navigation">
-            <ul class="nav-menu">
-               <li><a href="/">Home</a></li>
-               <li><a href="/pages/house-burping-causes.html">Causes</a></li>
-               <li><a href="/pages/is-house-burping-normal.html">Is It Normal?</a></li>
-               <li><a href="/pages/how-to-stop-house-burping.html">Solutions</a></li>
-               <li><a href="/pages/when-to-call-a-professional.html">Get Help</a></li>
-            </ul>
-         </nav>
-      </div>
-   </header>
-
-{body_content}
-
-   <footer style="background: #2c3e50; color: #fff; padding: 2rem 0; text-align: center;">
-      <div class="container">
-         <p>© 2024 MyHouseIsBurping.com. All rights reserved.</p>
-         <p style="font-size: 0.8rem; opacity: 0.7;">Disclaimer: This website is for informational purposes only. Always consult a certified home inspector for structural concerns.</p>
-         <nav style="margin-top: 1rem;">
-            <a href="/" style="color: white; text-decoration: underline;">Home</a> |
-            <a href="/pages/when-to-call-a-professional.html" style="color: white; text-decoration: underline;">Professional Help</a>
-         </nav>
-      </div>
-   </footer>
-
-   <script src="../js/main.js"></script>
-</body>
-</html>"""
+def strip_fences(text):
+    """Drop a ```html ... ``` wrapper if the model added one."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
 
 
 # ─────────────────────────────────────────
 # MAIN GENERATOR
 # ─────────────────────────────────────────
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SEO articles with Claude.")
+    parser.add_argument("--plan", action="store_true",
+                        help="print a per-article cost forecast and schedule, then exit")
+    parser.add_argument("--exact", action="store_true",
+                        help="with --plan: exact input token counts via the free count_tokens endpoint")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="generate N synthetic articles instead of ARTICLES (load testing; "
+                             "needs --base-url or --replay, writes to a temp dir)")
+    parser.add_argument("--delay", type=float, default=1.0,
+                        help="seconds to wait between calls (default: 1.0)")
+    parser.add_argument("--fill", action="store_true",
+                        help="also plan articles for search queries no page ranks for (traffic.py gaps)")
+    add_client_args(parser)
+    profiling.add_profile_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiling.start("generate_articles", args)
+    try:
+        generate(args)
+    finally:
+        profiling.finish()
+
+
+def generate(args):
+    global PAGES_DIR, COST_LOG_FILE
+    import traffic  # sqlite3 — loaded only when a run starts, not for --help
+    if args.synthetic:
+        if not offline(args):
+            print("❌ --synthetic is a load test: add --base-url (fake_api.py) or --replay, "
+                  "or it sends every call to the paid API")
+            return
+        # Never mix load-test output into the real pages/ and cost log
+        scratch = tempfile.mkdtemp(prefix="synthetic-")
+        PAGES_DIR = os.path.join(scratch, "pages")
+        COST_LOG_FILE = os.path.join(scratch, "api_cost_log.json")
+        print(f"🧪 Synthetic run — output in {scratch}")
     api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
+    needs_client = not args.plan or args.exact
+    if needs_client and not api_key and not offline(args):
         print("❌ Set your API key: export ANTHROPIC_API_KEY=sk-ant-...")
         return
 
-    client = anthropic.Anthropic(api_key=api_key)
-    os.makedirs(PAGES_DIR, exist_ok=True)
+    telemetry = Telemetry("generate_articles")
+    client = make_client(args, api_key, telemetry, api_cost) if needs_client else None
+    if args.synthetic:
+        from fake_api import synthetic_articles  # pulls in http.server; load tests only
+        plan = synthetic_articles(args.synthetic)
+    else:
+        plan = ARTICLES
+    if traffic.exists() and not args.synthetic:
+        if args.fill:
+            plan = plan + traffic.gap_articles([a["keyword"] for a in plan])
+        plan = traffic.order_articles(plan)
 
     cost_log = load_cost_log()
-    session_cost = 0.0
-    session_articles = []
 
     print("=" * 60)
     print("MyHouseIsBurping.com — Article Generator")
     print(f"Model: {MODEL}")
-    print(f"Budget remaining: ${5.0 - cost_log['total_spent']:.3f}")
+    print(f"Budget remaining: ${BUDGET - cost_log['total_spent']:.3f}")
+    if traffic.exists() and not args.synthetic:
+        print(f"Order: search opportunity ({traffic.DB_FILE})")
     print("=" * 60)
 
     # Filter out already-generated articles
     already_done = {a["slug"] for a in cost_log["articles_generated"]}
-    todo = [a for a in ARTICLES if a["slug"] not in already_done]
+    todo = [a for a in plan if a["slug"] not in already_done]
     
     print(f"\n📝 {len(todo)} articles to generate ({len(already_done)} already done)\n")
 
-    for i, article in enumerate(todo, 1):
+    # Forecast every prompt up front and keep only what fits the budget
+    with profiling.span("forecast"):
+        rows = forecast_articles(todo, cost_log, client if args.exact else None)
+    scheduled, deferred = schedule(rows, BUDGET - cost_log["total_spent"])
+
+    if args.plan:
+        print_forecast(rows, scheduled, deferred, BUDGET - cost_log["total_spent"], "Article")
+        return
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    if deferred:
+        print(f"⏭️  Deferring {len(deferred)} articles that would exceed the budget "
+              f"(run with --plan for details)\n")
+
+    with profiling.span("generate"):
+        session_cost, session_articles = generate_articles(client, cost_log, scheduled, args.delay)
+
+    # Update cost log
+    cost_log["total_spent"] = round(cost_log["total_spent"] + session_cost, 5)
+    cost_log["sessions"].append({
+        "date": datetime.now().isoformat(),
+        "articles": len(session_articles),
+        "cost": round(session_cost, 5),
+    })
+    save_cost_log(cost_log)
+
+    print("=" * 60)
+    print("SESSION COMPLETE")
+    print("=" * 60)
+    print(f"  Articles generated this session: {len(session_articles)}")
+    print(f"  Session cost:                    ${session_cost:.4f}")
+    print(f"  Total spent:                     ${cost_log['total_spent']:.4f}")
+    print(f"  Budget remaining:                ${BUDGET - cost_log['total_spent']:.4f}")
+    metrics_path = telemetry.write()
+    if metrics_path:
+        print(f"  Call metrics:                    {metrics_path}  (python3 telemetry.py show)")
+    print(f"\nGenerated files are in: {os.path.join('.', PAGES_DIR, '')}")
+    print("Add them to your sitemap.xml and upload to your host.\n")
+
+
+def generate_articles(client, cost_log, scheduled, delay):
+    session_cost = 0.0
+    session_articles = []
+
+    for i, row in profiling.each(enumerate(scheduled, 1), name=lambda r: r[1]["article"]["slug"]):
+        article = row["article"]
         output_path = os.path.join(PAGES_DIR, f"{article['slug']}.html")
         
-        # Budget check
-        remaining = 5.0 - cost_log["total_spent"] - session_cost
-        if remaining < 0.05:
-            print(f"\n⚠️  Budget nearly exhausted (${remaining:.3f} left). Stopping.")
+        # Budget check — worst case for THIS article must still fit
+        remaining = BUDGET - cost_log["total_spent"] - session_cost
+        if remaining < row["worst_cost"]:
+            print(f"\n⚠️  Budget nearly exhausted (${remaining:.3f} left, "
+                  f"next article may cost ${row['worst_cost']:.3f}). Stopping.")
             break
 
-        print(f"[{i}/{len(todo)}] Generating: {article['title']}")
+        print(f"[{i}/{len(scheduled)}] Generating: {article['title']}")
         print(f"        Keyword: {article['keyword']}")
 
         try:
@@ -481,13 +599,15 @@ def main():
             
             message = client.messages.create(
                 model=MODEL,
-                max_tokens=4096,
+                max_tokens=MAX_TOKENS,
                 system=SYSTEM_PROMPT,
                 messages=[{"role": "user", "content": prompt}]
             )
 
-            content = message.content[0].text
-            cost = calculate_cost(message.usage.input_tokens, message.usage.output_tokens)
+            # Head, canonical, OG tags and JSON-LD are rendered locally
+            body = strip_fences(message.content[0].text)
+            content = wrap_page(render_head(article, body), body, article)
+            cost = api_cost(message.usage.input_tokens, message.usage.output_tokens)
             session_cost += cost
             
             # Save the file
@@ -503,6 +623,7 @@ def main():
                 "cost": round(cost, 5),
                 "input_tokens": message.usage.input_tokens,
                 "output_tokens": message.usage.output_tokens,
+                "prompt_chars": len(SYSTEM_PROMPT) + len(prompt),
                 "generated_at": datetime.now().isoformat(),
             }
             cost_log["articles_generated"].append(log_entry)
@@ -513,31 +634,14 @@ def main():
             print()
 
             # Rate limiting — be polite to the API
-            time.sleep(1)
+            time.sleep(delay)
 
         except Exception as e:
             print(f"        ❌ Error: {e}")
             print()
             continue
 
-    # Update cost log
-    cost_log["total_spent"] = round(cost_log["total_spent"] + session_cost, 5)
-    cost_log["sessions"].append({
-        "date": datetime.now().isoformat(),
-        "articles": len(session_articles),
-        "cost": round(session_cost, 5),
-    })
-    save_cost_log(cost_log)
-
-    print("=" * 60)
-    print("SESSION COMPLETE")
-    print("=" * 60)
-    print(f"  Articles generated this session: {len(session_articles)}")
-    print(f"  Session cost:                    ${session_cost:.4f}")
-    print(f"  Total spent:                     ${cost_log['total_spent']:.4f}")
-    print(f"  Budget remaining:                ${5.0 - cost_log['total_spent']:.4f}")
-    print(f"\nGenerated files are in: ./{PAGES_DIR}/")
-    print("Add them to your sitemap.xml and upload to your host.\n")
+    return session_cost, session_articles
 
 
 if __name__ == "__main__":
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Hub Listings from Page Metadata
+Run from the ROOT of your site directory: python3 hubs.py build
+
+pages/index.html and pages/radon-hub.html used to carry every card by
+hand, so both grew by one card per article and shipped the whole list on
+first load. Their listings are now generated from the parsed-page cache
+(title, description, canonical of every page under pages/):
+
+  · each page lands in one topic (TOPICS; first keyword match on its
+    slug, in MATCH_ORDER), pinned pillars first, then by title, with
+    data-rendered pages (radon_states.py) last
+  · a hub renders FIRST_SCREEN cards per topic statically, between the
+    HUB_LIST markers — everything else on the page stays hand-written
+  · the rest of a topic's first page loads on demand: js/main.js turns
+    the "more" link into fetches of hubs/<topic>-<n>.json (CHUNK cards
+    each, prefetched when the link nears the viewport), cloning the
+    hub's own first card so each hub keeps its card style
+  · pages/topic-<topic>.html (+ -2, -3, ...) list PAGE_SIZE cards each
+    with plain pagination — what the "more" link opens without JS, and
+    what crawlers follow; sitemap-topics.xml lists them
+
+So a hub's HTML and DOM are bounded by TOPICS × FIRST_SCREEN cards, and
+any listing page by PAGE_SIZE, however many articles the site has.
+
+Output is a pure function of the pages: no dates, stable order, chunk
+URLs versioned by content. Pages are rendered with plain asset URLs, so
+follow a build with fingerprint.py, speculation.py and offline.py as
+usual. Edits go through staging like the fix scripts (undo:
+python3 snapshots.py rollback <run>).
+
+  python3 hubs.py build [--dry-run]
+  python3 hubs.py show                   # topics and their pages
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from html import escape, unescape
+
+import pagecache
+import profiling
+import snapshots
+import staging
+from page_head import BASE_URL, meta_description, render_head, wrap_page
+from radon_states import STATE_PAGE_RE, list_sitemap
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+FIRST_SCREEN = 6      # cards per topic rendered into a hub
+CHUNK = 12            # cards per on-demand JSON chunk
+PAGE_SIZE = 48        # cards per topic page
+CARD_DESC_MAX = 110
+
+CHUNK_DIR = "hubs"
+SITEMAP = "sitemap-topics.xml"
+SITEMAP_PRIORITY = "0.50"
+MARKER = "<!-- hubs.py: generated from page metadata, edits are overwritten -->"
+LIST_START = "<!-- HUB_LIST:start -->"
+LIST_END = "<!-- HUB_LIST:end -->"
+TOPIC_PAGE_RE = re.compile(r"^pages/topic-[a-z0-9-]+\.html$")
+SITE_SUFFIX_RE = re.compile(r"\s+[|\-–]\s+MyHouseIsBurping(\.com)?\s*$", re.I)
+
+# Display order. "match" keywords are tested against the page slug.
+TOPICS = [
+    {"key": "basics", "heading": "Understanding House Noises", "icon": "💡", "header": "",
+     "blurb": "What house burping is, why homes make noise, and when it's normal.",
+     "pinned": ("what-is-house-burping", "house-burping-causes", "is-house-burping-normal"),
+     "match": ()},
+    {"key": "hvac", "heading": "HVAC, Furnace & Water Heater Noises", "icon": "🔥", "header": "",
+     "blurb": "Mechanical system sounds decoded: heating, ducts, pipes and tanks.",
+     "pinned": ("house-burping-hvac", "water-heater-popping-noise"),
+     "match": ("hvac", "furnace", "water-heater", "pipe", "duct", "boiler", "radiator")},
+    {"key": "structure", "heading": "Structural, Weather & Seasonal Noises", "icon": "🏗️",
+     "header": "structure-header",
+     "blurb": "Thermal contraction, wind load, truss uplift and foundation concerns.",
+     "pinned": ("structural-or-normal",),
+     "match": ("structur", "foundation", "settl", "wind", "cold-weather", "truss", "siding",
+               "joist", "shak", "creak")},
+    {"key": "pests", "heading": "Pests vs. House Settling", "icon": "🐭", "header": "pest-header",
+     "blurb": "Is it scratching or is it structural?",
+     "pinned": ("house-burping-or-mice",),
+     "match": ("mice", "mouse", "attic", "pest", "rodent", "squirrel", "animal")},
+    {"key": "radon", "heading": "Radon & Indoor Air Quality", "icon": "☢️", "header": "radon-header",
+     "blurb": "Testing, mitigation, ventilation and the air your family breathes.",
+     "pinned": ("radon-gas-in-house-signs", "radon-levels-by-state", "best-radon-test-kits",
+                "how-to-reduce-radon-in-house"),
+     "match": ("radon", "air-quality", "ventilation", "mold", "allerg", "carbon-monoxide")},
+]
+MATCH_ORDER = ("radon", "pests", "hvac", "structure")   # no match → basics
+FALLBACK_TOPIC = "basics"
+
+# Hub pages and the card markup each one uses
+HUBS = [
+    {"page": "pages/index.html", "topics": [t["key"] for t in TOPICS], "style": "article"},
+    {"page": "pages/radon-hub.html", "topics": ["radon"], "style": "radon"},
+]
+NOT_LISTED = {h["page"] for h in HUBS}
+
+
+# ─────────────────────────────────────────
+# DATA
+# ─────────────────────────────────────────
+def _slug(path):
+    return os.path.basename(path)[:-len(".html")]
+
+
+def topic_of(path):
+    slug = _slug(path)
+    by_key = {t["key"]: t for t in TOPICS}
+    for key in MATCH_ORDER:
+        if any(word in slug for word in by_key[key]["match"]):
+            return key
+    return FALLBACK_TOPIC
+
+
+def card_title(record):
+    return SITE_SUFFIX_RE.sub("", unescape(record.title)).strip()
+
+
+def is_listable(path):
+    """Could this path be listed at all? (an article under pages/, not a hub or topic page)"""
+    return os.path.dirname(path) == "pages" and path not in NOT_LISTED and not TOPIC_PAGE_RE.match(path)
+
+
+def is_listed(path, record, root="."):
+    if not is_listable(path) or not record.title:
+        return False
+    # a leftover copy of a moved page points its canonical at the new home
+    canonical = record.canonical
+    return not (canonical.startswith(BASE_URL + "/") and canonical != f"{BASE_URL}/{path}"
+                and os.path.exists(os.path.join(root, canonical[len(BASE_URL) + 1:])))
+
+
+def listed_pages(root=".", cache=None):
+    """[(path, record)] for every page the hubs list (articles under pages/)."""
+    cache = cache or pagecache.PageCache(os.path.join(root, pagecache.CACHE_FILE))
+    found = []
+    for path in pagecache.site_pages(root):
+        if not is_listable(path):
+            continue
+        record = cache.get(path, os.path.join(root, path))
+        if is_listed(path, record, root):
+            found.append((path, record))
+    cache.save()
+    return found
+
+
+def listing_entry(path, record):
+    """(topic key, sort order, card) for one listed page — card = [url, title, description]."""
+    key = topic_of(path)
+    pinned = next(t["pinned"] for t in TOPICS if t["key"] == key)
+    title = card_title(record)
+    order = (pinned.index(_slug(path)) if _slug(path) in pinned else len(pinned),
+             bool(STATE_PAGE_RE.match(path)), title.lower())
+    return key, order, ["/" + path, title, meta_description(record.description, CARD_DESC_MAX)]
+
+
+def arrange(entries):
+    """{topic key: [card]} in listing order, from listing_entry() results."""
+    topics = {t["key"]: [] for t in TOPICS}
+    for key, order, card in entries:
+        topics[key].append((order, card))
+    return {key: [card for _, card in sorted(cards)] for key, cards in topics.items()}
+
+
+def group(pages):
+    """{topic key: [card]} for [(path, record)]."""
+    return arrange(listing_entry(path, record) for path, record in pages)
+
+
+# ─────────────────────────────────────────
+# TOPIC PAGES
+# ─────────────────────────────────────────
+def topic_slug(key, n=1):
+    return f"topic-{key}" if n == 1 else f"topic-{key}-{n}"
+
+
+def topic_url(key, n=1):
+    return f"/pages/{topic_slug(key, n)}.html"
+
+
+def page_count(cards):
+    return max(1, -(-len(cards) // PAGE_SIZE))
+
+
+def topic_article(topic, cards, n):
+    # only page 1 carries the count, so adding a page re-renders the pages after it, not all
+    title = (f"{topic['heading']}: All {len(cards)} Guides" if n == 1
+             else f"{topic['heading']} Guides (Page {n} of {page_count(cards)})")
+    return {
+        "slug": topic_slug(topic["key"], n),
+        "title": title,
+        "keyword": topic["heading"].lower(),
+        "intent": topic["blurb"],
+        "schema_type": "CollectionPage",
+        "section": ("All Articles", "/pages/"),
+        "items": [BASE_URL + url for url, _, _ in cards[(n - 1) * PAGE_SIZE:n * PAGE_SIZE]],
+    }
+
+
+def pagination(key, n, pages):
+    if pages == 1:
+        return ""
+    links = []
+    if n > 1:
+        links.append(f'<a href="{topic_url(key, n - 1)}" rel="prev">← Previous</a>')
+    for i in range(1, pages + 1):
+        links.append(f'<span aria-current="page">{i}</span>' if i == n
+                     else f'<a href="{topic_url(key, i)}">{i}</a>')
+    if n < pages:
+        links.append(f'<a href="{topic_url(key, n + 1)}" rel="next">Next →</a>')
+    return '<nav class="pagination" aria-label="Pages">\n' + "\n".join(links) + "\n</nav>"
+
+
+def topic_body(topic, cards, n):
+    pages = page_count(cards)
+    shown = cards[(n - 1) * PAGE_SIZE:n * PAGE_SIZE]
+    count = f" {len(cards)} guides in this topic." if n == 1 else ""
+    where = f" This is page {n} of {pages}." if pages > 1 else ""
+    grid = "\n".join(
+        f'<a class="card" href="{url}"><h3>{escape(title)}</h3><p>{escape(desc)}</p></a>'
+        for url, title, desc in shown
+    )
+    return f"""{MARKER}
+<h1>{escape(topic_article(topic, cards, n)['title'])}</h1>
+<div class="direct-answer">
+<p>{escape(topic['blurb'])}{count}{where}</p>
+</div>
+<div class="card-grid">
+{grid}
+</div>
+{pagination(topic['key'], n, pages)}
+<p>Browse every topic on the <a href="/pages/">all articles</a> page.</p>"""
+
+
+def render_topic_page(topic, cards, n):
+    article = topic_article(topic, cards, n)
+    body = topic_body(topic, cards, n)
+    return wrap_page(render_head(article, body), body, article)
+
+
+# ─────────────────────────────────────────
+# CHUNKS
+# ─────────────────────────────────────────
+def chunks(key, cards):
+    """
+    {path: json text} for the cards of topic page 1 past the first screen,
+    and the URL of the first chunk (None if the first screen holds them all).
+    Each chunk names the next by a content-versioned URL, so they are
+    rendered last to first.
+    """
+    rest = cards[FIRST_SCREEN:PAGE_SIZE]
+    parts = [rest[i:i + CHUNK] for i in range(0, len(rest), CHUNK)]
+    out, next_url = {}, None
+    shown = min(len(cards), PAGE_SIZE)
+    for i in range(len(parts), 0, -1):
+        left = len(cards) - (FIRST_SCREEN + sum(len(p) for p in parts[:i]))
+        data = {
+            "cards": parts[i - 1],
+            "next": next_url,
+            "left": left,
+            # when the chunks run out, the link opens the next topic page
+            "page": topic_url(key, 2) if i == len(parts) and len(cards) > shown else None,
+        }
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        path = f"{CHUNK_DIR}/{key}-{i}.json"
+        out[path] = text
+        next_url = f"/{path}?v={hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}"
+    return out, next_url
+
+
+# ─────────────────────────────────────────
+# HUB LISTINGS
+# ─────────────────────────────────────────
+def card_html(card, style):
+    url, title, desc = card
+    if style == "radon":
+        return (f'<a class="radon-card" href="{url}">\n<h3 data-title>{escape(title)}</h3>\n'
+                f'<p data-desc>{escape(desc)}</p>\n<div class="card-arrow-radon">Read guide &rarr;</div>\n</a>')
+    return (f'<a class="article-card" href="{url}">\n<div class="card-title" data-title>{escape(title)}</div>\n'
+            f'<div class="card-desc" data-desc>{escape(desc)}</div>\n<div class="card-arrow">→</div>\n</a>')
+
+
+def more_text(left):
+    return f"{left} more guide{'' if left == 1 else 's'}"
+
+
+def more_link(key, cards, first_chunk):
+    left = len(cards) - FIRST_SCREEN
+    if left <= 0:
+        return ""
+    more = f' data-more="{first_chunk}" data-grid="grid-{key}"' if first_chunk else ""
+    return (f'<a class="hub-more" href="{topic_url(key)}"{more}>'
+            f'<span data-left>{more_text(left)}</span> →</a>')
+
+
+def topic_listing(topic, cards, first_chunk, style):
+    grid = "\n".join(card_html(c, style) for c in cards[:FIRST_SCREEN])
+    grid = f'<div class="article-grid" id="grid-{topic["key"]}">\n{grid}\n</div>'
+    more = more_link(topic["key"], cards, first_chunk)
+    if style == "radon":
+        heading = f"<h2>All {escape(topic['heading'])} Guides ({len(cards)})</h2>"
+        return "\n".join(part for part in (heading, grid, more) if part)
+    header = f'cluster-header {topic["header"]}'.strip()
+    lines = [
+        f'<div class="cluster" id="topic-{topic["key"]}">',
+        f'<div class="{header}">',
+        f'<div class="cluster-icon">{topic["icon"]}</div>',
+        '<div class="cluster-meta">',
+        f'<h2><a href="{topic_url(topic["key"])}">{escape(topic["heading"])}</a></h2>',
+        f'<p>{escape(topic["blurb"])}</p>',
+        "</div>",
+        f'<div class="cluster-pill">{len(cards)} guides</div>',
+        "</div>",
+        grid,
+        more,
+        "</div>",
+    ]
+    return "\n".join(line for line in lines if line)
+
+
+def hub_listing(hub, topics, first_chunks):
+    by_key = {t["key"]: t for t in TOPICS}
+    parts = [topic_listing(by_key[key], topics[key], first_chunks[key], hub["style"])
+             for key in hub["topics"] if topics[key]]
+    return f"{LIST_START}\n{MARKER}\n" + "\n".join(parts) + f"\n{LIST_END}"
+
+
+def apply_listing(html, listing):
+    """Hub text with the listing between the markers replaced (unchanged if they're missing)."""
+    if LIST_START not in html or LIST_END not in html:
+        return html
+    newline = "\r\n" if "\r\n" in html else "\n"
+    start = html.index(LIST_START)
+    end = html.index(LIST_END, start) + len(LIST_END)
+    return html[:start] + listing.replace("\n", newline) + html[end:]
+
+
+def render_sitemap(topics):
+    locs = [f"{BASE_URL}{topic_url(key, n)}"
+            for key, cards in sorted(topics.items()) for n in range(1, page_count(cards) + 1)]
+    entries = "\n".join(
+        f"  <url>\n    <loc>{loc}</loc>\n    <priority>{SITEMAP_PRIORITY}</priority>\n  </url>"
+        for loc in locs
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{entries}
+</urlset>
+"""
+
+
+# ─────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────
+def previous_outputs(tx):
+    """Topic pages and chunks an earlier build generated."""
+    found = [p for p in tx.glob("pages/topic-*.html")
+             if TOPIC_PAGE_RE.match(p) and MARKER in tx.read(p, errors="replace")]
+    return found + tx.glob(f"{CHUNK_DIR}/*.json")
+
+
+def outputs(topics):
+    """Topic pages and chunks a build from `topics` generates."""
+    found = set()
+    for key, cards in topics.items():
+        found.update(chunks(key, cards)[0])
+        if cards:
+            found.update(f"pages/{topic_slug(key, n)}.html" for n in range(1, page_count(cards) + 1))
+    return found
+
+
+def stale_pages(cards, before):
+    """Topic page numbers whose content differs between two card lists."""
+    pages = page_count(cards)
+    if before is None or page_count(before) != pages:
+        return range(1, pages + 1)  # every page links to every other
+    return [n for n in range(1, pages + 1)
+            if (n == 1 and len(cards) != len(before))
+            or cards[(n - 1) * PAGE_SIZE:n * PAGE_SIZE] != before[(n - 1) * PAGE_SIZE:n * PAGE_SIZE]]
+
+
+def build(tx, topics, previous=None):
+    """
+    Stage hub listings, topic pages, chunks and the sitemap. Returns (written, removed, skipped hubs).
+    previous: the topics the served outputs were built from (devserver.py) —
+    then only topic pages whose cards changed are rendered, and stale
+    outputs are known without scanning the tree.
+    """
+    written = removed = 0
+    skipped = []
+
+    def put(path, text, newline=None):
+        nonlocal written
+        if not tx.exists(path) or tx.read(path, errors="replace") != text.replace("\r\n", "\n"):
+            tx.write(path, text, newline=newline)
+            written += 1
+
+    current, first_chunks = set(), {}
+    by_key = {t["key"]: t for t in TOPICS}
+    for key, cards in topics.items():
+        out, first_chunks[key] = chunks(key, cards)
+        for path, text in out.items():
+            current.add(path)
+            put(path, text)
+        if not cards:
+            continue
+        before = previous.get(key) if previous is not None else None
+        for n in range(1, page_count(cards) + 1):
+            current.add(f"pages/{topic_slug(key, n)}.html")
+        for n in profiling.each(stale_pages(cards, before)):
+            put(f"pages/{topic_slug(key, n)}.html", render_topic_page(by_key[key], cards, n))
+    old = outputs(previous) if previous is not None else previous_outputs(tx)
+    for path in sorted(old):
+        if path not in current and tx.exists(path):
+            tx.remove(path)
+            removed += 1
+
+    for hub in HUBS:
+        if not tx.exists(hub["page"]):
+            continue
+        with open(tx.path(hub["page"]), encoding="utf-8", errors="replace", newline="") as f:
+            html = f.read()
+        if LIST_START not in html:
+            skipped.append(hub["page"])
+            continue
+        updated = apply_listing(html, hub_listing(hub, topics, first_chunks))
+        if updated != html:
+            tx.write(hub["page"], updated, newline="")
+            written += 1
+
+    put(SITEMAP, render_sitemap({k: v for k, v in topics.items() if v}))
+    list_sitemap(tx, SITEMAP, put)
+    return written, removed, skipped
+
+
+def check_hub_links(tx):
+    """Every card, chunk and topic page link must resolve to a staged page."""
+    problems = []
+    for hub in HUBS:
+        if tx.exists(hub["page"]):
+            html = tx.read(hub["page"], errors="replace")
+            listing = html[html.find(LIST_START):html.find(LIST_END)] if LIST_START in html else ""
+            for url in re.findall(r'(?:href|data-more)="/([^"?]+)', listing):
+                if not tx.exists(url):
+                    problems.append(f"{hub['page']}: /{url} does not exist")
+    for path in tx.glob(f"{CHUNK_DIR}/*.json"):
+        data = json.loads(tx.read(path))
+        for url in [c[0] for c in data["cards"]] + [data["next"], data["page"]]:
+            if url and not tx.exists(url.lstrip("/").split("?")[0]):
+                problems.append(f"{path}: {url} does not exist")
+    if tx.exists(SITEMAP):
+        problems += [f"{SITEMAP}: {loc} has no page"
+                     for loc in re.findall(r"<loc>([^<]+)</loc>", tx.read(SITEMAP))
+                     if not tx.exists(loc[len(BASE_URL) + 1:])]
+    return problems
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate hub listings and topic pages from page metadata.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--dry-run", action="store_true", help="stage and validate, but don't swap in")
+    profiling.add_profile_args(p)
+    sub.add_parser("show")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    topics = group(listed_pages())
+    if args.cmd == "show":
+        for topic in TOPICS:
+            cards = topics[topic["key"]]
+            print(f"{topic['icon']} {topic['heading']} — {len(cards)} page(s), "
+                  f"{page_count(cards)} topic page(s) → {topic_url(topic['key'])}")
+            for url, title, _ in cards:
+                print(f"   {url}  {title}")
+        return 0
+
+    profiling.start("hubs", args)
+    try:
+        return run(args, topics)
+    finally:
+        profiling.finish()
+
+
+def run(args, topics):
+    snap_run = None if args.dry_run else snapshots.begin_run("hubs")
+    tx = staging.Transaction("hubs", run=snap_run).begin()
+    try:
+        with profiling.span("render"):
+            written, removed, skipped = build(tx, topics)
+        validators = [check_hub_links]
+        if args.dry_run:
+            problems = tx.validate(validators)
+            tx.abort()
+            print(f"🔍 Dry run: {sum(map(len, topics.values()))} pages listed, "
+                  f"{written} file(s) would change, {removed} removed")
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1 if problems else 0
+        tx.commit(validators)
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    print(f"✅ {sum(map(len, topics.values()))} pages in {sum(1 for c in topics.values() if c)} topics: "
+          f"{written} file(s) written, {removed} removed")
+    for page in skipped:
+        print(f"⚠️  {page} has no {LIST_START} … {LIST_END} markers — listing not updated")
+    if written or removed:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+        print(f"   Next: python3 fingerprint.py build && python3 speculation.py build && python3 offline.py build")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — IndexNow Submission of Changed URLs
+Run from the ROOT of your site directory, AFTER publish.py publish:
+python3 indexnow.py submit
+
+Every run used to end with "Request indexing" by hand, and fix_final.py
+stamped every sitemap URL as modified today, so crawlers had no way to
+tell what actually changed. This keeps a submission ledger
+(_deploy/indexnow.json): canonical URL → content hash, lastmod, and
+when that version was submitted. A submission is the difference:
+
+  · changed  — content hash differs from the ledger (or is new)
+  · pending  — changed earlier, but its submission never succeeded
+  · removed  — in the ledger, no longer on the site (submitted so
+               engines re-fetch and see the 404)
+
+The hash is of what a crawler would index: speculation rules are
+dropped and fingerprinted asset names (styles.0123456789.css) read as
+their logical names, so a CSS change that rewrites every page's <link>
+doesn't resubmit the whole site.
+
+URLs go to the IndexNow endpoint in batches of up to BATCH_MAX (the
+protocol's per-request limit), retried with backoff on 429/5xx and
+network errors; the ledger is saved after each accepted batch, so an
+interrupted run resubmits only what wasn't accepted. The key is the
+<key>.txt file at the site root (its content is its own name).
+
+fix_final.py --only 5 takes each sitemap <lastmod> from the ledger: the
+day a page's content last changed, not the day the sitemap was rebuilt.
+(Google and Bing retired their sitemap ping endpoints; IndexNow is what
+Bing, Yandex and others read. Google still reads the sitemap.)
+
+  python3 indexnow.py plan                        # what would be submitted
+  python3 indexnow.py submit [--dry-run]
+  python3 indexnow.py submit --endpoint http://127.0.0.1:8790/indexnow   # fake_web.py
+  python3 indexnow.py submit --baseline           # record the site as submitted, send nothing
+  python3 indexnow.py show                        # ledger summary
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import pagecache
+from fingerprint import ASSET_EXTS, HASH_LEN
+from publish import DEPLOY_DIR
+from site_config import BASE_URL, load_json, save_json
+from speculation import RULES_OPEN, url_for
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+LEDGER_FILE = os.path.join(DEPLOY_DIR, "indexnow.json")
+VERSION = 1
+ENDPOINT = "https://api.indexnow.org/indexnow"
+BATCH_MAX = 10_000     # URLs per request (IndexNow limit)
+RETRIES = 5            # attempts per batch
+BACKOFF = 2.0          # s before the first retry, doubled after each
+TIMEOUT = 30
+RETRY_STATUS = (429, 500, 502, 503, 504)
+LIST_LIMIT = 25        # URLs printed by plan; --all prints them all
+KEY_RE = re.compile(r"^[A-Za-z0-9-]{8,128}$")
+
+RULES_RE = re.compile(re.escape(RULES_OPEN) + r".*?</script>\s*", re.S)
+HASHED_REF_RE = re.compile(r"\.[0-9a-f]{%d}(%s)\b" % (
+    HASH_LEN, "|".join(re.escape(ext) for ext in ASSET_EXTS)))
+
+
+# ─────────────────────────────────────────
+# PAGES
+# ─────────────────────────────────────────
+def find_key(root="."):
+    """The IndexNow key: a <key>.txt at the site root containing just <key>."""
+    for name in sorted(os.listdir(root)):
+        key = name[:-len(".txt")]
+        if name.endswith(".txt") and KEY_RE.match(key):
+            with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                if f.read().strip() == key:
+                    return key
+    return None
+
+
+def content_sha(html):
+    """Hash of what a crawler indexes — not of build-step bookkeeping."""
+    text = html.replace("\r\n", "\n")
+    text = RULES_RE.sub("", text)
+    text = HASHED_REF_RE.sub(r"\1", text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def page_url(path, record, root="."):
+    """Canonical URL to submit for a page, or None (a partial, or a copy of another page)."""
+    if not record.title:
+        return None
+    own = BASE_URL + url_for(path)
+    canonical = record.canonical
+    if canonical.startswith(BASE_URL + "/") and canonical != own \
+            and os.path.exists(os.path.join(root, canonical[len(BASE_URL) + 1:])):
+        return None  # a copy: the canonical page is submitted under its own path
+    return own
+
+
+def file_day(path):
+    return datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).strftime("%Y-%m-%d")
+
+
+def scan(root="."):
+    """{url: {"path", "sha", "day"}} for every page the site serves."""
+    cache = pagecache.PageCache(os.path.join(root, pagecache.CACHE_FILE))
+    found = {}
+    for path in pagecache.site_pages(root):
+        fs_path = os.path.join(root, path)
+        url = page_url(path, cache.get(path, fs_path), root)
+        if url is None or url in found:
+            continue
+        with open(fs_path, encoding="utf-8", errors="replace", newline="") as f:
+            found[url] = {"path": path, "sha": content_sha(f.read()), "day": file_day(fs_path)}
+    cache.save()
+    return found
+
+
+# ─────────────────────────────────────────
+# LEDGER
+# ─────────────────────────────────────────
+def load_ledger(path=LEDGER_FILE):
+    data = load_json(path)
+    if not data or data.get("version") != VERSION:
+        return {"version": VERSION, "urls": {}}
+    return data
+
+
+def lastmod(path, fs_path, ledger):
+    """Sitemap <lastmod> for a site file: the ledger's, unless the page changed since."""
+    entry = ledger["urls"].get(BASE_URL + url_for(path))
+    if entry and os.path.exists(fs_path):
+        with open(fs_path, encoding="utf-8", errors="replace", newline="") as f:
+            if content_sha(f.read()) == entry["sha"]:
+                return entry["lastmod"]
+    return file_day(fs_path) if os.path.exists(fs_path) else None
+
+
+def diff(ledger, pages):
+    """
+    Record new content hashes in the ledger (a changed page gets a new
+    lastmod and loses its submitted stamp). Returns (to submit, removed).
+    """
+    urls = ledger["urls"]
+    for url, page in pages.items():
+        entry = urls.get(url)
+        if entry is None or entry["sha"] != page["sha"] or entry.get("removed"):
+            urls[url] = {"path": page["path"], "sha": page["sha"], "lastmod": page["day"],
+                         "submitted": None}
+    removed = sorted(url for url in urls if url not in pages)
+    for url in removed:
+        urls[url]["removed"] = True
+    pending = sorted(url for url in pages if urls[url]["submitted"] is None)
+    return pending + removed, removed
+
+
+def mark(ledger, urls, when):
+    for url in urls:
+        entry = ledger["urls"].get(url)
+        if entry is None:
+            continue
+        if entry.get("removed"):
+            del ledger["urls"][url]
+        else:
+            entry["submitted"] = when
+
+
+# ─────────────────────────────────────────
+# SUBMISSION
+# ─────────────────────────────────────────
+def now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def batches(urls, size=BATCH_MAX):
+    return [urls[i:i + size] for i in range(0, len(urls), size)]
+
+
+def post(endpoint, payload, timeout=TIMEOUT):
+    """(status, Retry-After seconds or None). Network errors raise OSError."""
+    request = urllib.request.Request(
+        endpoint, data=json.dumps(payload).encode("utf-8"), method="POST",
+        headers={"Content-Type": "application/json; charset=utf-8"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, None
+    except urllib.error.HTTPError as e:
+        retry_after = e.headers.get("Retry-After", "")
+        return e.code, float(retry_after) if retry_after.isdigit() else None
+
+
+def submit_batch(endpoint, payload, retries=RETRIES, backoff=BACKOFF, log=print):
+    """POST one batch, retrying throttling, server and network errors. Returns the final status (0 = no answer)."""
+    retries = max(1, retries)  # --retries 0 still sends the batch once
+    delay = backoff
+    for attempt in range(1, retries + 1):
+        try:
+            status, retry_after = post(endpoint, payload)
+        except OSError as e:
+            status, retry_after = 0, None
+            log(f"   ⚠️  attempt {attempt}: {e}")
+        if status in (200, 202):
+            return status
+        if status and status not in RETRY_STATUS:
+            return status  # 400 / 403 / 422: resending won't help
+        if attempt < retries:
+            wait = retry_after if retry_after is not None else delay
+            if status:
+                log(f"   ⏳ attempt {attempt}: HTTP {status}, retrying in {wait:g}s")
+            time.sleep(wait)
+            delay *= 2
+    return status
+
+
+def submit(ledger, urls, key, endpoint=ENDPOINT, batch_size=BATCH_MAX, retries=RETRIES,
+           backoff=BACKOFF, ledger_file=LEDGER_FILE):
+    """Submit `urls` batch by batch. Returns (accepted URLs, [(batch size, status)] failures)."""
+    accepted, failed = 0, []
+    host = urlsplit(BASE_URL).hostname
+    for i, batch in enumerate(batches(urls, batch_size), 1):
+        payload = {"host": host, "key": key, "keyLocation": f"{BASE_URL}/{key}.txt", "urlList": batch}
+        status = submit_batch(endpoint, payload, retries, backoff)
+        if status in (200, 202):
+            mark(ledger, batch, now())
+            save_json(ledger_file, ledger)
+            accepted += len(batch)
+            print(f"   ✅ batch {i}: {len(batch)} URL(s) — HTTP {status}")
+        else:
+            failed.append((len(batch), status))
+            print(f"   ❌ batch {i}: {len(batch)} URL(s) — "
+                  f"{'HTTP ' + str(status) if status else 'no answer'}")
+    return accepted, failed
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit changed canonical URLs to IndexNow.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("plan")
+    p.add_argument("--all", action="store_true", help="list every URL, not just the first 25")
+    p = sub.add_parser("submit")
+    p.add_argument("--endpoint", default=ENDPOINT)
+    p.add_argument("--batch", type=int, default=BATCH_MAX, help=f"URLs per request (max {BATCH_MAX})")
+    p.add_argument("--retries", type=int, default=RETRIES, help="attempts per batch (at least 1)")
+    p.add_argument("--backoff", type=float, default=BACKOFF, help="seconds before the first retry")
+    p.add_argument("--dry-run", action="store_true", help="print the plan, send nothing")
+    p.add_argument("--baseline", action="store_true",
+                   help="mark the current site as submitted without sending (first setup)")
+    sub.add_parser("show")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    ledger = load_ledger()
+
+    if args.cmd == "show":
+        urls = ledger["urls"]
+        pending = sum(1 for e in urls.values() if e["submitted"] is None)
+        last = max((e["submitted"] for e in urls.values() if e["submitted"]), default="never")
+        print(f"📒 {LEDGER_FILE}: {len(urls)} URLs, {pending} pending, last submission {last}")
+        return 0
+
+    key = find_key()
+    if key is None:
+        print("❌ No IndexNow key file (<key>.txt containing <key>) at the site root")
+        return 1
+    pages = scan()
+    urls, removed = diff(ledger, pages)
+    print(f"🔎 {len(pages)} pages: {len(urls) - len(removed)} changed or pending, {len(removed)} removed")
+
+    if args.cmd == "plan" or args.dry_run:
+        shown = urls if getattr(args, "all", False) else urls[:LIST_LIMIT]
+        for url in shown:
+            print(f"   {'−' if url in removed else '+'} {url}")
+        if len(shown) < len(urls):
+            print(f"   … {len(urls) - len(shown)} more (plan --all)")
+        return 0
+
+    if not urls:
+        save_json(LEDGER_FILE, ledger)
+        print("✅ Nothing changed since the last submission")
+        return 0
+    if args.baseline:
+        mark(ledger, urls, now())
+        save_json(LEDGER_FILE, ledger)
+        print(f"📌 Baseline: {len(urls)} URL(s) recorded as submitted, nothing sent")
+        return 0
+
+    save_json(LEDGER_FILE, ledger)   # lastmods are recorded even if every batch fails
+    batch_size = max(1, min(args.batch, BATCH_MAX))
+    print(f"📤 {len(urls)} URL(s) in {len(batches(urls, batch_size))} batch(es) → {args.endpoint}")
+    accepted, failed = submit(ledger, urls, key, args.endpoint, batch_size, args.retries, args.backoff)
+    if failed:
+        print(f"❌ {sum(n for n, _ in failed)} URL(s) not accepted — they stay pending for the next run")
+        return 1
+    print(f"✅ {accepted} URL(s) submitted")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Outbound Link Checker
+Run from the ROOT of your site directory: python3 linkcheck.py check
+
+Articles link out to products, agencies and fonts, and nothing checked
+those links. This collects every absolute URL the pages reference that
+is not on the site (from the parsed-page cache, so a warm run opens no
+HTML), deduplicates them, and checks them concurrently:
+
+  · per host: a few keep-alive connections (--per-host) and at least
+    --delay seconds between requests, so no site sees a burst
+  · across hosts: up to --workers requests in flight
+  · HEAD first; GET when a server refuses HEAD (403/405/501)
+  · redirects followed to the final URL (up to MAX_REDIRECTS hops)
+
+Results persist in _cache/links.json with each URL's ETag and
+Last-Modified. A re-run only rechecks entries older than --max-age days
+(broken ones after a day, so fixes show up quickly), and sends those
+validators as If-None-Match / If-Modified-Since — an unchanged target
+answers 304 and keeps its previous result.
+
+  python3 linkcheck.py list                       # outbound URLs and where they are
+  python3 linkcheck.py check                      # check stale entries; exit 1 if any are broken
+  python3 linkcheck.py check --all --json report.json
+  python3 linkcheck.py check --via http://127.0.0.1:8790   # every request to a stand-in (fake_web.py)
+"""
+
+import os
+import sys
+import html
+import time
+import socket
+import argparse
+import threading
+import http.client
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urljoin
+
+import pagecache
+from site_config import SITE_HOSTS, BASE_URL, load_json, save_json
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+CACHE_FILE = "_cache/links.json"
+VERSION = 1
+WORKERS = 16              # requests in flight across all hosts
+PER_HOST = 2              # connections per host
+DELAY = 1.0               # seconds between requests to one host
+TIMEOUT = 10
+MAX_REDIRECTS = 5
+MAX_AGE_DAYS = 7          # recheck working links after this
+BROKEN_MAX_AGE_DAYS = 1   # ... and broken or unreachable ones after this
+GET_READ_LIMIT = 64 * 1024
+USER_AGENT = f"MyHouseIsBurping-LinkCheck/1.0 (+{BASE_URL}/)"
+# Vocabulary identifiers in JSON-LD, not links anyone follows
+SKIP_HOSTS = ("schema.org",)
+HEAD_REFUSED = (403, 405, 501)
+THROTTLED = (429, 503)
+
+
+# ─────────────────────────────────────────
+# EXTRACTION
+# ─────────────────────────────────────────
+def is_outbound(url):
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    return (parts.scheme in ("http", "https") and bool(host)
+            and host not in SITE_HOSTS and host not in SKIP_HOSTS)
+
+
+def outbound_links(root=".", cache=None):
+    """{url: [pages that reference it]} for every off-site URL in the site."""
+    cache = cache or pagecache.PageCache(os.path.join(root, pagecache.CACHE_FILE))
+    found = {}
+    for path in pagecache.site_pages(root):
+        record = cache.get(path, os.path.join(root, path))
+        for url in record.urls:
+            url = html.unescape(url).split("#")[0]
+            if is_outbound(url):
+                found.setdefault(url, []).append(path)
+    cache.save()
+    return {url: sorted(set(pages)) for url, pages in sorted(found.items())}
+
+
+# ─────────────────────────────────────────
+# CONNECTIONS
+# ─────────────────────────────────────────
+class HostPool:
+    """Keep-alive connections to one host, and the politeness clock for it."""
+
+    def __init__(self, scheme, netloc, via=None, delay=DELAY, timeout=TIMEOUT):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.via = via            # (host, port): send everything to a stand-in instead
+        self.delay = delay
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.idle = []
+        self.next_at = 0.0
+        self.opened = 0
+        self.requests = 0
+
+    def wait_turn(self):
+        """Block until this host may get its next request."""
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.delay
+            self.requests += 1
+        if at > now:
+            time.sleep(at - now)
+
+    def acquire(self):
+        """(connection, reused?)"""
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+            self.opened += 1
+        if self.via:
+            return http.client.HTTPConnection(*self.via, timeout=self.timeout), False
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout), False
+
+    def release(self, conn, reusable):
+        if reusable:
+            with self.lock:
+                self.idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        with self.lock:
+            for conn in self.idle:
+                conn.close()
+            self.idle = []
+
+
+class Pools:
+    """One HostPool per scheme://host, created on first use."""
+
+    def __init__(self, via=None, delay=DELAY, timeout=TIMEOUT):
+        self.via = via
+        self.delay = delay
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def get(self, scheme, netloc):
+        key = (scheme, netloc.lower())
+        with self.lock:
+            if key not in self.pools:
+                self.pools[key] = HostPool(scheme, netloc, self.via, self.delay, self.timeout)
+            return self.pools[key]
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+
+def request(pools, method, url, headers=None):
+    """(status, response headers) for one request, on a pooled connection."""
+    parts = urlsplit(url)
+    pool = pools.get(parts.scheme, parts.netloc)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    headers = dict(headers or {}, Host=parts.netloc, **{"User-Agent": USER_AGENT})
+    pool.wait_turn()
+    for attempt in (1, 2):
+        conn, reused = pool.acquire()
+        try:
+            conn.request(method, target, headers=headers)
+            resp = conn.getresponse()
+            resp.read(GET_READ_LIMIT)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if reused and attempt == 1:
+                continue   # the server closed an idle keep-alive connection: retry fresh
+            raise
+        except Exception:
+            conn.close()
+            raise
+        pool.release(conn, resp.isclosed() and not resp.will_close)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}
+
+
+# ─────────────────────────────────────────
+# CHECKING
+# ─────────────────────────────────────────
+def describe(error):
+    if isinstance(error, socket.gaierror):
+        return "dns: host not found"
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return "timeout"
+    if isinstance(error, ConnectionRefusedError):
+        return "connection refused"
+    return f"{type(error).__name__}: {error}"
+
+
+def check_url(pools, url, previous=None, now=None):
+    """
+    Check one URL. `previous` is its cache entry, whose validators make the
+    first request conditional. Returns the new cache entry.
+    """
+    now = int(now or time.time())
+    previous = previous or {}
+    conditional = {}
+    if previous.get("etag"):
+        conditional["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        conditional["If-Modified-Since"] = previous["last_modified"]
+
+    current, method = url, "HEAD"
+    try:
+        for hop in range(MAX_REDIRECTS + 1):
+            headers = conditional if current == url else {}
+            status, resp = request(pools, method, current, headers)
+            if status in HEAD_REFUSED and method == "HEAD":
+                method = "GET"
+                status, resp = request(pools, method, current, headers)
+            if status == 304 and current == url and previous.get("status"):
+                return dict(previous, checked_at=now, not_modified=True)
+            if status in (301, 302, 303, 307, 308) and resp.get("location"):
+                current = urljoin(current, resp["location"])
+                continue
+            break
+        else:
+            return {"status": None, "error": f"more than {MAX_REDIRECTS} redirects",
+                    "final_url": current, "checked_at": now}
+    except Exception as e:
+        return {"status": None, "error": describe(e), "checked_at": now}
+
+    entry = {"status": status, "checked_at": now}
+    if current != url:
+        entry["final_url"] = current
+    if current == url:
+        # Validators only describe the URL itself, not a redirect target
+        for name, key in (("etag", "etag"), ("last-modified", "last_modified")):
+            if resp.get(name):
+                entry[key] = resp[name]
+    return entry
+
+
+def state(entry):
+    """ok, throttled (try again later) or broken."""
+    status = entry.get("status")
+    if status is None:
+        return "broken"
+    if status in THROTTLED:
+        return "throttled"
+    return "ok" if status < 400 else "broken"
+
+
+def is_stale(entry, now, max_age_days=MAX_AGE_DAYS):
+    if not entry:
+        return True
+    days = max_age_days if state(entry) == "ok" else min(max_age_days, BROKEN_MAX_AGE_DAYS)
+    return now - entry.get("checked_at", 0) > days * 86400
+
+
+def check_all(urls, results, pools, workers=WORKERS, per_host=PER_HOST, progress=None):
+    """
+    Check `urls`, writing each entry into `results` (url → entry) as it
+    completes. Each host's URLs form one queue drained by at most
+    `per_host` tasks, so a host never has more connections than that.
+    """
+    queues = {}
+    for url in urls:
+        queues.setdefault(urlsplit(url).netloc.lower(), deque()).append(url)
+    lock = threading.Lock()
+
+    def drain(queue):
+        while True:
+            with lock:
+                if not queue:
+                    return
+                url = queue.popleft()
+                previous = results.get(url)
+            entry = check_url(pools, url, previous)
+            with lock:
+                results[url] = entry
+                if progress:
+                    progress(url, entry)
+
+    # Busiest hosts first: their politeness delay sets the run's length
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for host, queue in sorted(queues.items(), key=lambda kv: -len(kv[1])):
+            for _ in range(min(per_host, len(queue))):
+                pool.submit(drain, queue)
+    pools.close()
+
+
+# ─────────────────────────────────────────
+# CACHE
+# ─────────────────────────────────────────
+def load_results(path=CACHE_FILE):
+    data = load_json(path, {})
+    return data.get("links", {}) if data.get("version") == VERSION else {}
+
+
+def save_results(results, path=CACHE_FILE):
+    save_json(path, {"version": VERSION, "links": results}, indent=1)
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def parse_via(text):
+    parts = urlsplit(text if "//" in text else f"http://{text}")
+    return parts.hostname, parts.port or 80
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the site's outbound links.")
+    parser.add_argument("--cache", default=CACHE_FILE)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p = sub.add_parser("check")
+    p.add_argument("--workers", type=int, default=WORKERS,
+                   help=f"requests in flight across hosts (default: {WORKERS})")
+    p.add_argument("--per-host", type=int, default=PER_HOST,
+                   help=f"connections per host (default: {PER_HOST})")
+    p.add_argument("--delay", type=float, default=DELAY,
+                   help=f"seconds between requests to one host (default: {DELAY})")
+    p.add_argument("--timeout", type=float, default=TIMEOUT)
+    p.add_argument("--max-age", type=float, default=MAX_AGE_DAYS, metavar="DAYS",
+                   help=f"recheck results older than this (default: {MAX_AGE_DAYS})")
+    p.add_argument("--all", action="store_true", help="recheck everything, fresh or not")
+    p.add_argument("--via", metavar="URL",
+                   help="send every request to this server instead (local stand-in)")
+    p.add_argument("--json", metavar="FILE", help="also write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+
+    links = outbound_links()
+    if args.cmd == "list":
+        for url, pages in links.items():
+            print(f"{url}\n   ← {', '.join(pages)}")
+        print(f"\n{len(links)} outbound URL(s) on {len({urlsplit(u).netloc for u in links})} host(s)")
+        return 0
+
+    results = load_results(args.cache)
+    # Forget URLs no page links to any more
+    results = {url: entry for url, entry in results.items() if url in links}
+    now = time.time()
+    todo = [url for url in links
+            if args.all or is_stale(results.get(url), now, args.max_age)]
+
+    print("=" * 60)
+    print("MyHouseIsBurping.com — Outbound Link Check")
+    print(f"URLs: {len(links)} | to check: {len(todo)} | cached: {len(links) - len(todo)}")
+    print(f"Workers: {args.workers} | per host: {args.per_host} | delay: {args.delay}s"
+          + (f" | via {args.via}" if args.via else ""))
+    print("=" * 60)
+
+    done = [0]
+
+    def progress(url, entry):
+        done[0] += 1
+        if state(entry) != "ok":
+            shown = entry.get("status") or entry.get("error")
+            print(f"   [{done[0]}/{len(todo)}] ⚠️  {shown}  {url}")
+
+    pools = Pools(parse_via(args.via) if args.via else None, args.delay, args.timeout)
+    start = time.monotonic()
+    try:
+        check_all(todo, results, pools, args.workers, args.per_host, progress)
+    finally:
+        save_results(results, args.cache)   # keep what finished, even on Ctrl-C
+    elapsed = time.monotonic() - start
+
+    checked = [results[u] for u in todo if u in results]
+    not_modified = sum(1 for e in checked if e.get("not_modified"))
+    opened = sum(p.opened for p in pools.pools.values())
+    sent = sum(p.requests for p in pools.pools.values())
+    print(f"\n✅ Checked {len(checked)} URL(s) in {elapsed:.1f}s — {sent} request(s) "
+          f"on {opened} connection(s), {not_modified} not modified (304)")
+
+    broken = {u: results[u] for u in links if u in results and state(results[u]) == "broken"}
+    throttled = [u for u in links if u in results and state(results[u]) == "throttled"]
+    moved = [u for u in links if u in results and results[u].get("final_url")
+             and state(results[u]) == "ok"]
+    if moved:
+        print(f"\n↪️  {len(moved)} redirected (consider linking the final URL):")
+        for url in moved:
+            print(f"   {url}\n     → {results[url]['final_url']}")
+    if throttled:
+        print(f"\n⏳ {len(throttled)} rate-limited — rechecked on the next run")
+    if args.json:
+        save_json(args.json, {url: dict(results.get(url, {}), pages=pages)
+                              for url, pages in links.items()})
+        print(f"   📄 {args.json}")
+    if broken:
+        print(f"\n❌ {len(broken)} broken outbound link(s):")
+        for url, entry in broken.items():
+            print(f"   {entry.get('status') or entry.get('error')}  {url}")
+            print(f"      ← {', '.join(links[url])}")
+        return 1
+    print("✅ No broken outbound links")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,4 +28,284 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         }
     });
-});
\ No newline at end of file
+
+    initSearch();
+    initPrefetch();
+    initAds();
+    initHubMore();
+    initServiceWorker();
+});
+
+// Site search
+// Injects a search box into the header. Nothing is downloaded until the box
+// is focused; then /search/index.json lists the shard keys, and each typed
+// word fetches only the shard for its prefix (built by search_index.py) —
+// or, when it is shorter than a split prefix's keys, those child shards.
+function initSearch() {
+    const nav = document.querySelector('.nav-container');
+    if (!nav || !window.fetch) return;
+
+    const STOP = new Set('a an and are as at be but by can do does for from has have how i if in into is it its me my of on or our so than that the their them then there these this to up was we what when where which while who why will with you your'.split(' '));
+    const form = document.createElement('form');
+    form.className = 'site-search';
+    form.setAttribute('role', 'search');
+    form.innerHTML = '<input type="search" placeholder="Search" aria-label="Search articles" autocomplete="off"><ul hidden></ul>';
+    const style = document.createElement('style');
+    style.textContent = '.site-search{position:relative;margin:0 1rem}.site-search input{width:11rem;padding:.35rem .6rem;border:1px solid #ccd;border-radius:4px;font:inherit}.site-search ul{position:absolute;right:0;top:2.4rem;width:22rem;max-width:90vw;margin:0;padding:.25rem 0;list-style:none;background:#fff;box-shadow:0 4px 12px rgba(0,0,0,.15);border-radius:4px;z-index:1001}.site-search li a{display:block;padding:.45rem .8rem;color:#1a2e44;text-decoration:none}.site-search li a:hover,.site-search li a:focus{background:#f3f5f8}@media (max-width:768px){.site-search input{width:7rem}}';
+    document.head.appendChild(style);
+    nav.insertBefore(form, nav.querySelector('.nav-toggle') || nav.querySelector('.nav-menu'));
+
+    const input = form.querySelector('input');
+    const list = form.querySelector('ul');
+    const shards = {};
+    let manifest = null;
+    let timer = 0;
+    let seq = 0;
+
+    const json = (url) => fetch(url).then((r) => (r.ok ? r.json() : null)).catch(() => null);
+    const loadManifest = () => manifest || (manifest = json('/search/index.json'));
+    const tokens = (q) => (q.toLowerCase().replace(/['\u2019]/g, '').match(/[a-z0-9]+/g) || [])
+        .filter((w) => w.length > 1 && !STOP.has(w));
+
+    // Same keys as search_index.shard_keys
+    function shardsFor(word, index) {
+        let best = '';
+        index.k.forEach((k) => { if (word.startsWith(k) && k.length > best.length) best = k; });
+        const keys = index.k.filter((k) => k.length > word.length && k.startsWith(word));
+        if (best) keys.unshift(best);
+        return Promise.all(keys.map((k) => shards[k] || (shards[k] = json('/search/' + k + '.json?v=' + index.v))));
+    }
+
+    // Same ranking as `search_index.py query`: most words matched, then weight.
+    async function search(q) {
+        const index = await loadManifest();
+        const words = tokens(q);
+        if (!index || !words.length) return [];
+        const scores = {};
+        const docs = {};
+        const data = await Promise.all(words.map((w) => shardsFor(w, index)));
+        words.forEach((word, n) => {
+            const hits = {};
+            data[n].forEach((shard) => {
+                if (!shard) return;
+                for (const term in shard.t) {
+                    if (!term.startsWith(word)) continue;
+                    const flat = shard.t[term];
+                    const bonus = term === word ? 2 : 1;
+                    for (let i = 0; i < flat.length; i += 2) {
+                        hits[flat[i]] = Math.max(hits[flat[i]] || 0, flat[i + 1] * bonus);
+                    }
+                }
+                Object.assign(docs, shard.d);
+            });
+            for (const id in hits) {
+                const s = scores[id] || (scores[id] = { id: id, m: 0, w: 0 });
+                s.m += 1;
+                s.w += hits[id];
+            }
+        });
+        return Object.values(scores)
+            .sort((a, b) => b.m - a.m || b.w - a.w || a.id - b.id)
+            .slice(0, 8)
+            .map((s) => docs[s.id]);
+    }
+
+    function render(results) {
+        list.textContent = '';
+        results.forEach(([url, title]) => {
+            const a = document.createElement('a');
+            a.href = url;
+            a.textContent = title;
+            list.appendChild(document.createElement('li')).appendChild(a);
+        });
+        list.hidden = !results.length;
+    }
+
+    input.addEventListener('focus', loadManifest, { once: true });
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const mine = ++seq;
+            const results = await search(input.value);
+            if (mine === seq) render(results);
+        }, 120);
+    });
+    form.addEventListener('submit', (e) => {
+        e.preventDefault();
+        const first = list.querySelector('a');
+        if (first) location.href = first.href;
+    });
+    document.addEventListener('click', (e) => {
+        if (!form.contains(e.target)) list.hidden = true;
+    });
+}
+
+// Prefetch fallback for browsers without speculation rules
+// speculation.py writes each page's ranked links into a speculationrules
+// block. Where that isn't supported, prefetch those links once they scroll
+// into view, and any other same-origin page link on hover or touch.
+function initPrefetch() {
+    if (HTMLScriptElement.supports && HTMLScriptElement.supports('speculationrules')) return;
+    const conn = navigator.connection;
+    if (conn && (conn.saveData || /2g/.test(conn.effectiveType))) return;
+
+    const done = new Set([location.href.split('#')[0]]);
+    const prefetch = (href) => {
+        const url = href.split('#')[0];
+        if (done.has(url) || done.size > 20) return;
+        done.add(url);
+        const link = document.createElement('link');
+        link.rel = 'prefetch';
+        link.href = url;
+        document.head.appendChild(link);
+    };
+    const pageLink = (a) => a && a.origin === location.origin && /(\.html|\/)$/.test(a.pathname) ? a : null;
+
+    const rules = document.querySelector('script[type="speculationrules"]');
+    let ranked = [];
+    try {
+        ranked = JSON.parse(rules.textContent).prerender[0].urls.map((u) => new URL(u, location.href).href);
+    } catch (e) { /* no rules on this page */ }
+    if (ranked.length && 'IntersectionObserver' in window) {
+        const idle = window.requestIdleCallback || ((fn) => setTimeout(fn, 1));
+        const seen = new IntersectionObserver((entries) => entries.forEach((entry) => {
+            if (!entry.isIntersecting) return;
+            seen.unobserve(entry.target);
+            idle(() => prefetch(entry.target.href));
+        }));
+        document.querySelectorAll('a[href]').forEach((a) => {
+            if (pageLink(a) && ranked.includes(a.href.split('#')[0])) seen.observe(a);
+        });
+    }
+
+    let timer = 0;
+    document.addEventListener('mouseover', (e) => {
+        const a = pageLink(e.target.closest && e.target.closest('a[href]'));
+        clearTimeout(timer);
+        if (a) timer = setTimeout(() => prefetch(a.href), 65);
+    });
+    document.addEventListener('touchstart', (e) => {
+        const a = pageLink(e.target.closest && e.target.closest('a[href]'));
+        if (a) prefetch(a.href);
+    }, { passive: true });
+}
+
+// Deferred AdSense
+// ads.py replaces the <head> script with a google-adsense-account meta tag.
+// The script loads on the first scroll/tap/key, when the browser is idle after
+// onload, or when an ad slot nears the viewport - whichever comes first.
+function initAds() {
+    const meta = document.querySelector('meta[name="google-adsense-account"]');
+    if (!meta) return;
+    const client = meta.content;
+    const events = ['scroll', 'pointerdown', 'keydown', 'touchstart'];
+    let loaded = false;
+
+    function load() {
+        if (loaded) return;
+        loaded = true;
+        events.forEach((t) => window.removeEventListener(t, load));
+        const script = document.createElement('script');
+        script.async = true;
+        script.crossOrigin = 'anonymous';
+        script.src = 'https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=' + client;
+        document.head.appendChild(script);
+    }
+
+    // Slots carry their display unit (data-ad-unit); styles.css reserves their height.
+    function fill(slot) {
+        const ins = document.createElement('ins');
+        ins.className = 'adsbygoogle';
+        ins.style.display = 'block';
+        ins.dataset.adClient = client;
+        ins.dataset.adSlot = slot.dataset.adUnit;
+        ins.dataset.adFormat = 'auto';
+        ins.dataset.fullWidthResponsive = 'true';
+        slot.textContent = '';
+        slot.appendChild(ins);
+        (window.adsbygoogle = window.adsbygoogle || []).push({});
+        load();
+    }
+
+    events.forEach((t) => window.addEventListener(t, load, { once: true, passive: true }));
+    window.addEventListener('load', () => {
+        if (window.requestIdleCallback) requestIdleCallback(load, { timeout: 4000 });
+        else setTimeout(load, 3000);
+    });
+
+    const slots = document.querySelectorAll('.ad-slot[data-ad-unit]');
+    if (!('IntersectionObserver' in window)) {
+        window.addEventListener('load', () => slots.forEach(fill));
+        return;
+    }
+    const near = new IntersectionObserver((entries) => entries.forEach((entry) => {
+        if (!entry.isIntersecting) return;
+        near.unobserve(entry.target);
+        fill(entry.target);
+    }), { rootMargin: '300px 0px' });
+    slots.forEach((slot) => near.observe(slot));
+}
+
+// Hub listings
+// hubs.py renders the first cards of each topic and a "more" link to the topic's
+// paginated page. Here the link instead appends the next chunk of cards from
+// /hubs/<topic>-<n>.json, cloned from the grid's first card so each hub keeps
+// its card style; chunks are prefetched when the link nears the viewport. When
+// the chunks run out, the link opens the topic's next page as before.
+function initHubMore() {
+    const links = document.querySelectorAll('a.hub-more[data-more]');
+    if (!links.length || !window.fetch) return;
+    const chunks = {};
+    const load = (url) => chunks[url] || (chunks[url] = fetch(url)
+        .then((r) => (r.ok ? r.json() : null)).catch(() => null));
+
+    function card(template, [url, title, desc]) {
+        const a = template.cloneNode(true);
+        a.href = url;
+        a.querySelector('[data-title]').textContent = title;
+        a.querySelector('[data-desc]').textContent = desc;
+        return a;
+    }
+
+    const near = 'IntersectionObserver' in window && new IntersectionObserver((entries) => entries.forEach((entry) => {
+        if (entry.isIntersecting && entry.target.dataset.more) load(entry.target.dataset.more);
+    }), { rootMargin: '400px 0px' });
+
+    links.forEach((more) => {
+        const grid = document.getElementById(more.dataset.grid);
+        const template = grid && grid.querySelector('a[href]');
+        if (!template) return;
+        if (near) near.observe(more);
+        more.addEventListener('click', async (e) => {
+            if (!more.dataset.more) return;   // chunks done: follow the link
+            e.preventDefault();
+            const chunk = await load(more.dataset.more);
+            if (!chunk) { location.href = more.href; return; }
+            const cards = document.createDocumentFragment();
+            chunk.cards.forEach((c) => cards.appendChild(card(template, c)));
+            grid.appendChild(cards);
+            more.querySelector('[data-left]').textContent = chunk.left + (chunk.left === 1 ? ' more guide' : ' more guides');
+            if (chunk.next) {
+                more.dataset.more = chunk.next;
+                if (near) load(chunk.next);
+            } else if (chunk.page) {
+                delete more.dataset.more;
+                more.href = chunk.page;
+            } else {
+                more.remove();
+            }
+        });
+    });
+}
+
+// Offline reading
+// sw.js (written by offline.py) precaches the shell and hub pages and keeps
+// recently read articles. Registered after onload so it never competes with
+// the page's own requests; plain-http origins other than localhost can't use it.
+function initServiceWorker() {
+    if (!('serviceWorker' in navigator)) return;
+    if (location.protocol !== 'https:' && location.hostname !== 'localhost') return;
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js').catch(() => { /* site works without it */ });
+    });
+}
@@ -0,0 +1,105 @@
+// Generated by offline.py from asset-manifest.json and the hub pages — edits are overwritten.
+const VERSION = '571c518d78';
+const PRECACHE = 'burp-precache-' + VERSION;
+const PAGES = 'burp-pages';
+const ASSETS = 'burp-assets';
+const FONTS = 'burp-fonts';
+const PRECACHE_URLS = [
+    "/css/styles.6212abbd90.css",
+    "/js/main.57b4f7e207.js",
+    "/",
+    "/pages/",
+    "/pages/radon-hub.html"
+];
+const LIMITS = { [PAGES]: 60, [ASSETS]: 200, [FONTS]: 30 };
+const HASHED = /\.[0-9a-f]{10}\.[A-Za-z0-9]+$/;
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(caches.open(PRECACHE)
+        .then((cache) => cache.addAll(PRECACHE_URLS.map((url) => new Request(url, { cache: 'reload' }))))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(caches.keys()
+        .then((keys) => Promise.all(keys
+            .filter((key) => key.startsWith('burp-precache-') && key !== PRECACHE)
+            .map((key) => caches.delete(key))))
+        .then(() => self.clients.claim()));
+});
+
+// Runtime caches keep their newest entries (put() moves a key to the end).
+async function store(name, request, response) {
+    const cache = await caches.open(name);
+    await cache.put(request, response);
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - LIMITS[name])).map((k) => cache.delete(k)));
+}
+
+async function staleWhileRevalidate(event, name) {
+    const cached = await caches.match(event.request, { cacheName: name });
+    const network = fetch(event.request).then((response) => {
+        if (response.ok) event.waitUntil(store(name, event.request, response.clone()));
+        return response;
+    });
+    if (!cached) return network;
+    event.waitUntil(network.catch(() => null));
+    return cached;
+}
+
+async function cacheFirst(event, name) {
+    const cached = await caches.match(event.request);
+    if (cached) return cached;
+    const response = await fetch(event.request);
+    if (response.ok || response.type === 'opaque') event.waitUntil(store(name, event.request, response.clone()));
+    return response;
+}
+
+// Hub pages are precached by directory URL: /pages/index.html is /pages/
+function precacheKey(request) {
+    const url = new URL(request.url);
+    url.search = '';
+    url.pathname = url.pathname.replace(/\/index\.html$/, '/');
+    return url.href;
+}
+
+async function page(event) {
+    const precached = await caches.match(precacheKey(event.request), { cacheName: PRECACHE });
+    if (precached) return precached;
+    try {
+        return await staleWhileRevalidate(event, PAGES);
+    } catch (e) {
+        return offline();
+    }
+}
+
+async function offline() {
+    const cache = await caches.open(PAGES);
+    const read = (await cache.keys()).map((r) => new URL(r.url).pathname).reverse();
+    const title = (path) => {
+        const slug = path.replace(/\/index\.html$/, '/').split('/').pop()
+            .replace(/\.html$/, '').replace(/-/g, ' ');
+        return slug ? slug.charAt(0).toUpperCase() + slug.slice(1) : path;
+    };
+    const items = read.map((p) => '<li><a href="' + p + '">' + title(p) + '</a></li>').join('');
+    const html = '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">'
+        + '<meta name="viewport" content="width=device-width, initial-scale=1.0">'
+        + '<title>Offline | MyHouseIsBurping.com</title></head>'
+        + '<body style="font-family:sans-serif;max-width:40rem;margin:2rem auto;padding:0 1rem">'
+        + '<h1>You\'re offline</h1><p>This page isn\'t saved yet. These are:</p>'
+        + '<ul>' + items + '</ul><p><a href="/pages/">All articles</a></p></body></html>';
+    return new Response(html, { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+self.addEventListener('fetch', (event) => {
+    if (event.request.method !== 'GET') return;
+    const url = new URL(event.request.url);
+    if (url.origin === location.origin) {
+        if (event.request.mode === 'navigate') event.respondWith(page(event));
+        else if (HASHED.test(url.pathname)) event.respondWith(cacheFirst(event, ASSETS));
+    } else if (url.hostname === 'fonts.gstatic.com') {
+        event.respondWith(cacheFirst(event, FONTS));
+    } else if (url.hostname === 'fonts.googleapis.com') {
+        event.respondWith(staleWhileRevalidate(event, FONTS));
+    }
+});
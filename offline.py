@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Service Worker for Repeat Visits and Offline Reading
+Run from the ROOT of your site directory, AFTER fingerprint.py build:
+python3 offline.py build
+
+Writes sw.js at the site root (registered by js/main.js):
+
+  precache   the shell (fingerprinted css/ and js/ from asset-manifest.json)
+             and the hub pages in PRECACHE_PAGES, fetched on install;
+             navigations match them by directory URL, so /pages/index.html
+             is served the precached /pages/
+  pages      every other page: stale-while-revalidate — served from cache
+             at once, refreshed in the background; the newest MAX_PAGES
+             are kept, so articles read before stay readable offline
+  assets     any fingerprinted file (images too): cache-first, since a
+             hashed name never changes content
+  fonts      Google Fonts: the stylesheet stale-while-revalidate, the font
+             files cache-first
+
+The worker's VERSION is a hash of the precached files' contents, so any
+change to the shell or a hub produces a byte-different sw.js; browsers
+install it, and activation drops the old precache. An unchanged site
+rebuilds to the same sw.js, and publish.py uploads nothing.
+
+Offline navigations to a page that was never read get a small page
+listing the ones that were.
+
+Edits go through staging.Transaction like the other build steps (undo:
+python3 snapshots.py rollback <run>).
+
+  python3 offline.py build [--dry-run]
+  python3 offline.py show               # version and precache list
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+
+import fingerprint
+import snapshots
+import staging
+from speculation import url_for
+
+SW_FILE = "sw.js"
+# Hub pages fetched on install (skipped if missing)
+PRECACHE_PAGES = ("index.html", "pages/index.html", "pages/radon-hub.html")
+SHELL_EXTS = (".css", ".js")
+MAX_PAGES = 60       # articles kept for offline reading
+MAX_ASSETS = 200     # fingerprinted images etc. outside the precache
+MAX_FONTS = 30
+
+SW_TEMPLATE = """\
+// Generated by offline.py from asset-manifest.json and the hub pages — edits are overwritten.
+const VERSION = '__VERSION__';
+const PRECACHE = 'burp-precache-' + VERSION;
+const PAGES = 'burp-pages';
+const ASSETS = 'burp-assets';
+const FONTS = 'burp-fonts';
+const PRECACHE_URLS = __PRECACHE__;
+const LIMITS = { [PAGES]: __MAX_PAGES__, [ASSETS]: __MAX_ASSETS__, [FONTS]: __MAX_FONTS__ };
+const HASHED = /\\.[0-9a-f]{__HASH_LEN__}\\.[A-Za-z0-9]+$/;
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(caches.open(PRECACHE)
+        .then((cache) => cache.addAll(PRECACHE_URLS.map((url) => new Request(url, { cache: 'reload' }))))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(caches.keys()
+        .then((keys) => Promise.all(keys
+            .filter((key) => key.startsWith('burp-precache-') && key !== PRECACHE)
+            .map((key) => caches.delete(key))))
+        .then(() => self.clients.claim()));
+});
+
+// Runtime caches keep their newest entries (put() moves a key to the end).
+async function store(name, request, response) {
+    const cache = await caches.open(name);
+    await cache.put(request, response);
+    const keys = await cache.keys();
+    await Promise.all(keys.slice(0, Math.max(0, keys.length - LIMITS[name])).map((k) => cache.delete(k)));
+}
+
+async function staleWhileRevalidate(event, name) {
+    const cached = await caches.match(event.request, { cacheName: name });
+    const network = fetch(event.request).then((response) => {
+        if (response.ok) event.waitUntil(store(name, event.request, response.clone()));
+        return response;
+    });
+    if (!cached) return network;
+    event.waitUntil(network.catch(() => null));
+    return cached;
+}
+
+async function cacheFirst(event, name) {
+    const cached = await caches.match(event.request);
+    if (cached) return cached;
+    const response = await fetch(event.request);
+    if (response.ok || response.type === 'opaque') event.waitUntil(store(name, event.request, response.clone()));
+    return response;
+}
+
+// Hub pages are precached by directory URL: /pages/index.html is /pages/
+function precacheKey(request) {
+    const url = new URL(request.url);
+    url.search = '';
+    url.pathname = url.pathname.replace(/\\/index\\.html$/, '/');
+    return url.href;
+}
+
+async function page(event) {
+    const precached = await caches.match(precacheKey(event.request), { cacheName: PRECACHE });
+    if (precached) return precached;
+    try {
+        return await staleWhileRevalidate(event, PAGES);
+    } catch (e) {
+        return offline();
+    }
+}
+
+async function offline() {
+    const cache = await caches.open(PAGES);
+    const read = (await cache.keys()).map((r) => new URL(r.url).pathname).reverse();
+    const title = (path) => {
+        const slug = path.replace(/\\/index\\.html$/, '/').split('/').pop()
+            .replace(/\\.html$/, '').replace(/-/g, ' ');
+        return slug ? slug.charAt(0).toUpperCase() + slug.slice(1) : path;
+    };
+    const items = read.map((p) => '<li><a href="' + p + '">' + title(p) + '</a></li>').join('');
+    const html = '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">'
+        + '<meta name="viewport" content="width=device-width, initial-scale=1.0">'
+        + '<title>Offline | MyHouseIsBurping.com</title></head>'
+        + '<body style="font-family:sans-serif;max-width:40rem;margin:2rem auto;padding:0 1rem">'
+        + '<h1>You\\'re offline</h1><p>This page isn\\'t saved yet. These are:</p>'
+        + '<ul>' + items + '</ul><p><a href="/pages/">All articles</a></p></body></html>';
+    return new Response(html, { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+self.addEventListener('fetch', (event) => {
+    if (event.request.method !== 'GET') return;
+    const url = new URL(event.request.url);
+    if (url.origin === location.origin) {
+        if (event.request.mode === 'navigate') event.respondWith(page(event));
+        else if (HASHED.test(url.pathname)) event.respondWith(cacheFirst(event, ASSETS));
+    } else if (url.hostname === 'fonts.gstatic.com') {
+        event.respondWith(cacheFirst(event, FONTS));
+    } else if (url.hostname === 'fonts.googleapis.com') {
+        event.respondWith(staleWhileRevalidate(event, FONTS));
+    }
+});
+"""
+
+
+# ─────────────────────────────────────────
+# PRECACHE
+# ─────────────────────────────────────────
+def precache_entries(root="."):
+    """[(url, site path)] — fingerprinted shell first, then the hub pages."""
+    manifest = fingerprint.read_manifest(root)
+    entries = [("/" + hashed, hashed) for name, hashed in sorted(manifest.items())
+               if name.endswith(SHELL_EXTS)]
+    entries += [(url_for(path), path) for path in PRECACHE_PAGES
+                if os.path.exists(os.path.join(root, path))]
+    return entries
+
+
+def sw_version(entries, root="."):
+    """Content hash of the precache (and of the worker code itself)."""
+    h = hashlib.sha256(SW_TEMPLATE.encode("utf-8"))
+    for url, path in entries:
+        h.update(f"{url} {snapshots.sha256_file(os.path.join(root, path))}\n".encode("utf-8"))
+    return h.hexdigest()[:fingerprint.HASH_LEN]
+
+
+def render_sw(entries, version):
+    values = {
+        "__VERSION__": version,
+        "__PRECACHE__": json.dumps([url for url, _ in entries], indent=4),
+        "__MAX_PAGES__": str(MAX_PAGES),
+        "__MAX_ASSETS__": str(MAX_ASSETS),
+        "__MAX_FONTS__": str(MAX_FONTS),
+        "__HASH_LEN__": str(fingerprint.HASH_LEN),
+    }
+    text = SW_TEMPLATE
+    for key, value in values.items():
+        text = text.replace(key, value)
+    return text
+
+
+def check_precache(tx):
+    """Every URL sw.js precaches must exist, or the worker never installs."""
+    problems = []
+    for url, path in precache_entries(tx.tree):
+        if not tx.exists(path):
+            problems.append(f"{SW_FILE}: precached {url} is missing")
+    return problems
+
+
+def build(tx):
+    """Stage sw.js. Returns (version, entries, changed)."""
+    entries = precache_entries(tx.tree)
+    version = sw_version(entries, tx.tree)
+    text = render_sw(entries, version)
+    current = tx.read(SW_FILE) if tx.exists(SW_FILE) else None
+    if text != current:
+        tx.write(SW_FILE, text)
+    return version, entries, text != current
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the versioned service worker (sw.js).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--dry-run", action="store_true", help="stage and verify, but don't swap in")
+    sub.add_parser("show")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    if not fingerprint.read_manifest():
+        print(f"❌ No {fingerprint.MANIFEST} — run: python3 fingerprint.py build")
+        return 1
+
+    if args.cmd == "show":
+        entries = precache_entries()
+        print(f"{SW_FILE} version {sw_version(entries)} — {len(entries)} precached:")
+        for url, path in entries:
+            print(f"   {url}")
+        return 0
+
+    snap_run = None if args.dry_run else snapshots.begin_run("offline")
+    tx = staging.Transaction("offline", run=snap_run).begin()
+    try:
+        version, entries, changed = build(tx)
+        if args.dry_run:
+            problems = tx.validate([check_precache])
+            tx.abort()
+            print(f"🔍 Dry run: {SW_FILE} version {version}, {len(entries)} precached, "
+                  f"{'changed' if changed else 'unchanged'}")
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1 if problems else 0
+        tx.commit([check_precache])
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Validation failed — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    if not changed:
+        print(f"✅ {SW_FILE} is current (version {version})")
+        return 0
+    print(f"✅ {SW_FILE} version {version}: {len(entries)} URLs precached")
+    print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
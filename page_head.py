@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Deterministic <head> + JSON-LD Renderer
+Used by generate_articles.py, radon_states.py and hubs.py.
+
+Everything in an article's <head> is known before the model writes a
+word: title, canonical, og:* tags and the breadcrumb all come straight
+from the ARTICLES entry. The only parts that depend on the article text
+(meta description, FAQPage questions, HowTo steps) are extracted from the
+generated body here. The model therefore writes body content only, and
+canonicals/og:url are correct at source — no post-hoc fix pass needed.
+"""
+
+import re
+import json
+from html import escape, unescape
+from html.parser import HTMLParser
+
+from site_config import BASE_URL, ADSENSE_CLIENT
+
+SITE_NAME = "MyHouseIsBurping.com"
+
+# Breadcrumb middle crumb for articles that don't set "section"
+DEFAULT_SECTION = ("Causes", "/pages/house-burping-causes.html")
+
+META_DESCRIPTION_MAX = 160
+
+
+# ─────────────────────────────────────────
+# BODY PARSING
+# ─────────────────────────────────────────
+def _clean(text):
+    return re.sub(r"\s+", " ", unescape(text)).strip()
+
+
+class BodyFacts(HTMLParser):
+    """
+    One pass over the generated body collecting what the head needs:
+      - direct_answer: text of the first .direct-answer box
+      - questions:     [(heading text, first paragraph after it)] for
+                       h2/h3 headings phrased as questions
+      - steps:         [(name, text)] from the first <ol> (prefers
+                       <ol class="howto-steps">); name = <strong> lead-in
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.direct_answer = ""
+        self.questions = []
+        self.steps = []
+
+        self._answer_depth = 0    # div nesting inside .direct-answer
+        self._answer_buf = []
+        self._heading = None      # tag name while inside h2/h3
+        self._heading_buf = []
+        self._want_para = None    # question waiting for its answer paragraph
+        self._para_buf = None
+        self._ol_depth = 0
+        self._ol_done = False
+        self._li_buf = None
+        self._step_name = None
+        self._strong_buf = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if tag == "div":
+            if self._answer_depth:
+                self._answer_depth += 1
+            elif "direct-answer" in classes and not self.direct_answer:
+                self._answer_depth = 1
+        elif tag in ("h2", "h3"):
+            self._heading, self._heading_buf = tag, []
+            self._want_para = None
+        elif tag == "p" and self._want_para is not None:
+            self._para_buf = []
+        elif tag == "ol" and not self._ol_done:
+            if "howto-steps" in classes:
+                self.steps = []  # explicit step list wins over an earlier <ol>
+            self._ol_depth += 1
+        elif tag == "li" and self._ol_depth == 1:
+            self._li_buf, self._step_name = [], None
+        elif tag == "strong" and self._li_buf is not None and not "".join(self._li_buf).strip():
+            self._strong_buf = []  # <strong> lead-in names the step
+
+    def handle_endtag(self, tag):
+        if tag == "div" and self._answer_depth:
+            self._answer_depth -= 1
+            if not self._answer_depth:
+                self.direct_answer = _clean("".join(self._answer_buf))
+        elif tag == self._heading:
+            text = _clean("".join(self._heading_buf))
+            self._heading = None
+            if text.endswith("?"):
+                self._want_para = text
+        elif tag == "p" and self._para_buf is not None:
+            answer = _clean("".join(self._para_buf))
+            if answer:
+                self.questions.append((self._want_para, answer))
+            self._want_para, self._para_buf = None, None
+        elif tag == "strong" and self._strong_buf is not None:
+            self._step_name = _clean("".join(self._strong_buf)).rstrip(":.—- ")
+            self._strong_buf = None
+        elif tag == "li" and self._li_buf is not None and self._ol_depth == 1:
+            text = _clean("".join(self._li_buf))
+            name = self._step_name or text.split(". ")[0]
+            if text:
+                self.steps.append((name, text))
+            self._li_buf, self._step_name = None, None
+        elif tag == "ol" and self._ol_depth:
+            self._ol_depth -= 1
+            if not self._ol_depth and self.steps:
+                self._ol_done = True
+
+    def handle_data(self, data):
+        if self._answer_depth:
+            self._answer_buf.append(data)
+        if self._heading:
+            self._heading_buf.append(data)
+        if self._para_buf is not None:
+            self._para_buf.append(data)
+        if self._li_buf is not None:
+            self._li_buf.append(data)
+        if self._strong_buf is not None:
+            self._strong_buf.append(data)
+
+
+def parse_body(body_html):
+    facts = BodyFacts()
+    facts.feed(body_html)
+    facts.close()
+    return facts
+
+
+# ─────────────────────────────────────────
+# HEAD PARTS
+# ─────────────────────────────────────────
+def canonical_url(article):
+    return f"{BASE_URL}/pages/{article['slug']}.html"
+
+
+def meta_description(text, limit=META_DESCRIPTION_MAX):
+    """Trim to `limit` chars on a word boundary."""
+    text = _clean(text)
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0].rstrip(",;:—- ")
+    return cut + "…"
+
+
+def breadcrumb_trail(article):
+    section_name, section_path = article.get("section", DEFAULT_SECTION)
+    return [
+        ("Home", f"{BASE_URL}/"),
+        (section_name, f"{BASE_URL}{section_path}"),
+        (article["title"], canonical_url(article)),
+    ]
+
+
+def _json_ld(data):
+    # "</" inside a <script> would end it early
+    text = json.dumps(data, indent=2, ensure_ascii=False).replace("</", "<\\/")
+    return f'<script type="application/ld+json">\n{text}\n</script>'
+
+
+def breadcrumb_json_ld(article):
+    return {
+        "@context": "https://schema.org",
+        "@type": "BreadcrumbList",
+        "itemListElement": [
+            {"@type": "ListItem", "position": i, "name": name, "item": url}
+            for i, (name, url) in enumerate(breadcrumb_trail(article), 1)
+        ],
+    }
+
+
+def schema_json_ld(article, facts, description):
+    """FAQPage or HowTo from the parsed body, CollectionPage from "items"; Article otherwise."""
+    if article["schema_type"] == "FAQPage" and facts.questions:
+        return {
+            "@context": "https://schema.org",
+            "@type": "FAQPage",
+            "mainEntity": [
+                {
+                    "@type": "Question",
+                    "name": q,
+                    "acceptedAnswer": {"@type": "Answer", "text": a},
+                }
+                for q, a in facts.questions
+            ],
+        }
+    if article["schema_type"] == "HowTo" and facts.steps:
+        return {
+            "@context": "https://schema.org",
+            "@type": "HowTo",
+            "name": article["title"],
+            "description": description,
+            "step": [
+                {"@type": "HowToStep", "position": i, "name": name, "text": text}
+                for i, (name, text) in enumerate(facts.steps, 1)
+            ],
+        }
+    if article["schema_type"] == "CollectionPage" and article.get("items"):
+        return {
+            "@context": "https://schema.org",
+            "@type": "CollectionPage",
+            "name": article["title"],
+            "description": description,
+            "url": canonical_url(article),
+            "mainEntity": {
+                "@type": "ItemList",
+                "itemListElement": [
+                    {"@type": "ListItem", "position": i, "url": url}
+                    for i, url in enumerate(article["items"], 1)
+                ],
+            },
+        }
+    return {
+        "@context": "https://schema.org",
+        "@type": "Article",
+        "headline": article["title"],
+        "description": description,
+        "mainEntityOfPage": canonical_url(article),
+        "publisher": {"@type": "Organization", "name": SITE_NAME},
+    }
+
+
+def render_head(article, body_html):
+    """Complete <head> block for a generated article."""
+    facts = parse_body(body_html)
+    description = meta_description(facts.direct_answer or article["intent"])
+    url = canonical_url(article)
+    title = escape(article["title"])
+    desc = escape(description)
+
+    return f"""<head>
+<meta charset="utf-8"/>
+<meta content="width=device-width, initial-scale=1.0" name="viewport"/>
+<title>{title}</title>
+<meta content="{desc}" name="description"/>
+<meta content="{escape(article['keyword'])}" name="keywords"/>
+<link href="/css/styles.css" rel="stylesheet"/>
+<link href="{url}" rel="canonical"/>
+<!-- Open Graph -->
+<meta content="{title}" property="og:title"/>
+<meta content="{desc}" property="og:description"/>
+<meta content="{url}" property="og:url"/>
+<meta content="article" property="og:type"/>
+<meta content="{SITE_NAME}" property="og:site_name"/>
+<meta content="summary" name="twitter:card"/>
+<!-- Schema.org {escape(article['schema_type'])} JSON-LD -->
+{_json_ld(schema_json_ld(article, facts, description))}
+<!-- Breadcrumb Schema -->
+{_json_ld(breadcrumb_json_ld(article))}
+<meta content="{ADSENSE_CLIENT}" name="google-adsense-account"/>
+</head>"""
+
+
+def render_breadcrumb_nav(article):
+    """Visible breadcrumb matching the BreadcrumbList JSON-LD."""
+    (home, home_url), (section, section_url), (current, _) = breadcrumb_trail(article)
+    return f"""<nav aria-label="Breadcrumb" class="breadcrumb">
+<ol>
+<li><a href="/">{escape(home)}</a></li>
+<li><a href="{escape(section_url[len(BASE_URL):])}">{escape(section)}</a></li>
+<li aria-current="page">{escape(current)}</li>
+</ol>
+</nav>"""
+
+
+# ─────────────────────────────────────────
+# PAGE WRAPPER (adds head/nav/breadcrumb/footer around article content)
+# ─────────────────────────────────────────
+def wrap_page(head_content, body_content, article):
+    """Wraps generated content in the site's nav and footer."""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+{head_content}
+
+<body>
+   <header class="site-header">
+      <div class="container nav-container" style="display: flex; justify-content: space-between; align-items: center;">
+         <a href="/" class="logo" aria-label="MyHouseIsBurping Home">
+            MyHouseIsBurping<span class="accent-orange">.com</span>
+         </a>
+         <button class="nav-toggle" aria-label="Toggle navigation" aria-expanded="false">
+            <span class="sr-only">Menu</span>☰
+         </button>
+         <nav aria-label="Main navigation">
+            <ul class="nav-menu">
+               <li><a href="/">Home</a></li>
+               <li><a href="/pages/house-burping-causes.html">Causes</a></li>
+               <li><a href="/pages/is-house-burping-normal.html">Is It Normal?</a></li>
+               <li><a href="/pages/how-to-stop-house-burping.html">Solutions</a></li>
+               <li><a href="/pages/when-to-call-a-professional.html">Get Help</a></li>
+            </ul>
+         </nav>
+      </div>
+   </header>
+
+   <main class="article-container">
+{render_breadcrumb_nav(article)}
+<article>
+{body_content}
+</article>
+   </main>
+
+   <footer style="background: #2c3e50; color: #fff; padding: 2rem 0; text-align: center;">
+      <div class="container">
+         <p>© 2024 MyHouseIsBurping.com. All rights reserved.</p>
+         <p style="font-size: 0.8rem; opacity: 0.7;">Disclaimer: This website is for informational purposes only. Always consult a certified home inspector for structural concerns.</p>
+         <nav style="margin-top: 1rem;">
+            <a href="/" style="color: white; text-decoration: underline;">Home</a> |
+            <a href="/pages/when-to-call-a-professional.html" style="color: white; text-decoration: underline;">Professional Help</a>
+         </nav>
+      </div>
+   </footer>
+
+   <script src="../js/main.js"></script>
+</body>
+</html>"""
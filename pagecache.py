@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Parsed-Page Cache
+Used by fix_site.py, fix_final.py and staging.py.
+
+Every site tool needs the same few facts about each page (canonical,
+title, description, links, JSON-LD types, size, a handful of flags).
+They are extracted once per distinct page content and kept in ONE file,
+_cache/pages.json:
+
+  stat     path → [size, mtime_ns, sha256]      (skip unchanged files)
+  records  sha256 → PageRecord row              (content-addressed)
+  strings  interned URL table shared by all rows
+
+A warm run over an unchanged site therefore stats each file and reads
+only the cache file; HTML is opened only for pages that actually changed
+or that a tool decides (from the record) it has to edit.
+
+  python3 pagecache.py scan            # warm the cache for the whole site
+  python3 pagecache.py show <page>     # print one record
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+from site_config import ADSENSE_CLIENT, load_json, save_json
+
+CACHE_FILE = "_cache/pages.json"
+VERSION = 1
+
+# ─────────────────────────────────────────
+# EXTRACTION
+# ─────────────────────────────────────────
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+META_RE = re.compile(r"<meta\b[^>]*>", re.I)
+LINK_RE = re.compile(r"<link\b[^>]*>", re.I)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+LD_JSON_RE = re.compile(r'<script[^>]*application/ld\+json[^>]*>(.*?)</script>', re.I | re.S)
+SPACE_RE = re.compile(r"[\s<>]")
+REF_DELIMITERS = (" ", "\n", "\t", "\r", '"', "'", "<", ">")
+HOME_NAV = ('<li><a href="/">Home</a></li>', "<li><a href='/'>Home</a></li>")
+
+FLAGS = ("adsense", "head_close", "html_close", "hub_link", "home_nav")
+
+
+class PageRecord:
+    """Facts about one page content. Path-independent: keyed by sha256."""
+
+    __slots__ = ("sha", "size", "title", "description", "canonical", "og_url",
+                 "urls", "refs", "ld_types") + FLAGS
+
+    def __init__(self, sha, size, title="", description="", canonical="", og_url="",
+                 urls=(), refs=(), ld_types=(), **flags):
+        self.sha = sha
+        self.size = size
+        self.title = title
+        self.description = description
+        self.canonical = canonical
+        self.og_url = og_url
+        self.urls = frozenset(urls)
+        self.refs = frozenset(refs)
+        self.ld_types = tuple(ld_types)
+        for name in FLAGS:
+            setattr(self, name, bool(flags.get(name)))
+
+    def links_to(self, fragment):
+        """True if any quoted URL or .html reference contains `fragment`."""
+        return any(fragment in u for u in self.urls) or any(fragment in r for r in self.refs)
+
+    def __repr__(self):
+        return f"<PageRecord {self.sha[:10]} {self.size}B {self.title[:40]!r}>"
+
+
+def quoted_urls(html):
+    """
+    Every double-quoted run without whitespace that looks like a URL. All
+    quote-to-quote segments are kept (not just attribute values), so
+    `'"/radon/"' in html` ⇔ `"/radon/" in quoted_urls(html)`.
+    """
+    return [s for s in html.split('"')[1:-1]
+            if ("/" in s or ".html" in s) and not SPACE_RE.search(s)]
+
+
+def html_refs(html):
+    """Text from the previous delimiter up to each ".html", quoted or not."""
+    refs = []
+    end = html.find(".html")
+    while end != -1:
+        end += 5
+        start = max(html.rfind(d, 0, end) for d in REF_DELIMITERS) + 1
+        refs.append(html[start:end])
+        end = html.find(".html", end)
+    return refs
+
+
+def _attrs(tag):
+    return {k.lower(): v for k, v in ATTR_RE.findall(tag)}
+
+
+def _ld_types(html):
+    types = []
+    for block in LD_JSON_RE.findall(html):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            types.append("invalid")
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data])
+        for item in items:
+            t = item.get("@type") if isinstance(item, dict) else None
+            types.extend(t if isinstance(t, list) else [t or "unknown"])
+    return types
+
+
+def parse_page(html, sha=None):
+    """Extract a PageRecord from page text."""
+    data = html.encode("utf-8", errors="replace")
+    sha = sha or hashlib.sha256(data).hexdigest()
+
+    title = TITLE_RE.search(html)
+    description = og_url = canonical = ""
+    for tag in META_RE.findall(html):
+        a = _attrs(tag)
+        if a.get("name", "").lower() == "description" and not description:
+            description = a.get("content", "")
+        elif a.get("property", "").lower() == "og:url" and not og_url:
+            og_url = a.get("content", "")
+    for tag in LINK_RE.findall(html):
+        a = _attrs(tag)
+        if a.get("rel", "").lower() == "canonical":
+            canonical = a.get("href", "")
+            break
+
+    return PageRecord(
+        sha, len(data),
+        title=re.sub(r"\s+", " ", title.group(1)).strip() if title else "",
+        description=description,
+        canonical=canonical,
+        og_url=og_url,
+        urls=quoted_urls(html),
+        refs=html_refs(html),
+        ld_types=_ld_types(html),
+        adsense=ADSENSE_CLIENT in html,
+        head_close="</head>" in html,
+        html_close=re.search(r"</html\s*>", html, re.I) is not None,
+        hub_link='href="/pages/"' in html or "All Articles" in html,
+        home_nav=any(p in html for p in HOME_NAV),
+    )
+
+
+# ─────────────────────────────────────────
+# CACHE
+# ─────────────────────────────────────────
+class PageCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.stat = {}
+        self.records = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        data = load_json(self.path)
+        if data.get("version") != VERSION:
+            return  # stale layout: start cold
+        strings = data["strings"]
+        self.stat = data["stat"]
+        for sha, row in data["records"].items():
+            size, title, desc, canonical, og_url, flags, urls, refs, ld = row
+            self.records[sha] = PageRecord(
+                sha, size, title, desc, canonical, og_url,
+                urls=[strings[i] for i in urls],
+                refs=[strings[i] for i in refs],
+                ld_types=[strings[i] for i in ld],
+                **{name: flags >> bit & 1 for bit, name in enumerate(FLAGS)},
+            )
+
+    def get(self, path, fs_path=None, remember=True):
+        """
+        Record for site-relative `path`, read from `fs_path` (default: path).
+        Unchanged files (same size + mtime) are answered without opening them.
+        remember=False looks a file up without making it the path's entry
+        (e.g. the served copy of a page that is about to be replaced).
+        """
+        fs_path = fs_path or path
+        st = os.stat(fs_path)
+        cached = self.stat.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            record = self.records.get(cached[2])
+            if record is not None:
+                self.hits += 1
+                return record
+
+        self.misses += 1
+        with open(fs_path, "rb") as f:
+            data = f.read()
+        sha = hashlib.sha256(data).hexdigest()
+        record = self.records.get(sha)
+        if record is None:
+            record = parse_page(data.decode("utf-8", errors="replace"), sha)
+            record.size = len(data)
+            self.records[sha] = record
+        if remember:
+            self.stat[path] = [st.st_size, st.st_mtime_ns, sha]
+        self.dirty = True
+        return record
+
+    def put(self, path, fs_path, text):
+        """Record text a tool has just written to `fs_path`, without re-reading it."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        if sha not in self.records:
+            self.records[sha] = parse_page(text, sha)
+        st = os.stat(fs_path)
+        self.stat[path] = [st.st_size, st.st_mtime_ns, sha]
+        self.dirty = True
+
+    def save(self):
+        """Write the cache (only records some path still points at)."""
+        if not self.dirty:
+            return
+        live = {entry[2] for entry in self.stat.values()}
+        strings, index = [], {}
+
+        def intern(values):
+            out = []
+            for v in sorted(values):
+                if v not in index:
+                    index[v] = len(strings)
+                    strings.append(v)
+                out.append(index[v])
+            return out
+
+        rows = {}
+        for sha in sorted(live):
+            r = self.records.get(sha)
+            if r is None:
+                continue
+            flags = sum(1 << bit for bit, name in enumerate(FLAGS) if getattr(r, name))
+            rows[sha] = [r.size, r.title, r.description, r.canonical, r.og_url, flags,
+                         intern(r.urls), intern(r.refs), intern(r.ld_types)]
+        stat = {p: e for p, e in self.stat.items() if e[2] in rows}
+
+        save_json(self.path, {"version": VERSION, "strings": strings, "stat": stat, "records": rows},
+                  indent=None, ensure_ascii=False, separators=(",", ":"))
+        self.dirty = False
+
+
+def site_pages(root="."):
+    """Site-relative paths of every .html page the tools work on."""
+    pages = []
+    for folder in ("", "pages", "radon"):
+        d = os.path.join(root, folder)
+        if os.path.isdir(d):
+            pages.extend(f"{folder}/{n}" if folder else n
+                         for n in sorted(os.listdir(d)) if n.endswith(".html"))
+    return pages
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parsed-page cache for the site tools.")
+    parser.add_argument("--cache", default=CACHE_FILE)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("scan")
+    p = sub.add_parser("show"); p.add_argument("page")
+    args = parser.parse_args(argv)
+
+    cache = PageCache(args.cache)
+    if args.cmd == "scan":
+        pages = site_pages()
+        for path in pages:
+            cache.get(path)
+        cache.save()
+        print(f"✅ {len(pages)} pages: {cache.hits} cached, {cache.misses} parsed → {args.cache}")
+        return 0
+
+    if not os.path.exists(args.page):
+        print(f"❌ {args.page} not found")
+        return 1
+    r = cache.get(args.page)
+    cache.save()
+    for name in ("sha", "size", "title", "description", "canonical", "og_url", "ld_types") + FLAGS:
+        print(f"  {name:<12} {getattr(r, name)}")
+    print(f"  {'urls':<12} {len(r.urls)}")
+    for u in sorted(r.urls):
+        print(f"               {u}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
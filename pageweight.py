@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Page Weight at Initial Load
+Run from the ROOT of your site directory: python3 pageweight.py
+
+Static model of what a browser requests before onload, without running
+any JavaScript (what a headless load sees before main.js decides to do
+anything lazily):
+
+  · <link rel="stylesheet|preload|modulepreload|icon"> and <script src>
+  · <img src> unless loading="lazy"
+  · render-blocking = stylesheets + <script src> in <head> without async/defer
+
+Same-site files are weighed from disk (gzip, as served). Third-party
+requests use typical transfer sizes from THIRD_PARTY_BYTES, so those
+numbers are estimates — good for before/after, not for absolutes.
+
+  python3 pageweight.py                          # summary for the site
+  python3 pageweight.py --save before.json       # keep a measurement
+  python3 pageweight.py --compare before.json    # before → now, per metric
+"""
+
+import os
+import sys
+import gzip
+import json
+import argparse
+import posixpath
+from html.parser import HTMLParser
+
+from pagecache import site_pages
+from site_config import SITE_HOSTS
+
+# Typical compressed transfer sizes, including what the entry script pulls in.
+THIRD_PARTY_BYTES = {
+    "pagead2.googlesyndication.com": 190_000,  # adsbygoogle.js + show_ads_impl
+    "fonts.googleapis.com": 1_500,
+    "fonts.gstatic.com": 25_000,
+}
+THIRD_PARTY_DEFAULT = 20_000
+METRICS = ("html_bytes", "requests", "third_party", "blocking", "bytes")
+
+
+class _Resources(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_head = False
+        self.found = []   # (url, blocking)
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "head":
+            self.in_head = True
+        elif tag == "body":
+            self.in_head = False
+        elif tag == "link" and a.get("href"):
+            rel = (a.get("rel") or "").lower().split()
+            if "stylesheet" in rel:
+                self.found.append((a["href"], True))
+            elif {"preload", "modulepreload", "icon"} & set(rel):
+                self.found.append((a["href"], False))
+        elif tag == "script" and a.get("src"):
+            deferred = "async" in a or "defer" in a or a.get("type") == "module"
+            self.found.append((a["src"], self.in_head and not deferred))
+        elif tag == "img" and a.get("src") and (a.get("loading") or "").lower() != "lazy":
+            self.found.append((a["src"], False))
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+
+
+def _host(url):
+    return url.split("//", 1)[1].split("/", 1)[0] if "//" in url else ""
+
+
+class Site:
+    """Gzipped sizes of same-site files, read once per run."""
+
+    def __init__(self, root="."):
+        self.root = root
+        self.sizes = {}
+
+    def local_path(self, url, page_path):
+        url = url.split("#")[0].split("?")[0]
+        if not url.startswith("/"):
+            url = "/" + posixpath.join(posixpath.dirname(page_path), url)
+        return posixpath.normpath(url).lstrip("/")
+
+    def gzip_size(self, path):
+        if path not in self.sizes:
+            full = os.path.join(self.root, path)
+            if os.path.isfile(full):
+                with open(full, "rb") as f:
+                    self.sizes[path] = len(gzip.compress(f.read()))
+            else:
+                self.sizes[path] = 0
+        return self.sizes[path]
+
+
+def measure_page(html, page_path, site):
+    parser = _Resources()
+    parser.feed(html)
+    m = {"html_bytes": len(gzip.compress(html.encode("utf-8"))), "requests": 1,
+         "third_party": 0, "blocking": 0}
+    m["bytes"] = m["html_bytes"]
+    seen = set()
+    for url, blocking in parser.found:
+        if url.startswith("data:") or url in seen:
+            continue
+        seen.add(url)
+        m["requests"] += 1
+        m["blocking"] += blocking
+        host = _host(url)
+        if host in SITE_HOSTS:
+            url = url.split(host, 1)[1] or "/"
+        elif host:
+            m["third_party"] += 1
+            m["bytes"] += THIRD_PARTY_BYTES.get(host, THIRD_PARTY_DEFAULT)
+            continue
+        m["bytes"] += site.gzip_size(site.local_path(url, page_path))
+    return m
+
+
+def measure(root="."):
+    """{page: metrics} for every site page under `root` (the site or a staging tree)."""
+    site = Site(root)
+    pages = {}
+    for path in site_pages(root):
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        if "<html" not in html.lower():
+            continue  # fragments such as footer.html
+        pages[path] = measure_page(html, path, site)
+    return pages
+
+
+def summarize(pages):
+    """{metric: {"median": x, "total": y}}."""
+    out = {}
+    for metric in METRICS:
+        values = sorted(p[metric] for p in pages.values())
+        out[metric] = {"median": values[len(values) // 2] if values else 0, "total": sum(values)}
+    return out
+
+
+def _fmt(metric, value):
+    return f"{value / 1024:,.1f} KB" if metric.endswith("bytes") else f"{value:,}"
+
+
+def print_summary(pages, title="Initial load"):
+    s = summarize(pages)
+    print(f"📦 {title} — {len(pages)} pages (median per page / site total)")
+    for metric in METRICS:
+        print(f"   {metric:<12} {_fmt(metric, s[metric]['median']):>12}  {_fmt(metric, s[metric]['total']):>14}")
+
+
+def print_compare(before, after, title="Initial load, before → after"):
+    b, a = summarize(before), summarize(after)
+    print(f"📦 {title} (median per page)")
+    for metric in METRICS:
+        old, new = b[metric]["median"], a[metric]["median"]
+        change = f"{(new - old) / old:+.0%}" if old else ""
+        print(f"   {metric:<12} {_fmt(metric, old):>12} → {_fmt(metric, new):>12}  {change}")
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static initial-load page weight.")
+    parser.add_argument("--save", metavar="FILE", help="write per-page metrics to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved measurement")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    pages = measure()
+    if args.compare:
+        with open(args.compare) as f:
+            print_compare(json.load(f), pages)
+    else:
+        print_summary(pages)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(pages, f, indent=1, sort_keys=True)
+        print(f"   📄 {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Stage Profiling
+Used by fix_final.py, fix_site.py, generate_articles.py, rewrite_site.py
+and staging.py.
+
+  python3 fix_final.py --profile                  # → _profile/fix_final-<stamp>.trace.json
+  python3 fix_final.py --profile run.trace.json --cprofile step3_fix_links
+  python3 fix_final.py --profile run.trace.json --cprofile auto
+
+Scripts wrap each step in a span and iterate files through each(),
+which puts every loop iteration in its own span:
+
+  with profiling.span("step3_fix_links"):
+      for filepath in profiling.each(files):
+          ...
+
+The trace is Chrome trace-event JSON: open it in chrome://tracing,
+https://ui.perfetto.dev or https://www.speedscope.app as a flamegraph.
+
+--cprofile STAGE additionally runs cProfile over that one step and writes
+<trace>.<stage>.pstats next to the trace; "auto" picks the slowest step
+of the previous trace (the one at TRACE, else the newest for the tool).
+
+When profiling is off, span() returns a shared no-op context manager and
+each() returns the iterable untouched.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+
+PROFILE_DIR = "_profile"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+_active = None  # the Profiler while --profile is on
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "cat", "args", "start", "cprof")
+
+    def __init__(self, profiler, name, cat, args):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.cprof = None
+
+    def __enter__(self):
+        if self.cat == "step" and self.name == self.profiler.cprofile_stage:
+            import cProfile  # only with --cprofile; keeps every tool's startup lean
+            self.cprof = cProfile.Profile()
+            self.cprof.enable()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.cprof is not None:
+            self.cprof.disable()
+            self.profiler.cprofiles.append((self.name, self.cprof))
+        self.profiler.record(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+class Profiler:
+    def __init__(self, tool, path, cprofile_stage=None):
+        self.tool = tool
+        self.path = path
+        self.cprofile_stage = cprofile_stage
+        self.events = []
+        self.cprofiles = []
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+
+    def record(self, name, cat, start, end, args=None):
+        event = {
+            "name": name, "cat": cat, "ph": "X", "pid": self.pid,
+            "tid": threading.get_ident(),
+            "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def step_totals(self):
+        """{step name: total µs}, slowest first."""
+        totals = {}
+        for e in self.events:
+            if e["cat"] == "step":
+                totals[e["name"]] = totals.get(e["name"], 0) + e["dur"]
+        return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+    def write(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.tool}},
+        ]
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms",
+                       "otherData": {"tool": self.tool, "created": datetime.now().isoformat(),
+                                     "argv": sys.argv[1:]}}, f)
+        written = [self.path]
+        for name, prof in self.cprofiles:
+            out = f"{self.path}.{name}.pstats"
+            prof.dump_stats(out)
+            written.append(out)
+        return written
+
+
+# ─────────────────────────────────────────
+# PUBLIC API
+# ─────────────────────────────────────────
+def span(name, cat="step", **args):
+    """Context manager timing one step (cat="step") or one file (cat="file")."""
+    if _active is None:
+        return _NULL
+    return _Span(_active, name, cat, args)
+
+
+def each(items, name=str, cat="file"):
+    """Iterate `items`, timing each loop body as a span named name(item)."""
+    if _active is None:
+        return items
+    return _each(items, name, cat)
+
+
+def _each(items, name, cat):
+    for item in items:
+        with span(name(item), cat):
+            yield item
+
+
+def enabled():
+    return _active is not None
+
+
+def hottest_step(trace_path):
+    """Slowest step recorded in an existing trace, or None."""
+    if not trace_path:
+        return None
+    try:
+        with open(trace_path) as f:
+            events = json.load(f)["traceEvents"]
+    except (OSError, ValueError, KeyError):
+        return None
+    totals = {}
+    for e in events:
+        if e.get("cat") == "step":
+            totals[e["name"]] = totals.get(e["name"], 0) + e["dur"]
+    return max(totals, key=totals.get) if totals else None
+
+
+def latest_trace(tool):
+    if not os.path.isdir(PROFILE_DIR):
+        return None
+    traces = sorted(f for f in os.listdir(PROFILE_DIR)
+                    if f.startswith(tool + "-") and f.endswith(".trace.json"))
+    return os.path.join(PROFILE_DIR, traces[-1]) if traces else None
+
+
+def add_profile_args(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", nargs="?", const="", metavar="TRACE",
+                       help="write a Chrome-trace/speedscope JSON of every step and file "
+                            f"(default path: {PROFILE_DIR}/<tool>-<time>.trace.json)")
+    group.add_argument("--cprofile", metavar="STEP",
+                       help="with --profile: also cProfile STEP ('auto' = slowest step "
+                            "of the previous trace)")
+
+
+def start(tool, args):
+    """Turn profiling on if args.profile is set. Call finish() at the end."""
+    global _active
+    if getattr(args, "profile", None) is None:
+        return None
+    path = args.profile or os.path.join(
+        PROFILE_DIR, f"{tool}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.trace.json")
+    stage = args.cprofile
+    if stage == "auto":
+        stage = hottest_step(path if os.path.exists(path) else latest_trace(tool))
+    _active = Profiler(tool, path, stage)
+    return _active
+
+
+def finish(top=15):
+    """Write the trace (+ pstats) and print where the time went."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return []
+    written = profiler.write()
+    totals = profiler.step_totals()
+    print("\n⏱️  Profile — time per step:")
+    for name, us in totals.items():
+        print(f"   {us / 1e6:>9.3f}s  {name}")
+    if not profiler.cprofiles and totals:
+        print(f"   (re-run with --cprofile auto to cProfile '{next(iter(totals))}')")
+    for name, prof in profiler.cprofiles:
+        print(f"\n🔬 cProfile of {name} (top {top} by cumulative time):")
+        import pstats
+        pstats.Stats(prof, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
+    for path in written:
+        print(f"   📄 {path}")
+    return written
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Incremental Publish
+Run from the ROOT of your site directory: python3 publish.py publish --to <host>
+
+Every fix/rewrite run ends with "upload all changed files", and in
+practice the whole tree was pushed. This keeps a manifest of
+path → (size, sha256) for everything the site serves, and the host keeps
+a copy of the manifest it was last deployed from. A deploy is the
+difference between the two:
+
+  · added    — in the site, not on the host
+  · changed  — on both, different content hash
+  · removed  — on the host, no longer in the site
+
+so deploy time and bandwidth scale with the change, not the site.
+Hashing reuses the snapshot store's stat cache: files whose size, mtime,
+inode and ctime haven't moved since the last plan aren't re-read.
+
+Upload order keeps the live site consistent mid-deploy: assets first,
+HTML next (so no page references an asset the host lacks), the service
+worker after both (it precaches them), removals after that, and the
+host manifest last — an interrupted publish just plans the same files
+again.
+
+The host is a directory (DirectoryHost): a local stand-in for the real
+one, or a mounted/synced folder. Tool state (_stage, _snapshots, _cache,
+_deploy) and dotfiles are never published.
+
+  python3 publish.py plan --to ../_host [--json plan.json]
+  python3 publish.py publish --to ../_host [--dry-run]
+  python3 publish.py verify --to ../_host
+"""
+
+import os
+import sys
+import shutil
+import argparse
+from datetime import datetime
+
+import snapshots
+from site_config import load_json, save_json
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+DEPLOY_DIR = "_deploy"
+STAT_CACHE = os.path.join(DEPLOY_DIR, "stat_cache.json")
+HOST_MANIFEST = ".deploy-manifest.json"
+SKIP_SUFFIXES = (".tmp",)
+SERVICE_WORKER = "sw.js"   # offline.py
+LIST_LIMIT = 25            # paths printed per kind; --json has them all
+
+
+def _norm(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def _skip(name):
+    # same rule as staging: tool state and dotfiles stay local
+    return name.startswith("_") or name.startswith(".")
+
+
+# ─────────────────────────────────────────
+# MANIFEST
+# ─────────────────────────────────────────
+def output_files(root="."):
+    """Site-relative paths of every file the site serves, sorted."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not _skip(d))
+        rel = os.path.relpath(dirpath, root)
+        for name in filenames:
+            if _skip(name) or name.endswith(SKIP_SUFFIXES):
+                continue
+            found.append(_norm(os.path.join(rel, name)))
+    return sorted(found)
+
+
+def build_manifest(root=".", cache=None):
+    """{path: [size, sha256]} for the site under `root`."""
+    cache = cache or snapshots.StatCache(os.path.join(root, STAT_CACHE))
+    manifest = {}
+    for path in output_files(root):
+        full = os.path.join(root, path)
+        manifest[path] = [os.path.getsize(full), cache.digest(full)]
+    cache.save()
+    return manifest
+
+
+def plan(local, remote):
+    """{"added": [...], "changed": [...], "removed": [...]} — local vs last deployed."""
+    return {
+        "added": sorted(p for p in local if p not in remote),
+        "changed": sorted(p for p in local if p in remote and local[p][1] != remote[p][1]),
+        "removed": sorted(p for p in remote if p not in local),
+    }
+
+
+def upload_order(deploy):
+    """
+    Uploads with assets before HTML, so pages never reference a missing
+    file, and the service worker after both: it precaches files above it.
+    """
+    uploads = deploy["added"] + deploy["changed"]
+    return sorted(uploads, key=lambda p: (p == SERVICE_WORKER, p.endswith(".html"), p))
+
+
+def plan_bytes(deploy, local):
+    return sum(local[p][0] for p in deploy["added"] + deploy["changed"])
+
+
+# ─────────────────────────────────────────
+# HOST
+# ─────────────────────────────────────────
+class DirectoryHost:
+    """A deploy target that is a plain directory; the manifest lives at its root."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, path):
+        return os.path.join(self.root, path)
+
+    def manifest(self):
+        """Manifest of the last completed deploy ({} for a fresh host)."""
+        return load_json(self._path(HOST_MANIFEST), {"files": {}})["files"]
+
+    def put(self, path, src):
+        dst = self._path(path)
+        os.makedirs(os.path.dirname(dst) or self.root, exist_ok=True)
+        tmp = dst + ".tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)   # readers see the old file or the new one, never half
+
+    def delete(self, path):
+        dst = self._path(path)
+        if os.path.exists(dst):
+            os.remove(dst)
+        parent = os.path.dirname(dst)
+        while parent != self.root and os.path.isdir(parent) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+    def save_manifest(self, files, deployed_at):
+        os.makedirs(self.root, exist_ok=True)
+        save_json(self._path(HOST_MANIFEST), {"deployed_at": deployed_at, "files": files},
+                  indent=0, sort_keys=True)
+
+    def drift(self):
+        """Paths whose content on the host no longer matches its manifest."""
+        problems = []
+        for path, (size, sha) in sorted(self.manifest().items()):
+            full = self._path(path)
+            if not os.path.isfile(full):
+                problems.append(f"{path}: missing on host")
+            elif os.path.getsize(full) != size or snapshots.sha256_file(full) != sha:
+                problems.append(f"{path}: differs from deployed manifest")
+        return problems
+
+
+def publish(deploy, host, local, root=".", deployed_at=None):
+    """Apply a deploy plan to `host`. Returns the number of files uploaded."""
+    uploads = upload_order(deploy)
+    for path in uploads:
+        host.put(path, os.path.join(root, path))
+    for path in deploy["removed"]:
+        host.delete(path)
+    host.save_manifest(local, deployed_at or datetime.now().isoformat(timespec="seconds"))
+    return len(uploads)
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def _kb(n):
+    return f"{n / 1024:,.1f} KB"
+
+
+def print_plan(deploy, local):
+    total = sum(size for size, _ in local.values())
+    sent = plan_bytes(deploy, local)
+    print(f"📦 Deploy plan: {len(deploy['added'])} added, {len(deploy['changed'])} changed, "
+          f"{len(deploy['removed'])} removed  (of {len(local)} files)")
+    print(f"   Upload: {_kb(sent)} of {_kb(total)}")
+    for kind, mark in (("added", "+"), ("changed", "~"), ("removed", "-")):
+        for path in deploy[kind][:LIST_LIMIT]:
+            print(f"   {mark} {path}")
+        if len(deploy[kind]) > LIST_LIMIT:
+            print(f"   {mark} … and {len(deploy[kind]) - LIST_LIMIT} more {kind}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish only what changed since the last deploy.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name in ("plan", "publish", "verify"):
+        p = sub.add_parser(name)
+        p.add_argument("--to", required=True, metavar="DIR", help="host directory (local stand-in or mount)")
+        if name == "plan":
+            p.add_argument("--json", metavar="FILE", help="also write the plan as JSON")
+        if name == "publish":
+            p.add_argument("--dry-run", action="store_true", help="print the plan, upload nothing")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    host = DirectoryHost(args.to)
+
+    if args.cmd == "verify":
+        problems = host.drift()
+        if problems:
+            print(f"❌ Host differs from its manifest ({len(problems)}):")
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1
+        print(f"✅ Host matches its manifest ({len(host.manifest())} files)")
+        return 0
+
+    local = build_manifest()
+    deploy = plan(local, host.manifest())
+    print_plan(deploy, local)
+    if args.cmd == "plan":
+        if args.json:
+            save_json(args.json, dict(deploy, upload_order=upload_order(deploy),
+                                      bytes=plan_bytes(deploy, local)), indent=1)
+            print(f"   📄 {args.json}")
+        return 0
+    if args.dry_run:
+        return 0
+    if not any(deploy.values()):
+        print("✅ Host is up to date — nothing to publish")
+        return 0
+    uploaded = publish(deploy, host, local)
+    print(f"✅ Published {uploaded} file(s), removed {len(deploy['removed'])} → {args.to}")
+    print("   Next: python3 indexnow.py submit   (tell search engines what changed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Per-State Radon Pages from EPA Zone Data
+Run from the ROOT of your site directory: python3 radon_states.py build
+
+radon-levels-by-state is one model-written page for all 50 states.
+Per-state pages don't need a model at all: everything on them is a fact
+from the EPA Map of Radon Zones county list. This reads that list from a
+local CSV, aggregates it per state in one pass, and renders a page per
+state through the same template as generated articles (page_head.py) —
+no API calls, hundreds of pages in well under a second.
+
+The CSV has one row per county (header required, extra columns ignored):
+
+    state,state_name,county,fips,zone
+    IA,Iowa,Adair,19001,1
+
+A build:
+  · writes pages/radon-levels-in-<state>.html for every state in the data
+    (FAQPage + BreadcrumbList JSON-LD, via page_head.render_head)
+  · replaces the ranked state table on pages/radon-levels-by-state.html
+    (between the STATE_TABLE markers, appended to the article if absent)
+  · writes sitemap-radon-states.xml and lists it in the site's robots.txt
+    (the run fails if there is none: nothing else points crawlers at it)
+  · removes state pages it generated earlier for states no longer in the data
+
+Output is a pure function of the CSV: no dates, stable ordering. Pages
+are rendered with plain asset URLs and no speculation rules, so follow a
+build with fingerprint.py and speculation.py as usual; after those passes
+a re-run with the same data leaves every served file byte-identical and
+publish.py uploads nothing.
+Edits go through staging like the fix scripts (undo: snapshots.py rollback).
+
+  python3 radon_states.py build [--data ../data/radon_zones.csv] [--dry-run]
+  python3 radon_states.py show IA
+"""
+
+import os
+import re
+import sys
+import csv
+import argparse
+from html import escape
+
+import profiling
+import snapshots
+import staging
+from page_head import BASE_URL, render_head, wrap_page
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+DATASET = "../data/radon_zones.csv"
+REQUIRED_COLUMNS = ("state", "state_name", "county", "fips", "zone")
+ZONES = (1, 2, 3)
+ZONE_LEVELS = {1: "above 4 pCi/L", 2: "2–4 pCi/L", 3: "below 2 pCi/L"}
+ZONE_RISK = {1: "Highest", 2: "Moderate", 3: "Lower"}
+
+INDEX_PAGE = "pages/radon-levels-by-state.html"
+SITEMAP = "sitemap-radon-states.xml"
+ROBOTS = "robots.txt"           # site root, served as /robots.txt
+SITEMAP_PRIORITY = "0.60"
+SECTION = ("Radon", "/pages/radon-hub.html")
+MARKER = "<!-- radon_states.py: generated from data, edits are overwritten -->"
+TABLE_START = "<!-- STATE_TABLE:start -->"
+TABLE_END = "<!-- STATE_TABLE:end -->"
+STATE_PAGE_RE = re.compile(r"^pages/radon-levels-in-[a-z-]+\.html$")
+
+
+class DatasetError(Exception):
+    """The CSV is missing, malformed, or contradicts itself."""
+
+
+# ─────────────────────────────────────────
+# DATA
+# ─────────────────────────────────────────
+def load_counties(path=DATASET):
+    """[(state, state_name, county, fips, zone)], validated."""
+    if not os.path.exists(path):
+        raise DatasetError(f"{path} not found — export the EPA county radon zone list "
+                           f"as CSV with columns {','.join(REQUIRED_COLUMNS)}")
+    rows, seen, problems = [], {}, []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise DatasetError(f"{path}: missing column(s) {', '.join(missing)}")
+        for line, r in enumerate(reader, 2):
+            state, fips = r["state"].strip().upper(), r["fips"].strip().zfill(5)
+            try:
+                zone = int(r["zone"])
+            except ValueError:
+                zone = None
+            if zone not in ZONES:
+                problems.append(f"line {line}: zone {r['zone']!r} is not 1, 2 or 3")
+                continue
+            if fips in seen:
+                problems.append(f"line {line}: FIPS {fips} repeats line {seen[fips]}")
+                continue
+            seen[fips] = line
+            rows.append((state, r["state_name"].strip(), r["county"].strip(), fips, zone))
+    if problems:
+        raise DatasetError(f"{path}: " + "; ".join(problems[:10])
+                           + (f" (+{len(problems) - 10} more)" if len(problems) > 10 else ""))
+    return rows
+
+
+def aggregate(rows):
+    """
+    {state: stats} in one pass over the county rows, then ranked:
+    most Zone 1 counties (as a share) first, ties by mean zone, then name.
+    """
+    states = {}
+    for state, name, county, fips, zone in rows:
+        s = states.get(state)
+        if s is None:
+            s = states[state] = {"state": state, "name": name, "zones": dict.fromkeys(ZONES, 0),
+                                 "counties": {z: [] for z in ZONES}}
+        s["zones"][zone] += 1
+        s["counties"][zone].append(county)
+
+    for s in states.values():
+        total = sum(s["zones"].values())
+        s["total"] = total
+        s["share"] = {z: s["zones"][z] / total for z in ZONES}
+        s["mean_zone"] = sum(z * n for z, n in s["zones"].items()) / total
+        s["predominant"] = max(ZONES, key=lambda z: (s["zones"][z], -z))
+        for z in ZONES:
+            s["counties"][z].sort()
+
+    slugs = {}
+    for s in states.values():
+        other = slugs.setdefault(state_slug(s["name"]), s["state"])
+        if other != s["state"]:
+            raise DatasetError(f"{other} and {s['state']} would both be {state_path(s)}")
+
+    ranked = sorted(states.values(), key=lambda s: (-s["share"][1], s["mean_zone"], s["name"]))
+    for rank, s in enumerate(ranked, 1):
+        s["rank"] = rank
+    return ranked
+
+
+def state_slug(name):
+    return "radon-levels-in-" + re.sub(r"[^a-z]+", "-", name.lower()).strip("-")
+
+
+def state_path(s):
+    return f"pages/{state_slug(s['name'])}.html"
+
+
+def _pct(x):
+    return f"{x:.0%}"
+
+
+# ─────────────────────────────────────────
+# RENDER
+# ─────────────────────────────────────────
+def state_article(s):
+    """ARTICLES-style entry, so page_head renders the head and breadcrumb."""
+    return {
+        "slug": state_slug(s["name"]),
+        "title": f"Radon Levels in {s['name']}: EPA Zones for All {s['total']} Counties",
+        "keyword": f"radon levels in {s['name'].lower()}",
+        "intent": f"EPA radon zone for every county in {s['name']}, and what it means for testing.",
+        "schema_type": "FAQPage",
+        "section": SECTION,
+    }
+
+
+def state_body(s, total_states):
+    name = escape(s["name"])
+    z1, z1_share = s["zones"][1], s["share"][1]
+    pred = s["predominant"]
+    zone_rows = "\n".join(
+        f"<tr><td>Zone {z} ({ZONE_RISK[z].lower()})</td><td>{ZONE_LEVELS[z]}</td>"
+        f"<td>{s['zones'][z]}</td><td>{_pct(s['share'][z])}</td></tr>"
+        for z in ZONES
+    )
+    county_lists = "\n".join(
+        f"<h3>Zone {z} counties ({s['zones'][z]})</h3>\n<p>{escape(', '.join(s['counties'][z]))}</p>"
+        for z in ZONES if s["counties"][z]
+    )
+    if z1:
+        extent = "across most of the state" if z1_share >= 0.5 else "in parts of the state"
+        problem = (f"Yes, {extent}. {z1} of {name}'s {s['total']} counties "
+                   f"({_pct(z1_share)}) are EPA Zone 1, where the predicted average indoor "
+                   f"radon level is {ZONE_LEVELS[1]} — at or above the EPA action level.")
+    else:
+        problem = (f"{name} has no Zone 1 counties; most are Zone {pred} "
+                   f"({ZONE_LEVELS[pred]} predicted average). Individual homes still "
+                   f"test above 4 pCi/L in every zone.")
+    return f"""{MARKER}
+<h1>{escape(state_article(s)['title'])}</h1>
+<div class="direct-answer">
+<p><strong>{z1} of {s['total']} {name} counties ({_pct(z1_share)}) are in EPA radon Zone 1, the highest-risk zone.</strong> {name} ranks #{s['rank']} of {total_states} states by share of Zone 1 counties. Zone is a prediction for the area, not your house — only a test measures your home.</p>
+</div>
+<h2>{name} radon zones at a glance</h2>
+<table class="comparison-table">
+<thead>
+<tr><th>EPA zone</th><th>Predicted average indoor level</th><th>Counties</th><th>Share</th></tr>
+</thead>
+<tbody>
+{zone_rows}
+</tbody>
+</table>
+<div class="ad-slot">
+<span>Advertisement Space</span>
+</div>
+<h2>Is radon a problem in {name}?</h2>
+<p>{problem}</p>
+<h2>Should I test for radon in {name}?</h2>
+<p>Yes. The EPA recommends testing every home regardless of zone, because radon depends on the soil and foundation under each house. A short-term kit costs little and takes 2–7 days; see <a href="/pages/best-radon-test-kits.html">which radon test kit to buy</a> and <a href="/pages/radon-gas-in-house-signs.html">how to test for radon</a>.</p>
+<h2>What if my {name} home tests high?</h2>
+<p>At 4 pCi/L or above, the EPA recommends mitigation, usually a sub-slab depressurization system with a radon fan. See <a href="/pages/how-to-reduce-radon-in-house.html">reducing radon in your home</a> and the <a href="/pages/radon-mitigation-fan-guide.html">radon mitigation fan guide</a>.</p>
+<h2>EPA radon zone by county in {name}</h2>
+{county_lists}
+<p>Compare {name} with other states: <a href="/{INDEX_PAGE}">radon levels by state</a>.</p>"""
+
+
+def render_state(s, total_states):
+    article = state_article(s)
+    body = state_body(s, total_states)
+    return wrap_page(render_head(article, body), body, article)
+
+
+def state_table(ranked):
+    rows = "\n".join(
+        f'<tr><td>{s["rank"]}</td><td><a href="/{state_path(s)}">{escape(s["name"])}</a></td>'
+        f'<td>{s["zones"][1]} of {s["total"]}</td><td>{_pct(s["share"][1])}</td>'
+        f'<td>Zone {s["predominant"]}</td></tr>'
+        for s in ranked
+    )
+    return f"""{TABLE_START}
+<h2>Radon Zones by State: All {len(ranked)} States Ranked</h2>
+<table class="comparison-table">
+<thead>
+<tr><th>Rank</th><th>State</th><th>Zone 1 counties</th><th>Share in Zone 1</th><th>Most common zone</th></tr>
+</thead>
+<tbody>
+{rows}
+</tbody>
+</table>
+{TABLE_END}"""
+
+
+def apply_state_table(html, table):
+    """Index page text with the ranked table replaced, or added before </article>."""
+    newline = "\r\n" if "\r\n" in html else "\n"
+    table = table.replace("\n", newline)
+    if TABLE_START in html and TABLE_END in html:
+        start = html.index(TABLE_START)
+        end = html.index(TABLE_END, start) + len(TABLE_END)
+        return html[:start] + table + html[end:]
+    if "</article>" not in html:
+        return html
+    i = html.rindex("</article>")
+    return html[:i] + table + newline + html[i:]
+
+
+def render_sitemap(ranked):
+    entries = "\n".join(
+        f"  <url>\n    <loc>{BASE_URL}/{state_path(s)}</loc>\n    <priority>{SITEMAP_PRIORITY}</priority>\n  </url>"
+        for s in sorted(ranked, key=state_path)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{entries}
+</urlset>
+"""
+
+
+def robots_with_sitemap(robots, sitemap=SITEMAP):
+    line = f"Sitemap: {BASE_URL}/{sitemap}"
+    if line in robots:
+        return robots
+    return robots.rstrip("\n") + "\n" + line + "\n"
+
+
+def list_sitemap(tx, sitemap, put):
+    """Add `sitemap` to robots.txt, the only place crawlers learn of it."""
+    if not tx.exists(ROBOTS):
+        raise staging.ValidationError(
+            [f"{ROBOTS} not found at the site root — {sitemap} would never be discovered"])
+    put(ROBOTS, robots_with_sitemap(tx.read(ROBOTS), sitemap))
+
+
+# ─────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────
+def previous_state_pages(tx):
+    """State pages an earlier build generated (carry MARKER)."""
+    found = []
+    for path in tx.glob("pages/radon-levels-in-*.html"):
+        if STATE_PAGE_RE.match(path) and MARKER in tx.read(path, errors="replace"):
+            found.append(path)
+    return found
+
+
+def build(tx, ranked):
+    """Stage pages, index table, sitemap and robots.txt. Returns (written, removed) counts."""
+    written = removed = 0
+
+    def put(path, text, newline=None):
+        nonlocal written
+        if not tx.exists(path) or tx.read(path, errors="replace") != text.replace("\r\n", "\n"):
+            tx.write(path, text, newline=newline)
+            written += 1
+
+    current = set()
+    for s in profiling.each(ranked):
+        path = state_path(s)
+        current.add(path)
+        put(path, render_state(s, len(ranked)))
+    for path in previous_state_pages(tx):
+        if path not in current:
+            tx.remove(path)
+            removed += 1
+
+    if tx.exists(INDEX_PAGE):
+        with open(tx.path(INDEX_PAGE), encoding="utf-8", errors="replace", newline="") as f:
+            html = f.read()
+        updated = apply_state_table(html, state_table(ranked))
+        if updated != html:
+            tx.write(INDEX_PAGE, updated, newline="")
+            written += 1
+    put(SITEMAP, render_sitemap(ranked))
+    list_sitemap(tx, SITEMAP, put)
+    return written, removed
+
+
+def check_state_sitemap(tx):
+    """Every URL in the state sitemap must be a staged page."""
+    if not tx.exists(SITEMAP):
+        return []
+    return [f"{SITEMAP}: {loc} has no page"
+            for loc in re.findall(r"<loc>([^<]+)</loc>", tx.read(SITEMAP))
+            if not tx.exists(loc[len(BASE_URL) + 1:])]
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render per-state radon pages from EPA zone data.")
+    parser.add_argument("--data", default=DATASET, help=f"county zone CSV (default {DATASET})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--dry-run", action="store_true", help="stage and validate, but don't swap in")
+    profiling.add_profile_args(p)
+    p = sub.add_parser("show"); p.add_argument("state", help="two-letter code, e.g. IA")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    try:
+        ranked = aggregate(load_counties(args.data))
+    except DatasetError as e:
+        print(f"❌ {e}")
+        return 1
+    if args.cmd == "show":
+        return show(ranked, args.state.upper())
+
+    profiling.start("radon_states", args)
+    try:
+        return run(args, ranked)
+    finally:
+        profiling.finish()
+
+
+def show(ranked, state):
+    for s in ranked:
+        if s["state"] == state:
+            print(f"📍 {s['name']}: #{s['rank']} of {len(ranked)}, {s['total']} counties → {state_path(s)}")
+            for z in ZONES:
+                print(f"   Zone {z}: {s['zones'][z]:>4}  ({_pct(s['share'][z])})")
+            return 0
+    print(f"❌ {state} is not in the dataset")
+    return 1
+
+
+def run(args, ranked):
+    snap_run = None if args.dry_run else snapshots.begin_run("radon_states")
+    tx = staging.Transaction("radon_states", run=snap_run).begin()
+    try:
+        with profiling.span("render"):
+            written, removed = build(tx, ranked)
+        validators = [check_state_sitemap]
+        if args.dry_run:
+            problems = tx.validate(validators)
+            tx.abort()
+            print(f"🔍 Dry run: {len(ranked)} states, {written} file(s) would change, {removed} removed")
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1 if problems else 0
+        tx.commit(validators)
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    print(f"✅ {len(ranked)} state pages: {written} file(s) written, {removed} removed")
+    if written or removed:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+        print(f"   Next: python3 fingerprint.py build && python3 speculation.py build && python3 search_index.py build")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
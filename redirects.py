@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Edge Redirect Map
+Run from the ROOT of your site directory: python3 redirects.py build
+
+fix_final.py (RADON_MOVES, LINK_FIXES) and fix_site.py (URL_FIXES) know
+every legacy URL and where it moved, but only apply that knowledge by
+search-and-replace inside HTML — the old URLs themselves (and the
+radon/ duplicates still on disk) keep answering with stale copies.
+
+This compiles those tables, plus any redirect already in vercel.json,
+into ONE permanent-redirect table:
+
+  · relative entries (written "from inside pages/") are resolved to
+    absolute paths; directory indexes get both "/radon" and "/radon/"
+  · chains are collapsed, so every legacy URL is one hop from its final
+    destination; cycles and missing destinations are errors
+  · a mapping whose source is a live page the fix scripts don't move
+    (RADON_MOVES, MICE_PAGE_MOVE) is skipped — e.g. URL_FIXES'
+    allergies-only canonical entry for is-house-burping-normal.html;
+    a redirect must not shadow content
+
+Vercel evaluates redirects before the filesystem, so on-disk files at a
+redirected URL are never served again: `prune` lists them and, with
+--apply, removes them through staging (undo: snapshots.py rollback).
+
+  python3 redirects.py build [--vercel ../vercel.json] [--dry-run]
+  python3 redirects.py prune [--apply]
+"""
+
+import os
+import sys
+import json
+import argparse
+import posixpath
+
+import fix_final
+import fix_site
+import pagecache
+import snapshots
+import staging
+from fingerprint import VERCEL_JSON, write_vercel_section
+
+RELATIVE_BASE = "/pages/"   # LINK_FIXES' bare/../ entries are written from pages/
+MOVED = "fix_final moves"   # origin of pages the fix scripts copy to a new URL
+
+
+# ─────────────────────────────────────────
+# COLLECT
+# ─────────────────────────────────────────
+def absolute(url, base=RELATIVE_BASE):
+    if url.startswith("/"):
+        return url
+    path = posixpath.normpath(posixpath.join(base, url))
+    return path + "/" if url.endswith("/") else path
+
+
+def file_for(url, root="."):
+    """On-disk page serving `url`, or None."""
+    path = url.lstrip("/")
+    if url.endswith("/") or not path:
+        path = posixpath.join(path, "index.html")
+    return path if os.path.isfile(os.path.join(root, path)) else None
+
+
+def declared_mappings(vercel_path=VERCEL_JSON):
+    """[(source, destination, origin)] from the fix tables and vercel.json."""
+    found = []
+    moves = list(fix_final.RADON_MOVES.items()) + [fix_final.MICE_PAGE_MOVE]
+    for src, dst in moves:
+        found.append(("/" + src, "/" + dst, MOVED))
+        if src.endswith("/index.html"):
+            found.append(("/" + src[:-len("index.html")], "/" + dst, MOVED))
+    for wrong, correct in fix_final.LINK_FIXES.items():
+        found.append((absolute(wrong.strip('"')), absolute(correct.strip('"')), "LINK_FIXES"))
+    for wrong, correct in fix_site.URL_FIXES.items():
+        found.append((absolute(wrong), absolute(correct), "URL_FIXES"))
+    if os.path.exists(vercel_path):
+        with open(vercel_path) as f:
+            for r in json.load(f).get("redirects", []):
+                found.append((r["source"], r["destination"], "vercel.json"))
+    return found
+
+
+# ─────────────────────────────────────────
+# COMPILE
+# ─────────────────────────────────────────
+def compile_redirects(mappings, root="."):
+    """
+    ({source: destination} one hop each, [skipped notes], [problems]).
+    First declaration of a source wins; later conflicting ones are reported.
+    """
+    moved_away = {src for src, _, origin in mappings if origin == MOVED}
+    table, skipped, problems = {}, [], []
+    for src, dst, origin in mappings:
+        if src == dst:
+            continue
+        live = file_for(src, root)
+        if live and src not in moved_away and origin != "vercel.json":
+            note = f"{src} → {dst} ({origin}): {live} is a live page"
+            if note not in skipped:
+                skipped.append(note)
+            continue
+        if src in table and table[src] != dst:
+            problems.append(f"{src}: {origin} says {dst}, already mapped to {table[src]}")
+            continue
+        table[src] = dst
+
+    # directory index sources answer with and without the trailing slash
+    for src in [s for s in table if s.endswith("/") and len(s) > 1]:
+        table.setdefault(src.rstrip("/"), table[src])
+
+    collapsed = {}
+    for src in table:
+        seen, dst = [src], table[src]
+        while dst in table:
+            if dst in seen:
+                problems.append("redirect cycle: " + " → ".join(seen + [dst]))
+                break
+            seen.append(dst)
+            dst = table[dst]
+        collapsed[src] = dst
+
+    for src, dst in sorted(collapsed.items()):
+        if dst.startswith("/") and not file_for(dst, root):
+            problems.append(f"{src} → {dst}: destination does not exist")
+    return collapsed, skipped, problems
+
+
+def vercel_redirects(table):
+    return [{"source": src, "destination": dst, "permanent": True}
+            for src, dst in sorted(table.items())]
+
+
+def duplicates(table, root="."):
+    """[(file, url, destination)] for on-disk pages that sit at a redirected URL."""
+    out, seen = [], set()
+    for src, dst in sorted(table.items()):
+        path = file_for(src, root)
+        # /index.html → / is the same file under its preferred URL
+        if path and path not in seen and path != file_for(dst, root):
+            seen.add(path)
+            out.append((path, src, dst))
+    return out
+
+
+def stale_references(table, root="."):
+    """{url: pages linking to it} for internal links that now cost a redirect hop."""
+    cache = pagecache.PageCache(os.path.join(root, pagecache.CACHE_FILE))
+    refs = {}
+    for path in pagecache.site_pages(root):
+        record = cache.get(path, os.path.join(root, path))
+        for url in record.urls:
+            target = absolute(url, "/" + posixpath.dirname(path) + "/") if not url.startswith("http") else None
+            if target in table:
+                refs.setdefault(target, []).append(path)
+    cache.save()
+    return refs
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile legacy URL tables into edge redirects.")
+    parser.add_argument("--vercel", default=VERCEL_JSON, help=f"vercel.json to update (default {VERCEL_JSON})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--dry-run", action="store_true", help="print the table, don't write vercel.json")
+    p = sub.add_parser("prune")
+    p.add_argument("--apply", action="store_true", help="remove the duplicates (staged, snapshotted)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+
+    table, skipped, problems = compile_redirects(declared_mappings(args.vercel))
+    if problems:
+        print("❌ Redirect table has problems — nothing written:")
+        for problem in problems:
+            print(f"   · {problem}")
+        return 1
+    if args.cmd == "build":
+        return build(args, table, skipped)
+    return prune(args, table)
+
+
+def build(args, table, skipped):
+    print(f"🔀 {len(table)} redirects, all one hop:")
+    for src, dst in sorted(table.items()):
+        print(f"   {src:<50} → {dst}")
+    for note in skipped:
+        print(f"   ⏭️  skipped {note}")
+    if args.dry_run:
+        return 0
+    if write_vercel_section("redirects", vercel_redirects(table), args.vercel):
+        print(f"✅ {args.vercel}: redirects updated")
+    else:
+        print(f"✅ {args.vercel}: already up to date")
+
+    dupes = duplicates(table)
+    if dupes:
+        print(f"\n🗑️  {len(dupes)} on-disk pages are now unreachable (run: python3 redirects.py prune --apply)")
+    refs = stale_references(table)
+    if refs:
+        print(f"\n🔗 Internal links that now take a redirect hop (fix_final.py step 3 rewrites these):")
+        for url, pages in sorted(refs.items()):
+            print(f"   {url:<50} {len(pages)} page(s)")
+    return 0
+
+
+def prune(args, table):
+    dupes = duplicates(table)
+    if not dupes:
+        print("✅ No duplicate pages at redirected URLs")
+        return 0
+    for path, src, dst in dupes:
+        print(f"   {path:<45} ({src} → {dst})")
+    if not args.apply:
+        print(f"\n🗑️  {len(dupes)} duplicate pages can be dropped (re-run with --apply)")
+        return 0
+
+    snap_run = snapshots.begin_run("redirects")
+    tx = staging.Transaction("redirects", run=snap_run).begin()
+    try:
+        for path, _, _ in dupes:
+            tx.remove(path)
+        _, removed = tx.commit()
+    except BaseException:
+        tx.abort()
+        print("❌ Prune failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        snap_run.save()
+    print(f"\n✅ Removed {len(removed)} duplicate pages")
+    print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
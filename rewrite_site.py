@@ -11,28 +11,42 @@ Rewrites existing pages to add:
 
 Run from site root:
   python3 rewrite_site.py
+  python3 rewrite_site.py --plan          # forecast cost, no paid calls
+  python3 rewrite_site.py --plan --exact  # exact input counts (free endpoint)
+  python3 rewrite_site.py --replay calls.jsonl --yes   # offline re-run (see api_harness.py)
 
 Uses claude-haiku for speed/cost. Switch to claude-sonnet-4-6 for quality.
 Cost: ~$0.01-0.015 per page rewrite.
 """
 
-import anthropic
+import argparse
 import os
-import json
-import shutil
 import glob
+import time
 from datetime import datetime
 
+import profiling
+import snapshots
+from api_harness import add_client_args, make_client, offline
+import staging
+from site_config import MODEL, BUDGET, api_cost, load_json, save_json
+from telemetry import Telemetry
+
+from forecast import (
+    estimate_tokens, calibrate_chars_per_token, count_tokens_exact,
+    load_token_cache, save_token_cache, median_ratio,
+    predict_output_tokens, schedule, print_forecast,
+)
+
 # ─────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────
-MODEL = "claude-haiku-4-5-20251001"  # ~$0.01/page
-BASE_URL = "https://www.myhouseisburping.com"
-BACKUP_DIR = f"_rewrite_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+# Model (~$0.01/page), pricing and BUDGET live in site_config.py
 COST_LOG = "rewrite_cost_log.json"
+MAX_TOKENS = 8192
 
-INPUT_COST_PER_M  = 0.80   # Haiku pricing
-OUTPUT_COST_PER_M = 4.00
+# Output/input token ratio, used until the cost log has history
+DEFAULT_OUTPUT_INPUT_RATIO = 2.0
 
 # ─────────────────────────────────────────
 # PAGES TO REWRITE + their context
@@ -296,25 +310,95 @@ add the Q&A section, add the internal links, upgrade the JSON-LD schema."""
 # COST TRACKING
 # ─────────────────────────────────────────
 def load_log():
-    if os.path.exists(COST_LOG):
-        with open(COST_LOG) as f:
-            return json.load(f)
-    return {"total_spent": 0.0, "rewrites": [], "sessions": []}
+    return load_json(COST_LOG, {"total_spent": 0.0, "rewrites": [], "sessions": []})
 
 def save_log(log):
-    with open(COST_LOG, "w") as f:
-        json.dump(log, f, indent=2)
+    save_json(COST_LOG, log)
+
+
+# ─────────────────────────────────────────
+# PRE-FLIGHT FORECAST
+# ─────────────────────────────────────────
+def forecast_pages(todo, log, client=None):
+    """
+    Forecast input/output tokens and cost for each page in `todo`.
+    Input tokens: local estimate calibrated against the prompt_chars and
+    tokens_in logged for each billed call (or exact counts if `client` is
+    given). Re-rendering a prompt from the current file would measure the
+    rewritten page, not the one that was billed.
+    Output tokens: historical tokens_out / tokens_in ratio.
+    """
+    def rendered(page):
+        with open(page["file"], "r", encoding="utf-8") as f:
+            return SYSTEM_PROMPT + build_rewrite_prompt(page, f.read())
+
+    chars_per_token = calibrate_chars_per_token([
+        (r["prompt_chars"], r["tokens_in"]) for r in log["rewrites"] if "prompt_chars" in r
+    ])
+    out_ratio = median_ratio(
+        [(r["tokens_out"], r["tokens_in"]) for r in log["rewrites"]],
+        DEFAULT_OUTPUT_INPUT_RATIO,
+    )
 
-def cost(inp, out):
-    return (inp / 1_000_000 * INPUT_COST_PER_M) + (out / 1_000_000 * OUTPUT_COST_PER_M)
+    token_cache = load_token_cache() if client else None
+    rows = []
+    for page in todo:
+        if not os.path.exists(page["file"]):
+            print(f"  ⚠️  SKIP: {page['file']} (file not found — generate it first)")
+            continue
+        text = rendered(page)
+        if client:
+            prompt = text[len(SYSTEM_PROMPT):]
+            input_tokens = count_tokens_exact(client, MODEL, SYSTEM_PROMPT, prompt, token_cache)
+        else:
+            input_tokens = estimate_tokens(text, chars_per_token)
+        output_tokens = predict_output_tokens(input_tokens, out_ratio, MAX_TOKENS)
+        rows.append({
+            "name": page["file"],
+            "page": page,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": api_cost(input_tokens, output_tokens),
+            "worst_cost": api_cost(input_tokens, MAX_TOKENS),
+        })
+    if client:
+        save_token_cache(token_cache)
+    return rows
 
 
 # ─────────────────────────────────────────
 # MAIN
 # ─────────────────────────────────────────
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AEO-rewrite existing pages with Claude.")
+    parser.add_argument("--plan", action="store_true",
+                        help="print a per-page cost forecast and schedule, then exit")
+    parser.add_argument("--exact", action="store_true",
+                        help="with --plan: exact input token counts via the free count_tokens endpoint")
+    parser.add_argument("--yes", action="store_true", help="don't ask for confirmation")
+    parser.add_argument("--fill", action="store_true",
+                        help="also rewrite unlisted pages with search opportunity (traffic.py top)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="seconds to wait between calls (default: 0.5)")
+    add_client_args(parser)
+    profiling.add_profile_args(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiling.start("rewrite_site", args)
+    try:
+        run(args)
+    finally:
+        profiling.finish()
+
+
+def run(args):
+    import traffic  # sqlite3 — loaded only when a run starts, not for --help
     api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
+    needs_client = not args.plan or args.exact
+    if needs_client and not api_key and not offline(args):
         print("❌ Set your API key first:")
         print("   Windows CMD:  set ANTHROPIC_API_KEY=sk-ant-...")
         print("   PowerShell:   $env:ANTHROPIC_API_KEY='sk-ant-...'")
@@ -324,85 +408,162 @@ def main():
         print("❌ Run from your site root directory (where index.html lives)")
         return
 
-    client = anthropic.Anthropic(api_key=api_key)
-    os.makedirs(BACKUP_DIR, exist_ok=True)
+    telemetry = Telemetry("rewrite_site")
+    client = make_client(args, api_key, telemetry, api_cost) if needs_client else None
     log = load_log()
 
     already_done = {r["file"] for r in log["rewrites"]}
-    todo = [p for p in PAGES if p["file"] not in already_done]
+    plan = PAGES
+    if traffic.exists():
+        if args.fill:
+            plan = plan + traffic.rewrite_candidates([p["file"] for p in PAGES])
+        plan = traffic.order_pages(plan)
+    todo = [p for p in plan if p["file"] not in already_done]
 
     print("=" * 60)
     print("MyHouseIsBurping.com — AEO Site Rewriter")
     print(f"Model: {MODEL}")
-    print(f"Pages to rewrite: {len(todo)} of {len(PAGES)}")
-    print(f"Budget remaining: ${5.0 - log['total_spent']:.3f}")
+    print(f"Pages to rewrite: {len(todo)} of {len(plan)}")
+    if traffic.exists():
+        print(f"Order: search opportunity ({traffic.DB_FILE})")
+    print(f"Budget remaining: ${BUDGET - log['total_spent']:.3f}")
     print("=" * 60)
 
     if not todo:
         print("\n✅ All pages already rewritten!")
         return
 
-    # Preview costs
-    print(f"\nEstimated cost: ~${len(todo) * 0.013:.3f} total")
-    confirm = input(f"Rewrite {len(todo)} pages? (y/n): ").strip().lower()
+    # Forecast every prompt up front and keep only what fits the budget
+    with profiling.span("forecast"):
+        rows = forecast_pages(todo, log, client if args.exact else None)
+    scheduled, deferred = schedule(rows, BUDGET - log["total_spent"])
+
+    if args.plan:
+        print_forecast(rows, scheduled, deferred, BUDGET - log["total_spent"], "Page")
+        return
+
+    forecast_total = sum(r["cost"] for r in scheduled)
+    worst_total = sum(r["worst_cost"] for r in scheduled)
+    print(f"\nForecast cost: ~${forecast_total:.3f} (worst case ${worst_total:.3f})")
+    if deferred:
+        print(f"⏭️  Deferring {len(deferred)} pages that would exceed the budget "
+              f"(run with --plan for details)")
+    confirm = "y" if args.yes else input(f"Rewrite {len(scheduled)} pages? (y/n): ").strip().lower()
     if confirm != 'y':
         print("Cancelled.")
         return
 
+    # Rewrites are staged and swapped into the live site together at the end
+    snap_run = snapshots.begin_run("rewrite_site")
+    tx = staging.Transaction("rewrite_site", run=snap_run).begin()
+    saved = None
+    try:
+        with profiling.span("rewrite_pages"):
+            session_cost, session_rewrites = rewrite_pages(client, log, scheduled, tx, args.delay)
+        try:
+            tx.commit()
+        except staging.ValidationError as e:
+            tx.abort()
+            print("\n❌ Staged rewrites failed validation — no pages were changed:")
+            for problem in e.problems:
+                print(f"   · {problem}")
+            # Paid for, but not live: leave them in the todo list for next time
+            for entry in session_rewrites:
+                log["rewrites"].remove(entry)
+            session_rewrites = []
+    except BaseException:
+        tx.abort()
+        raise
+    finally:
+        saved = snap_run.save()
+
+    # Save log
+    log["total_spent"] = round(log["total_spent"] + session_cost, 5)
+    log["sessions"].append({
+        "date": datetime.now().isoformat(),
+        "pages": len(session_rewrites),
+        "cost": round(session_cost, 5),
+    })
+    save_log(log)
+
+    print("\n" + "=" * 60)
+    print("SESSION COMPLETE")
+    print("=" * 60)
+    print(f"  Pages rewritten:  {len(session_rewrites)}")
+    print(f"  Session cost:     ${session_cost:.4f}")
+    print(f"  Total spent:      ${log['total_spent']:.4f}")
+    print(f"  Budget remaining: ${BUDGET - log['total_spent']:.4f}")
+    if saved:
+        print(f"  Snapshot run:     {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    metrics_path = telemetry.write()
+    if metrics_path:
+        print(f"  Call metrics:     {metrics_path}  (python3 telemetry.py show)")
+    print("""
+NEXT STEPS:
+  1. Spot-check 2-3 rewritten pages in your browser
+  2. Upload changed files: python3 publish.py publish --to <host>
+  3. Request re-indexing in Google Search Console
+  4. Monitor rankings over 2-3 weeks
+""")
+
+
+def rewrite_pages(client, log, scheduled, tx, delay):
     session_cost = 0.0
     session_rewrites = []
 
-    for i, page in enumerate(todo, 1):
+    for i, row in profiling.each(enumerate(scheduled, 1), name=lambda r: r[1]["page"]["file"]):
+        page = row["page"]
         filepath = page["file"]
 
-        remaining = 5.0 - log["total_spent"] - session_cost
-        if remaining < 0.05:
-            print(f"\n⚠️  Budget nearly exhausted (${remaining:.3f} left). Stopping.")
+        # Budget check — worst case for THIS page must still fit
+        remaining = BUDGET - log["total_spent"] - session_cost
+        if remaining < row["worst_cost"]:
+            print(f"\n⚠️  Budget nearly exhausted (${remaining:.3f} left, "
+                  f"next page may cost ${row['worst_cost']:.3f}). Stopping.")
             break
 
         if not os.path.exists(filepath):
             print(f"  ⚠️  SKIP: {filepath} (file not found — generate it first)")
             continue
 
-        print(f"\n[{i}/{len(todo)}] {filepath}")
-
-        # Backup
-        backup_path = os.path.join(BACKUP_DIR, filepath)
-        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-        shutil.copy2(filepath, backup_path)
+        print(f"\n[{i}/{len(scheduled)}] {filepath}")
 
         # Read current HTML
-        with open(filepath, "r", encoding="utf-8") as f:
-            current_html = f.read()
+        current_html = tx.read(filepath)
 
         try:
             prompt = build_rewrite_prompt(page, current_html)
             
             message = client.messages.create(
                 model=MODEL,
-                max_tokens=8192,
+                max_tokens=MAX_TOKENS,
                 system=SYSTEM_PROMPT,
                 messages=[{"role": "user", "content": prompt}]
             )
 
             new_html = message.content[0].text
-            page_cost = cost(message.usage.input_tokens, message.usage.output_tokens)
+            page_cost = api_cost(message.usage.input_tokens, message.usage.output_tokens)
             session_cost += page_cost
 
             # Sanity check — make sure we got real HTML back
             if "<html" not in new_html and "<!DOCTYPE" not in new_html:
-                print(f"  ⚠️  Response doesn't look like HTML — skipping (backup kept)")
+                print(f"  ⚠️  Response doesn't look like HTML — skipping (original kept)")
+                continue
+
+            # Truncated at max_tokens — staging it would publish half a page
+            if "</html>" not in new_html.lower():
+                print(f"  ⚠️  Response was cut off before </html> — skipping (original kept)")
                 continue
 
-            # Write the rewritten file
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(new_html)
+            # Stage the rewritten file (goes live with the rest at the end)
+            tx.write(filepath, new_html)
 
             entry = {
                 "file": filepath,
                 "cost": round(page_cost, 5),
                 "tokens_in": message.usage.input_tokens,
                 "tokens_out": message.usage.output_tokens,
+                "prompt_chars": len(SYSTEM_PROMPT) + len(prompt),
                 "date": datetime.now().isoformat(),
             }
             log["rewrites"].append(entry)
@@ -411,40 +572,17 @@ def main():
             print(f"  ✅ Rewritten | ${page_cost:.5f} | "
                   f"In: {message.usage.input_tokens} | Out: {message.usage.output_tokens}")
 
-            import time
-            time.sleep(0.5)
+            time.sleep(delay)
+
+        except KeyboardInterrupt:
+            print("\n  ⏹️  Interrupted — keeping the pages already rewritten")
+            break
 
         except Exception as e:
-            print(f"  ❌ Error: {e}")
-            # Restore backup on error
-            shutil.copy2(backup_path, filepath)
-            print(f"  ↩️  Original restored from backup")
+            print(f"  ❌ Error: {e} (original kept)")
             continue
 
-    # Save log
-    log["total_spent"] = round(log["total_spent"] + session_cost, 5)
-    log["sessions"].append({
-        "date": datetime.now().isoformat(),
-        "pages": len(session_rewrites),
-        "cost": round(session_cost, 5),
-    })
-    save_log(log)
-
-    print("\n" + "=" * 60)
-    print("SESSION COMPLETE")
-    print("=" * 60)
-    print(f"  Pages rewritten:  {len(session_rewrites)}")
-    print(f"  Session cost:     ${session_cost:.4f}")
-    print(f"  Total spent:      ${log['total_spent']:.4f}")
-    print(f"  Budget remaining: ${5.0 - log['total_spent']:.4f}")
-    print(f"  Backups at:       {BACKUP_DIR}/")
-    print("""
-NEXT STEPS:
-  1. Spot-check 2-3 rewritten pages in your browser
-  2. Upload all changed files to your host
-  3. Request re-indexing in Google Search Console
-  4. Monitor rankings over 2-3 weeks
-""")
+    return session_cost, session_rewrites
 
 
 if __name__ == "__main__":
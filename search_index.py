@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Client-Side Search Index
+Run from the ROOT of your site directory: python3 search_index.py build
+
+Builds a prefix-sharded inverted index under search/ for the search box
+in js/main.js. Indexed text per page: the <title>, the direct-answer box
+and every H2 phrased as a question.
+
+  search/index.json   {"v": build hash, "n": docs, "k": [shard keys]}
+  search/<key>.json   {"t": {term: [doc, weight, doc, weight, ...]},
+                       "d": {doc: [url, title]}}
+
+A shard holds every term starting with its key (2 letters, split into
+3- and 4-letter keys while it is over SHARD_BUDGET), and carries the url
+and title of each doc it references — so a query is one manifest fetch
+plus one shard per typed word. A word shorter than a split shard's keys
+("ho" once "ho" became "hol", "hou", ...) fetches every child shard it
+is a prefix of. Postings keep only the MAX_POSTINGS best
+docs per term, which bounds shard size no matter how many pages exist.
+
+  python3 search_index.py build [--out search]
+  python3 search_index.py query radon fan      # rank like the browser does
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import shutil
+import hashlib
+import argparse
+
+from pagecache import PageCache, site_pages
+from site_config import BASE_URL
+
+OUT_DIR = "search"
+MAX_POSTINGS = 12      # best docs kept per term
+SHARD_BUDGET = 6000    # bytes; larger shards are split by a longer prefix
+MAX_KEY = 4
+FIELD_WEIGHTS = {"title": 3, "question": 2, "answer": 1}
+
+TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+ANSWER_RE = re.compile(r'<div class="direct-answer">(.*?)</div>', re.I | re.S)
+H2_RE = re.compile(r"<h2[^>]*>(.*?)</h2>", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"[a-z0-9]+")
+SITE_SUFFIX_RE = re.compile(r"\s*[|\-–]\s*MyHouseIsBurping(\.com)?\s*$", re.I)
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in into is it its
+me my of on or our so than that the their them then there these this to up was we what
+when where which while who why will with you your
+""".split())
+
+
+# ─────────────────────────────────────────
+# EXTRACTION
+# ─────────────────────────────────────────
+def text(fragment):
+    return " ".join(html.unescape(TAG_RE.sub(" ", fragment)).split())
+
+
+def tokens(s):
+    return [w for w in WORD_RE.findall(s.lower().replace("'", "").replace("’", ""))
+            if len(w) > 1 and w not in STOP_WORDS]
+
+
+def file_url(path):
+    url = "/" + path
+    return url[:-len("index.html")] if url.endswith("index.html") else url
+
+
+def page_url(path, record):
+    """Site URL of a page: its canonical path if it has one, else its file path."""
+    if record.canonical.startswith(BASE_URL):
+        return record.canonical[len(BASE_URL):] or "/"
+    return file_url(path)
+
+
+def extract(page):
+    """{field: text} for one page."""
+    title = TITLE_RE.search(page)
+    answer = ANSWER_RE.search(page)
+    questions = [t for t in map(text, H2_RE.findall(page)) if t.endswith("?")]
+    return {
+        "title": SITE_SUFFIX_RE.sub("", text(title.group(1))) if title else "",
+        "answer": text(answer.group(1)) if answer else "",
+        "question": " ".join(questions),
+    }
+
+
+def collect(root="."):
+    """[(url, title, {term: weight})] for every page, one entry per URL."""
+    docs, seen = [], set()
+    cache = PageCache(os.path.join(root, "_cache", "pages.json"))
+    for path in site_pages(root):
+        url = page_url(path, cache.get(path, os.path.join(root, path)))
+        # a leftover copy of a moved page points its canonical at the new home
+        target = url.lstrip("/") + ("index.html" if url.endswith("/") else "")
+        if url in seen or (url != file_url(path) and os.path.exists(os.path.join(root, target))):
+            continue
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            fields = extract(f.read())
+        if not fields["title"]:
+            continue
+        weights = {}
+        for field, value in fields.items():
+            for term in tokens(value):
+                weights[term] = weights.get(term, 0) + FIELD_WEIGHTS[field]
+        seen.add(url)
+        docs.append((url, fields["title"], weights))
+    cache.save()
+    return docs
+
+
+# ─────────────────────────────────────────
+# SHARDS
+# ─────────────────────────────────────────
+def invert(docs):
+    """{term: [(doc id, weight)]} with the best MAX_POSTINGS docs per term."""
+    postings = {}
+    for doc_id, (_, _, weights) in enumerate(docs):
+        for term, w in weights.items():
+            postings.setdefault(term, []).append((doc_id, w))
+    for term, plist in postings.items():
+        plist.sort(key=lambda p: (-p[1], p[0]))
+        del plist[MAX_POSTINGS:]
+    return postings
+
+
+def encode(shard):
+    return json.dumps(shard, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def make_shard(terms, postings, docs):
+    shard = {"t": {}, "d": {}}
+    for term in sorted(terms):
+        flat = []
+        for doc_id, w in postings[term]:
+            flat += [doc_id, w]
+            shard["d"][str(doc_id)] = [docs[doc_id][0], docs[doc_id][1]]
+        shard["t"][term] = flat
+    return shard
+
+
+def shard(postings, docs, key_len=2, terms=None, key=""):
+    """{key: shard}, splitting any shard over SHARD_BUDGET by one more letter."""
+    groups = {}
+    for term in (postings if terms is None else terms):
+        groups.setdefault(term[:key_len], []).append(term)
+    shards = {}
+    for k, members in sorted(groups.items()):
+        built = make_shard(members, postings, docs)
+        longer = [t for t in members if len(t) > key_len]
+        if len(encode(built)) > SHARD_BUDGET and key_len < MAX_KEY and longer:
+            # terms exactly as long as the key stay in the parent shard
+            exact = [t for t in members if len(t) <= key_len]
+            if exact:
+                shards[k] = make_shard(exact, postings, docs)
+            shards.update(shard(postings, docs, key_len + 1, longer, k))
+        else:
+            shards[k] = built
+    return shards
+
+
+def build(root=".", out=OUT_DIR):
+    docs = collect(root)
+    shards = shard(invert(docs), docs)
+    blobs = {k: encode(s) for k, s in shards.items()}
+    version = hashlib.sha256("".join(k + blobs[k] for k in sorted(blobs)).encode()).hexdigest()[:10]
+
+    out_dir = os.path.join(root, out)
+    tmp = out_dir + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for k, blob in blobs.items():
+        with open(os.path.join(tmp, f"{k}.json"), "w", encoding="utf-8") as f:
+            f.write(blob)
+    with open(os.path.join(tmp, "index.json"), "w", encoding="utf-8") as f:
+        f.write(encode({"v": version, "n": len(docs), "k": sorted(blobs)}))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    return docs, blobs, version
+
+
+# ─────────────────────────────────────────
+# QUERY (same ranking as js/main.js)
+# ─────────────────────────────────────────
+def shard_keys(word, keys):
+    """
+    Shards that can hold terms starting with `word`: the longest key the
+    word starts with, plus every longer key that starts with the word.
+    """
+    best = ""
+    for k in keys:
+        if word.startswith(k) and len(k) > len(best):
+            best = k
+    children = [k for k in keys if len(k) > len(word) and k.startswith(word)]
+    return ([best] if best else []) + children
+
+
+def query(q, out=OUT_DIR, limit=8):
+    """
+    Docs matching the most query words first, then by summed weight.
+    Every word is a prefix; an exact term match counts double. Postings are
+    truncated per term, so words are OR-ed rather than intersected.
+    """
+    with open(os.path.join(out, "index.json"), encoding="utf-8") as f:
+        keys = json.load(f)["k"]
+    scores, titles, loaded = {}, {}, {}
+    for word in tokens(q):
+        hits = {}
+        for key in shard_keys(word, keys):
+            if key not in loaded:
+                with open(os.path.join(out, f"{key}.json"), encoding="utf-8") as f:
+                    loaded[key] = json.load(f)
+            data = loaded[key]
+            for term, flat in data["t"].items():
+                if term.startswith(word):
+                    bonus = 2 if term == word else 1
+                    for i in range(0, len(flat), 2):
+                        doc = str(flat[i])
+                        hits[doc] = max(hits.get(doc, 0), flat[i + 1] * bonus)
+            titles.update(data["d"])
+        for doc, w in hits.items():
+            matched, total = scores.get(doc, (0, 0))
+            scores[doc] = (matched + 1, total + w)
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1][0], -kv[1][1], int(kv[0])))[:limit]
+    return [(s[1], titles[d][0], titles[d][1]) for d, s in ranked]
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the sharded client-side search index.")
+    parser.add_argument("--out", default=OUT_DIR, help=f"output directory (default: {OUT_DIR})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build")
+    p = sub.add_parser("query"); p.add_argument("words", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "query":
+        results = query(" ".join(args.words), args.out)
+        if not results:
+            print("  (no results)")
+        for score, url, title in results:
+            print(f"  {score:>4}  {title}  {url}")
+        return 0
+
+    docs, blobs, version = build(out=args.out)
+    sizes = sorted(len(b.encode("utf-8")) for b in blobs.values())
+    terms = sum(len(json.loads(b)["t"]) for b in blobs.values())
+    print(f"✅ Search index {version}: {len(docs)} pages, {terms} terms, {len(blobs)} shards → {args.out}/")
+    if sizes:
+        print(f"   shard size: median {sizes[len(sizes) // 2] / 1024:.1f} KB, "
+              f"largest {sizes[-1] / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Shared Settings
+Imported by every tool; stdlib only, so importing it costs nothing.
+
+One place for what the scripts used to re-declare each on their own:
+the site's canonical origin and AdSense account, the model, its pricing
+and the API budget, and the JSON load/save helpers behind the cost logs.
+"""
+
+import os
+import json
+
+# ─────────────────────────────────────────
+# SITE
+# ─────────────────────────────────────────
+BASE_URL = "https://www.myhouseisburping.com"
+SITE_HOSTS = ("www.myhouseisburping.com", "myhouseisburping.com")
+ADSENSE_CLIENT = "ca-pub-3688809656284836"
+
+# ─────────────────────────────────────────
+# API (generate_articles.py, rewrite_site.py)
+# ─────────────────────────────────────────
+MODEL = "claude-haiku-4-5-20251001"  # Cheapest — use for bulk generation
+# MODEL = "claude-sonnet-4-6"        # Smarter — use for highest-priority pages
+
+# Haiku pricing (per million tokens)
+INPUT_COST_PER_M = 0.80
+OUTPUT_COST_PER_M = 4.00
+BUDGET = 5.0   # per cost log
+
+
+def api_cost(input_tokens, output_tokens):
+    return (input_tokens / 1_000_000 * INPUT_COST_PER_M) + \
+           (output_tokens / 1_000_000 * OUTPUT_COST_PER_M)
+
+
+# ─────────────────────────────────────────
+# JSON FILES
+# ─────────────────────────────────────────
+def load_json(path, default=None):
+    """Parsed `path`, or `default` if it doesn't exist yet."""
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path, data, indent=2, **options):
+    """
+    Write `path` atomically (a crash never leaves half a log). `options`
+    go to json.dump: sort_keys, separators, ensure_ascii.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, **options)
+    os.replace(tmp, path)
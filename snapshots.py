@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Content-Addressed Snapshot Store
+Replaces the full-copy _backup_<timestamp>/ directories.
+
+Every file a fix/rewrite run is about to touch is stored ONCE by content
+hash under _snapshots/objects/; each run writes a small manifest mapping
+path → hash. Re-running a script over a mostly unchanged site therefore
+adds only new content, and unchanged files aren't even re-read (a stat
+cache keyed on size, mtime, inode and ctime skips re-hashing).
+
+Run from site root:
+  python3 snapshots.py list                  # all runs, newest first
+  python3 snapshots.py show <run>            # files captured by a run
+  python3 snapshots.py diff <run> [<run2>]   # run vs run2 (default: current files)
+  python3 snapshots.py rollback <run>        # restore every file to its pre-run state
+  python3 snapshots.py gc                    # delete objects no manifest references
+
+<run> may be a run id, a unique prefix, or "last".
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+
+from site_config import load_json, save_json
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+STORE_DIR = "_snapshots"
+CHUNK = 1 << 20
+# An mtime this close to when it was hashed can't prove the file unchanged:
+# a same-size rewrite in the same timestamp tick keeps it (FAT ticks are 2 s)
+RACY_NS = 2_000_000_000
+
+
+def _norm(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+# ─────────────────────────────────────────
+# HASHING (with stat cache)
+# ─────────────────────────────────────────
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class StatCache:
+    """
+    path → [size, mtime_ns, inode, ctime_ns, sha256, hashed_at_ns]. Skips
+    re-reading unchanged files. As in git's "racy" check, an entry whose
+    mtime isn't safely older than the moment it was hashed is never
+    trusted: the file could be rewritten, same size, within that tick.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.entries = load_json(path, {})
+
+    def digest(self, path):
+        st = os.stat(path)
+        key = _norm(path)
+        stat = [st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns]
+        cached = self.entries.get(key)
+        if cached and len(cached) == 6 and cached[:4] == stat and cached[1] < cached[5] - RACY_NS:
+            return cached[4]
+        hashed_at = time.time_ns()
+        sha = sha256_file(path)
+        self.entries[key] = stat + [sha, hashed_at]
+        self.dirty = True
+        return sha
+
+    def save(self):
+        if not self.dirty:
+            return
+        save_json(self.path, self.entries, indent=None, separators=(",", ":"))
+        self.dirty = False
+
+
+# ─────────────────────────────────────────
+# STORE
+# ─────────────────────────────────────────
+class SnapshotStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.runs_dir = os.path.join(root, "runs")
+        self.stat_cache = StatCache(os.path.join(root, "stat_cache.json"))
+
+    # ── objects ──────────────────────────
+    def object_path(self, sha):
+        return os.path.join(self.objects_dir, sha[:2], sha[2:])
+
+    def put(self, path):
+        """Store `path` by content hash (no-op if already stored). Returns sha."""
+        sha = self.stat_cache.digest(path)
+        dest = self.object_path(sha)
+        if not os.path.exists(dest):
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = f"{dest}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, dest)
+        return sha
+
+    def restore_object(self, sha, path):
+        """Write object `sha` to `path` atomically."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.restore"
+        shutil.copyfile(self.object_path(sha), tmp)
+        os.replace(tmp, path)
+
+    # ── runs ─────────────────────────────
+    def begin(self, tool):
+        return Run(self, tool)
+
+    def run_ids(self):
+        if not os.path.isdir(self.runs_dir):
+            return []
+        return sorted(
+            (name[:-5] for name in os.listdir(self.runs_dir) if name.endswith(".json")),
+            reverse=True,
+        )
+
+    def resolve(self, ref):
+        ids = self.run_ids()
+        if ref == "last":
+            if not ids:
+                raise KeyError("no runs recorded yet")
+            return ids[0]
+        if ref in ids:
+            return ref  # X-fix_final is also a prefix of X-fix_final-2
+        matches = [i for i in ids if i.startswith(ref)]
+        if len(matches) != 1:
+            raise KeyError(f"run '{ref}' matches {len(matches)} runs")
+        return matches[0]
+
+    def load(self, ref):
+        run_id = self.resolve(ref)
+        with open(os.path.join(self.runs_dir, run_id + ".json")) as f:
+            return json.load(f)
+
+    def current_files(self, paths):
+        """{path: sha or None} for the given paths as they are on disk now."""
+        current = {}
+        for path in paths:
+            current[path] = self.stat_cache.digest(path) if os.path.exists(path) else None
+        return current
+
+    def diff(self, ref_a, ref_b=None):
+        """
+        Compare two runs (or a run against the current files).
+        Returns (added, removed, changed) path lists, where "added" means
+        present in b but absent in a.
+        """
+        files_a = self.load(ref_a)["files"]
+        if ref_b is None:
+            files_b = self.current_files(files_a)
+        else:
+            files_b = self.load(ref_b)["files"]
+            # Paths only one run touched are compared against the current tree
+            missing = set(files_a) - set(files_b)
+            files_b.update(self.current_files(missing))
+            extra = set(files_b) - set(files_a)
+            files_a = dict(files_a, **self.current_files(extra))
+
+        added, removed, changed = [], [], []
+        for path in sorted(set(files_a) | set(files_b)):
+            a, b = files_a.get(path), files_b.get(path)
+            if a == b:
+                continue
+            if a is None:
+                added.append(path)
+            elif b is None:
+                removed.append(path)
+            else:
+                changed.append(path)
+        return added, removed, changed
+
+    def rollback(self, ref):
+        """
+        Restore every file captured by a run to its pre-run content. Files
+        the run created (recorded as absent) are deleted. Only files whose
+        current hash differs are rewritten.
+        """
+        manifest = self.load(ref)
+        restored, deleted = [], []
+        for path, sha in manifest["files"].items():
+            exists = os.path.exists(path)
+            if sha is None:
+                if exists:
+                    os.remove(path)
+                    deleted.append(path)
+            elif not exists or self.stat_cache.digest(path) != sha:
+                self.restore_object(sha, path)
+                restored.append(path)
+        self.stat_cache.save()
+        return restored, deleted
+
+    def gc(self):
+        """Delete objects no run manifest references. Returns count removed."""
+        live = set()
+        for run_id in self.run_ids():
+            live.update(s for s in self.load(run_id)["files"].values() if s)
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return 0
+        for prefix in os.listdir(self.objects_dir):
+            folder = os.path.join(self.objects_dir, prefix)
+            for rest in os.listdir(folder):
+                if prefix + rest not in live:
+                    os.remove(os.path.join(folder, rest))
+                    removed += 1
+        return removed
+
+
+class Run:
+    """One script invocation's snapshot: pre-change content of every touched file."""
+
+    def __init__(self, store, tool):
+        self.store = store
+        self.tool = tool
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.id = f"{stamp}-{tool}"
+        n = 1
+        while os.path.exists(os.path.join(store.runs_dir, self.id + ".json")):
+            n += 1
+            self.id = f"{stamp}-{tool}-{n}"
+        self.created = datetime.now().isoformat()
+        self.files = {}
+
+    def add(self, path):
+        """Capture `path` before it's modified. First capture wins."""
+        key = _norm(path)
+        if key in self.files:
+            return
+        self.files[key] = self.store.put(path) if os.path.exists(path) else None
+
+    def restore(self, path):
+        """Put a single captured file back (e.g. after a failed rewrite)."""
+        sha = self.files.get(_norm(path))
+        if sha is None:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            self.store.restore_object(sha, path)
+
+    def save(self):
+        """Write the manifest. Runs that captured nothing leave no trace."""
+        self.store.stat_cache.save()
+        if not self.files:
+            return None
+        manifest = {
+            "id": self.id,
+            "tool": self.tool,
+            "created": self.created,
+            "files": self.files,
+        }
+        path = os.path.join(self.store.runs_dir, self.id + ".json")
+        save_json(path, manifest, indent=1, sort_keys=True)
+        return path
+
+
+def begin_run(tool, root=STORE_DIR):
+    """Shortcut used by the site scripts."""
+    return SnapshotStore(root).begin(tool)
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed snapshots of site runs.")
+    parser.add_argument("--store", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p = sub.add_parser("show");     p.add_argument("run")
+    p = sub.add_parser("diff");     p.add_argument("run"); p.add_argument("run2", nargs="?")
+    p = sub.add_parser("rollback"); p.add_argument("run")
+    sub.add_parser("gc")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.store)
+    try:
+        if args.cmd == "list":
+            ids = store.run_ids()
+            if not ids:
+                print("No runs recorded yet.")
+            for run_id in ids:
+                m = store.load(run_id)
+                print(f"  {run_id:<40} {m['tool']:<14} {len(m['files']):>6} files")
+
+        elif args.cmd == "show":
+            m = store.load(args.run)
+            print(f"Run {m['id']} ({m['tool']}, {m['created']})")
+            for path, sha in sorted(m["files"].items()):
+                print(f"  {sha[:12] if sha else '(absent)':<12}  {path}")
+
+        elif args.cmd == "diff":
+            added, removed, changed = store.diff(args.run, args.run2)
+            for label, paths in (("+", added), ("-", removed), ("~", changed)):
+                for path in paths:
+                    print(f"  {label} {path}")
+            print(f"\n  {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+
+        elif args.cmd == "rollback":
+            restored, deleted = store.rollback(args.run)
+            for path in restored:
+                print(f"  ↩️  {path}")
+            for path in deleted:
+                print(f"  🗑️  {path}")
+            print(f"\n✅ Rolled back {store.resolve(args.run)}: "
+                  f"{len(restored)} restored, {len(deleted)} deleted")
+
+        elif args.cmd == "gc":
+            print(f"✅ Removed {store.gc()} unreferenced objects")
+
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Speculation Rules from the Internal Link Graph
+Run from the ROOT of your site directory: python3 speculation.py build
+
+Writes a <script type="speculationrules"> block into the <head> of every
+page, listing the internal links a reader of THAT page is most likely to
+follow next:
+
+  1. Build the internal link graph from every <a href> on the site.
+  2. Drop site chrome — targets linked from more than CHROME_SHARE of all
+     pages (nav, footer). Hover prefetch in js/main.js still covers them.
+  3. Rank the remaining links of each page by the target's PageRank,
+     doubled when the target links back (a related article, not a stray).
+  4. The top EAGER links are prefetched as soon as the page loads; the top
+     MAX_LINKS are prerendered on hover ("moderate" eagerness).
+
+Hubs with hundreds of cards therefore fetch a handful of documents, not
+every link. Browsers without speculation rules get the same list from
+js/main.js, which reads this block and prefetches those links when they
+scroll into view, plus any internal link on hover.
+
+Edits go through staging.Transaction like the fix scripts (undo:
+python3 snapshots.py rollback <run>). Re-run after adding pages; the
+block is replaced in place.
+
+  python3 speculation.py build [--eager 3] [--max 8] [--dry-run]
+  python3 speculation.py show pages/attic-noises-at-night.html
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import posixpath
+
+import pagecache
+import profiling
+import snapshots
+import staging
+from site_config import BASE_URL
+
+EAGER = 3            # prefetched immediately
+MAX_LINKS = 8        # prerendered on hover
+CHROME_SHARE = 0.5   # linked from more pages than this → nav/footer
+DAMPING = 0.85
+ITERATIONS = 30
+
+HREF_RE = re.compile(r'<a\b[^>]*?\bhref="([^"]*)"', re.I)
+RULES_OPEN = '<script type="speculationrules">'
+HEAD_CLOSE = "</head>"
+
+
+# ─────────────────────────────────────────
+# LINK GRAPH
+# ─────────────────────────────────────────
+def url_for(path):
+    """Root-relative URL for a site file: pages/index.html → /pages/."""
+    url = "/" + path
+    return url[:-len("index.html")] if url.endswith("/index.html") else url
+
+
+def resolve(href, page_path, files):
+    """Site file an href points at (None if external or missing)."""
+    href = href.split("#")[0].split("?")[0]
+    if href.startswith(BASE_URL):
+        href = href[len(BASE_URL):] or "/"
+    if not href or ":" in href or href.startswith("//"):
+        return None
+    if not href.startswith("/"):
+        href = "/" + posixpath.join(posixpath.dirname(page_path), href)
+    path = posixpath.normpath(href).lstrip("/")
+    if href.endswith("/") or path == ".":
+        path = posixpath.join(path if path != "." else "", "index.html")
+    return path if path in files else None
+
+
+def link_graph(pages_html):
+    """{page: [target, ...]} in document order, self-links and repeats dropped."""
+    files = set(pages_html)
+    graph = {}
+    for path, html in pages_html.items():
+        seen = {path}
+        out = []
+        for href in HREF_RE.findall(html):
+            target = resolve(href, path, files)
+            if target and target not in seen:
+                seen.add(target)
+                out.append(target)
+        graph[path] = out
+    return graph
+
+
+def chrome_targets(graph):
+    """Targets linked from more than CHROME_SHARE of pages (nav, footer, logo)."""
+    inbound = {}
+    for targets in graph.values():
+        for t in targets:
+            inbound[t] = inbound.get(t, 0) + 1
+    limit = CHROME_SHARE * len(graph)
+    return {t for t, n in inbound.items() if n > limit} if len(graph) > 2 else set()
+
+
+def pagerank(graph):
+    pages = list(graph)
+    n = len(pages)
+    rank = dict.fromkeys(pages, 1.0 / n) if n else {}
+    for _ in range(ITERATIONS):
+        dangling = sum(rank[p] for p in pages if not graph[p])
+        nxt = dict.fromkeys(pages, (1 - DAMPING) / n + DAMPING * dangling / n)
+        for p in pages:
+            if graph[p]:
+                share = DAMPING * rank[p] / len(graph[p])
+                for t in graph[p]:
+                    nxt[t] += share
+        rank = nxt
+    return rank
+
+
+def rank_links(graph):
+    """{page: [target, ...]} best first, chrome excluded."""
+    chrome = chrome_targets(graph)
+    content = {p: [t for t in ts if t not in chrome] for p, ts in graph.items()}
+    pr = pagerank(content)
+    ranked = {}
+    for page, targets in content.items():
+        order = sorted(enumerate(targets),
+                       key=lambda it: (-pr[it[1]] * (2 if page in content[it[1]] else 1), it[0]))
+        ranked[page] = [t for _, t in order]
+    return ranked
+
+
+# ─────────────────────────────────────────
+# RULES
+# ─────────────────────────────────────────
+def rules_for(targets, eager=EAGER, max_links=MAX_LINKS):
+    urls = [url_for(t) for t in targets[:max_links]]
+    if not urls:
+        return None
+    rules = {"prerender": [{"source": "list", "urls": urls, "eagerness": "moderate"}]}
+    if eager > 0:
+        rules["prefetch"] = [{"source": "list", "urls": urls[:eager], "eagerness": "immediate"}]
+    return rules
+
+
+def rules_block(rules, newline="\n"):
+    return f'{newline}{RULES_OPEN}{json.dumps(rules, separators=(",", ":"))}</script>'
+
+
+def apply_rules(html, rules):
+    """
+    Page text with its speculation rules replaced in place, added before
+    </head>, or removed if rules is None.
+    """
+    newline = "\r\n" if "\r\n" in html else "\n"
+    block = rules_block(rules, newline) if rules is not None else ""
+    start = html.find(RULES_OPEN)
+    if start != -1:
+        end = html.index("</script>", start) + len("</script>")
+        if html[start - 1:start] == "\n":
+            start -= 2 if html[start - 2:start] == "\r\n" else 1
+        return html[:start] + block + html[end:]
+    if not block or HEAD_CLOSE not in html:
+        return html
+    i = html.index(HEAD_CLOSE)
+    return html[:i] + block + html[i:]
+
+
+def check_speculation_rules(tx):
+    """Every written page's speculationrules block must be valid JSON."""
+    problems = []
+    for path in tx.written:
+        if not path.endswith(".html"):
+            continue
+        for block in re.findall(re.escape(RULES_OPEN) + r"(.*?)</script>", tx.read(path), re.S):
+            try:
+                json.loads(block)
+            except ValueError as e:
+                problems.append(f"{path}: speculationrules is not JSON ({e})")
+    return problems
+
+
+# ─────────────────────────────────────────
+# BUILD
+# ─────────────────────────────────────────
+def read_pages(tx):
+    # newline="" keeps the pages' CRLF line endings intact on rewrite
+    pages = {}
+    for path in profiling.each(pagecache.site_pages(tx.tree)):
+        with open(tx.path(path), encoding="utf-8", errors="replace", newline="") as f:
+            pages[path] = f.read()
+    return pages
+
+
+def build(tx, eager=EAGER, max_links=MAX_LINKS):
+    """Stage updated pages; returns (pages, changed count)."""
+    with profiling.span("read_pages"):
+        pages = read_pages(tx)
+    with profiling.span("rank_links"):
+        ranked = rank_links(link_graph(pages))
+    changed = 0
+    with profiling.span("write_rules"):
+        for path in profiling.each(sorted(pages)):
+            updated = apply_rules(pages[path], rules_for(ranked[path], eager, max_links))
+            if updated != pages[path]:
+                tx.write(path, updated, newline="")
+                changed += 1
+    return pages, changed
+
+
+def show(path, max_links=MAX_LINKS):
+    pages = {}
+    for p in pagecache.site_pages():
+        with open(p, encoding="utf-8", errors="replace") as f:
+            pages[p] = f.read()
+    if path not in pages:
+        print(f"❌ {path} is not a site page")
+        return 1
+    graph = link_graph(pages)
+    chrome = chrome_targets(graph)
+    ranked = rank_links(graph)[path]
+    print(f"🔗 {path}: {len(graph[path])} internal links, {len(chrome & set(graph[path]))} chrome")
+    for i, t in enumerate(ranked):
+        mark = "prefetch+prerender" if i < EAGER else "prerender" if i < max_links else ""
+        print(f"   {i + 1:>3}. {url_for(t):<55} {mark}")
+    return 0
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write per-page speculation rules from the link graph.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("--eager", type=int, default=EAGER, help=f"links prefetched on load (default {EAGER})")
+    p.add_argument("--max", type=int, default=MAX_LINKS, help=f"links prerendered on hover (default {MAX_LINKS})")
+    p.add_argument("--dry-run", action="store_true", help="stage and validate, but don't swap in")
+    profiling.add_profile_args(p)
+    p = sub.add_parser("show"); p.add_argument("page")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    if args.cmd == "show":
+        return show(args.page)
+
+    profiling.start("speculation", args)
+    try:
+        return run(args)
+    finally:
+        profiling.finish()
+
+
+def run(args):
+    snap_run = None if args.dry_run else snapshots.begin_run("speculation")
+    tx = staging.Transaction("speculation", run=snap_run).begin()
+    try:
+        pages, changed = build(tx, args.eager, args.max)
+        if args.dry_run:
+            problems = tx.validate([check_speculation_rules])
+            tx.abort()
+            print(f"🔍 Dry run: {changed} of {len(pages)} pages would change"
+                  + (f", {len(problems)} validation problem(s)" if problems else ""))
+            for problem in problems:
+                print(f"   · {problem}")
+            return 1 if problems else 0
+        written, _ = tx.commit([check_speculation_rules])
+    except staging.ValidationError as e:
+        tx.abort()
+        print("❌ Staged site failed validation — nothing was changed:")
+        for problem in e.problems:
+            print(f"   · {problem}")
+        return 1
+    except BaseException:
+        tx.abort()
+        print("❌ Run failed — staging discarded, served site untouched.")
+        raise
+    finally:
+        if snap_run is not None:
+            snap_run.save()
+
+    print(f"✅ Speculation rules: {len(written)} of {len(pages)} pages updated")
+    if written:
+        print(f"   Snapshot run: {snap_run.id}  (undo: python3 snapshots.py rollback {snap_run.id})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Transactional Staged Writes
+Used by fix_site.py, fix_final.py and rewrite_site.py.
+
+A run never edits the served site in place. Instead:
+  1. begin()    — mirror the site into _stage/<id>/tree/ using hardlinks
+                  (no file data is copied)
+  2. edit       — every write lands in the staging tree as a NEW file,
+                  which breaks the hardlink; the served file is untouched
+  3. validate   — checks run against the complete staged tree
+  4. commit()   — journal the change set, snapshot the old versions, then
+                  os.replace() each changed file into place: O(changed files)
+
+begin(overlay=True) skips step 1 for small change sets: the staging tree
+holds only what the run writes, and reads fall through to the served
+file (devserver.py rebuilds one edited page this way). Anything that
+walks tx.tree directly needs the full mirror.
+
+If anything raises before commit(), abort() throws the staging tree away
+and the site is exactly as it was. If the process dies DURING commit, the
+journal is rolled forward by the next Transaction (or `python3 staging.py
+recover`), so the site always ends on one side of the swap.
+
+That makes commits crash-consistent, not atomic: each file is swapped
+with its own os.replace(), so a reader or deploy that walks the site
+while a commit is running can see some pages new and some old. Commits
+are short (O(changed files)), but publish after a run finishes, not
+during one.
+
+Each stage is owned by the run that made it: _stage/<id>.lock is held
+(flock) for the life of the transaction, and recovery only touches
+stages whose lock is free — a run that died. Concurrent runs (devserver.py
+plus a `burp fix`) leave each other's staging trees alone.
+
+Concurrent runs can still touch the same file. A transaction remembers
+the served version (inode, size, mtime) each change is based on — the
+mirrored file, or in overlay mode the file as first read — and commit()
+refuses with ConflictError if any of those paths changed since: the
+other run's edit is kept, and this run can be re-run on top of it.
+Commits hold _stage/commit.lock from that check to the last swap, so
+two commits never interleave.
+
+Run from site root:
+  python3 staging.py status    # leftover staging trees / pending journals
+  python3 staging.py recover   # finish interrupted commits, drop aborted stages
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import shutil
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pagecache
+import profiling
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+STAGE_DIR = "_stage"
+JOURNAL = "journal.json"
+COMMIT_LOCK = "commit.lock"
+
+
+class ValidationError(Exception):
+    """Raised by commit() when the staged tree fails validation."""
+
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} validation problem(s)")
+        self.problems = problems
+
+
+class ConflictError(ValidationError):
+    """Raised by commit() when another run changed a served file this run changes too."""
+
+    def __init__(self, paths):
+        super().__init__([f"{path}: changed on disk by another run since this one read it"
+                          for path in paths])
+        self.paths = paths
+
+
+def _norm(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def _skip_dir(name):
+    # Tool state (_stage, _snapshots, _cache, old _backup_* dirs) and dotdirs
+    return name.startswith("_") or name.startswith(".")
+
+
+# ─────────────────────────────────────────
+# STAGE OWNERSHIP
+# The OS drops the lock when its holder exits, however it exits.
+# ─────────────────────────────────────────
+def _lock(f, block=True):
+    """Exclusive lock on an open file; raises OSError if held elsewhere (block=False)."""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX if block else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if block else msvcrt.LK_NBLCK, 1)
+
+
+def _hold(lock_path):
+    """Create and lock a stage's owner file. Keep the returned file open."""
+    f = open(lock_path, "a+")
+    _lock(f)
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    return f
+
+
+def _version(path):
+    """(inode, size, mtime) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _owned(lock_path):
+    """True while the run that created the stage still holds its lock."""
+    try:
+        f = open(lock_path, "r+")
+    except FileNotFoundError:
+        return False
+    with f:
+        try:
+            _lock(f, block=False)
+        except OSError:
+            return True
+    return False
+
+
+# ─────────────────────────────────────────
+# BUILT-IN VALIDATORS
+# Each takes (tx) and returns a list of problem strings.
+# ─────────────────────────────────────────
+def check_html_not_truncated(tx):
+    """Changed pages must be non-empty and keep their closing </html>."""
+    problems = []
+    for path in tx.written:
+        if not path.endswith(".html"):
+            continue
+        staged = tx.read(path)
+        if not staged.strip():
+            problems.append(f"{path}: empty after edit")
+            continue
+        if os.path.exists(path):
+            # Served version's facts come from the page cache, not a re-read
+            if tx.pages is None:
+                tx.pages = pagecache.PageCache()
+            had_close = tx.pages.get(path, remember=False).html_close
+            if had_close and not re.search(r"</html\s*>", staged, re.I):
+                problems.append(f"{path}: lost its closing </html> tag")
+    return problems
+
+
+def check_xml_well_formed(tx):
+    """Changed .xml files (sitemap.xml) must parse."""
+    problems = []
+    for path in tx.written:
+        if path.endswith(".xml"):
+            try:
+                ET.parse(tx.path(path))
+            except ET.ParseError as e:
+                problems.append(f"{path}: malformed XML ({e})")
+    return problems
+
+
+DEFAULT_VALIDATORS = [check_html_not_truncated, check_xml_well_formed]
+
+
+# ─────────────────────────────────────────
+# TRANSACTION
+# ─────────────────────────────────────────
+class Transaction:
+    """
+    Staged view of the site rooted at the current directory.
+    All paths passed in are site-relative, e.g. "pages/index.html".
+    """
+
+    def __init__(self, tool, run=None, stage_root=STAGE_DIR, pages=None):
+        self.tool = tool
+        self.run = run                # snapshots.Run — old versions captured at commit
+        self.pages = pages            # pagecache.PageCache, opened on first page()
+        self.stage_root = stage_root
+        self.id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{tool}-{os.getpid()}"
+        self.dir = os.path.join(stage_root, self.id)
+        self.tree = os.path.join(self.dir, "tree")
+        self.lock = None              # open owner file, held until commit/abort
+        self.written = set()
+        self.removed = set()
+        self.base = {}                # path → served _version() this run's view of it came from
+        self.linked = 0
+        self.copied = 0
+        self.overlay = False
+
+    # ── lifecycle ────────────────────────
+    def begin(self, overlay=False, recover_stale=True):
+        """
+        Create this run's stage. recover_stale first finishes or drops the
+        stages of runs that died (never those of runs still going).
+        """
+        with profiling.span("staging.begin"):
+            if recover_stale:
+                recover(self.stage_root)
+            os.makedirs(self.stage_root, exist_ok=True)
+            # Lock before the directory exists, so no one sees it unowned
+            self.lock = _hold(self.dir + ".lock")
+            os.makedirs(self.tree)
+            if overlay:
+                self.overlay = True
+            else:
+                self._link_tree()
+        return self
+
+    def _link_tree(self):
+        for dirpath, dirnames, filenames in os.walk("."):
+            dirnames[:] = [d for d in dirnames if not _skip_dir(d)]
+            target_dir = os.path.join(self.tree, dirpath)
+            os.makedirs(target_dir, exist_ok=True)
+            for name in filenames:
+                src = os.path.join(dirpath, name)
+                dst = os.path.join(target_dir, name)
+                try:
+                    os.link(src, dst)
+                    self.linked += 1
+                except OSError:
+                    # Filesystem without hardlinks — fall back to a copy
+                    self.base[_norm(src)] = _version(src)
+                    shutil.copy2(src, dst)
+                    self.copied += 1
+
+    def validate(self, validators=None):
+        problems = []
+        for check in DEFAULT_VALIDATORS + list(validators or []):
+            with profiling.span(check.__name__, cat="validator"):
+                problems.extend(check(self))
+        return problems
+
+    def commit(self, validators=None):
+        """Validate, then swap the change set into the served tree."""
+        with profiling.span("staging.commit"):
+            problems = self.validate(validators)
+            if problems:
+                raise ValidationError(problems)
+
+            changed = sorted(self.written)
+            removed = sorted(self.removed)
+            lock = _hold(os.path.join(self.stage_root, COMMIT_LOCK))
+            try:
+                conflicts = [path for path in changed + removed
+                             if _version(path) != self.base.get(path)]
+                if conflicts:
+                    raise ConflictError(conflicts)
+                if self.run is not None:
+                    for path in changed + removed:
+                        self.run.add(path)
+
+                journal = os.path.join(self.dir, JOURNAL)
+                with open(journal, "w") as f:
+                    json.dump({"tool": self.tool, "writes": changed, "removes": removed}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                _apply(self.dir, changed, removed)
+            finally:
+                lock.close()
+            self._release()
+            self._save_pages()
+            return changed, removed
+
+    def abort(self):
+        self._release()
+        self._save_pages()
+
+    def _release(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        if self.lock is not None:
+            _unlink(self.dir + ".lock")
+            self.lock.close()
+            self.lock = None
+
+    def _save_pages(self):
+        # Records are content-addressed, so they stay valid either way
+        if self.pages is not None:
+            self.pages.save()
+
+    # ── staged file access ───────────────
+    def path(self, path):
+        staged = os.path.join(self.tree, path)
+        if self.overlay and _norm(path) not in self.removed and not os.path.exists(staged):
+            self._based_on(path)
+            return path  # not written by this run: the served file
+        return staged
+
+    def exists(self, path):
+        return os.path.exists(self.path(path))
+
+    def getsize(self, path):
+        return os.path.getsize(self.path(path))
+
+    def glob(self, pattern):
+        prefix = len(self.tree) + 1
+        found = [_norm(p[prefix:]) for p in glob.glob(os.path.join(self.tree, pattern))]
+        if self.overlay:
+            staged = set(found)
+            found += [p for p in map(_norm, glob.glob(pattern))
+                      if p not in staged and p not in self.removed]
+        return found
+
+    def page(self, path):
+        """Cached pagecache.PageRecord for the staged version of `path`."""
+        if self.pages is None:
+            self.pages = pagecache.PageCache()
+        return self.pages.get(path, self.path(path))
+
+    def read(self, path, errors="strict"):
+        with open(self.path(path), "r", encoding="utf-8", errors=errors) as f:
+            return f.read()
+
+    def write(self, path, text, newline=None):
+        """
+        Write a new file over the staged path (never through the hardlink).
+        newline="" writes `text` byte-for-byte (for text read with newline="").
+        """
+        self._based_on(path)
+        dest = os.path.join(self.tree, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = dest + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline=newline) as f:
+            f.write(text)
+        os.replace(tmp, dest)
+        self._touched(path)
+        if self.pages is not None and path.endswith(".html"):
+            self.pages.put(_norm(path), dest, text)
+
+    def copy(self, src, dst):
+        self._based_on(dst)
+        dest = os.path.join(self.tree, dst)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = dest + ".tmp"
+        shutil.copy2(self.path(src), tmp)
+        os.replace(tmp, dest)
+        self._touched(dst)
+
+    def remove(self, path):
+        self._based_on(path)
+        staged = os.path.join(self.tree, path)
+        if os.path.exists(staged) or not self.overlay:
+            os.remove(staged)
+        elif not os.path.exists(path):
+            raise FileNotFoundError(path)
+        key = _norm(path)
+        self.written.discard(key)
+        self.removed.add(key)
+
+    def _based_on(self, path):
+        """
+        Remember which served version of `path` this run works from, once:
+        the file as mirrored at begin() (the hardlink shares its inode),
+        or in overlay mode the served file as first read or overwritten.
+        """
+        key = _norm(path)
+        if key not in self.base:
+            self.base[key] = _version(path if self.overlay else os.path.join(self.tree, path))
+
+    def _touched(self, path):
+        key = _norm(path)
+        self.removed.discard(key)
+        self.written.add(key)
+
+
+def _apply(stage_dir, writes, removes):
+    """Move staged files into place. Idempotent, so it can be re-run from a journal."""
+    tree = os.path.join(stage_dir, "tree")
+    for path in writes:
+        staged = os.path.join(tree, path)
+        if not os.path.exists(staged):
+            continue  # already swapped in by an earlier, interrupted attempt
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged, path)
+    for path in removes:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _unlink(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _stages(stage_root):
+    if not os.path.isdir(stage_root):
+        return []
+    return sorted(name for name in os.listdir(stage_root)
+                  if os.path.isdir(os.path.join(stage_root, name)))
+
+
+def recover(stage_root=STAGE_DIR):
+    """
+    Finish any commit that was interrupted mid-swap (journal present) and
+    delete staging trees from runs that never reached commit. Stages whose
+    run is still going are left alone.
+    Returns (rolled_forward, discarded) lists of stage ids.
+    """
+    rolled, discarded = [], []
+    for name in _stages(stage_root):
+        stage_dir = os.path.join(stage_root, name)
+        if _owned(stage_dir + ".lock"):
+            continue
+        journal = os.path.join(stage_dir, JOURNAL)
+        if os.path.exists(journal):
+            with open(journal) as f:
+                entry = json.load(f)
+            _apply(stage_dir, entry["writes"], entry["removes"])
+            rolled.append(name)
+        else:
+            discarded.append(name)
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        _unlink(stage_dir + ".lock")
+    return rolled, discarded
+
+
+def pending(stage_root=STAGE_DIR):
+    """[(stage id, journaled, owner still running)]"""
+    return [
+        (name, os.path.exists(os.path.join(stage_root, name, JOURNAL)),
+         _owned(os.path.join(stage_root, name) + ".lock"))
+        for name in _stages(stage_root)
+    ]
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Staged-write transactions for site runs.")
+    parser.add_argument("cmd", choices=["status", "recover"])
+    args = parser.parse_args(argv)
+
+    if args.cmd == "status":
+        stages = pending()
+        if not stages:
+            print("✅ No staging trees — the site is consistent.")
+        for name, journaled, running in stages:
+            if running:
+                state = "▶️  run in progress"
+            elif journaled:
+                state = "⚠️  interrupted commit (run: recover)"
+            else:
+                state = "aborted run (safe to drop)"
+            print(f"  {name:<48} {state}")
+    else:
+        rolled, discarded = recover()
+        for name in rolled:
+            print(f"  ↪️  Finished interrupted commit: {name}")
+        for name in discarded:
+            print(f"  🗑️  Dropped aborted stage: {name}")
+        print("✅ Recovery complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Per-call API Telemetry
+Used by generate_articles.py and rewrite_site.py (via api_harness.py).
+
+Every Messages call goes through InstrumentedClient, which records per
+model: latency, time-to-first-token (calls are streamed), input/output
+tokens, throughput, cost, retries, cache hits, stop reasons and errors.
+Distributions are kept in HDR-style log-linear histograms (bounded
+relative error, constant memory however many calls).
+
+At the end of a session two files land in _telemetry/:
+  <session>.prom  — Prometheus text format (node_exporter textfile-ready)
+  <session>.json  — full summary incl. raw histograms
+
+  python3 telemetry.py list
+  python3 telemetry.py show [<session>]           # default: last
+  python3 telemetry.py compare <old> <new>        # e.g. compare prev last
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from datetime import datetime
+
+import profiling
+
+TELEMETRY_DIR = "_telemetry"
+METRIC_PREFIX = "mhib_api"
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+# ─────────────────────────────────────────
+# HDR-STYLE HISTOGRAM
+# ─────────────────────────────────────────
+class Histogram:
+    """
+    Log-linear histogram: each power-of-two range is split into
+    2**sub_bits linear sub-buckets, so any recorded value is reported
+    within 1/2**sub_bits relative error (sub_bits=7 → <0.8%).
+    Values are non-negative numbers in the histogram's own unit.
+    """
+
+    __slots__ = ("sub_bits", "counts", "count", "total", "min", "max")
+
+    def __init__(self, sub_bits=7):
+        self.sub_bits = sub_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        v = int(value)
+        if v < (1 << self.sub_bits):
+            return v  # exact below the first sub-bucket boundary
+        exp = v.bit_length() - 1 - self.sub_bits
+        return ((exp + 1) << self.sub_bits) + ((v >> exp) - (1 << self.sub_bits))
+
+    def _value(self, index):
+        """Midpoint of the bucket at `index`."""
+        size = 1 << self.sub_bits
+        if index < size:
+            return float(index)
+        exp = (index >> self.sub_bits) - 1
+        lo = (size + (index & (size - 1))) << exp
+        return lo + ((1 << exp) - 1) / 2
+
+    def record(self, value):
+        value = max(0.0, float(value))
+        i = self._index(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(max(self._value(i), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def merge(self, other):
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.count += other.count
+        self.total += other.total
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def to_dict(self):
+        return {"sub_bits": self.sub_bits, "count": self.count, "total": self.total,
+                "min": self.min, "max": self.max,
+                "counts": {str(k): v for k, v in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls(data["sub_bits"])
+        h.count, h.total, h.min, h.max = data["count"], data["total"], data["min"], data["max"]
+        h.counts = {int(k): v for k, v in data["counts"].items()}
+        return h
+
+    def summary(self):
+        out = {"count": self.count, "mean": self.mean(), "min": self.min, "max": self.max}
+        for q in QUANTILES:
+            out[f"p{round(q * 100)}"] = self.percentile(q)
+        return out
+
+
+# ─────────────────────────────────────────
+# SESSION METRICS
+# ─────────────────────────────────────────
+HISTOGRAMS = ("latency_ms", "ttft_ms", "input_tokens", "output_tokens", "tokens_per_sec")
+COUNTERS = ("calls", "ok", "errors", "retries", "cost_usd",
+            "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+class ModelStats:
+    def __init__(self):
+        self.hist = {name: Histogram() for name in HISTOGRAMS}
+        self.counters = {name: 0 for name in COUNTERS}
+        self.stop_reasons = {}
+        self.error_types = {}
+
+    def to_dict(self):
+        return {"histograms": {k: h.to_dict() for k, h in self.hist.items()},
+                "counters": self.counters,
+                "stop_reasons": self.stop_reasons,
+                "error_types": self.error_types}
+
+    @classmethod
+    def from_dict(cls, data):
+        m = cls()
+        m.hist = {k: Histogram.from_dict(v) for k, v in data["histograms"].items()}
+        m.counters = data["counters"]
+        m.stop_reasons = data["stop_reasons"]
+        m.error_types = data["error_types"]
+        return m
+
+
+class Telemetry:
+    def __init__(self, tool, out_dir=TELEMETRY_DIR):
+        self.tool = tool
+        self.out_dir = out_dir
+        self.session = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{tool}"
+        self.started = time.time()
+        self.models = {}
+
+    def model(self, name):
+        if name not in self.models:
+            self.models[name] = ModelStats()
+        return self.models[name]
+
+    def record_call(self, model, latency_s, ttft_s, usage, stop_reason, cost, retries):
+        m = self.model(model)
+        m.counters["calls"] += 1
+        m.counters["ok"] += 1
+        m.counters["retries"] += retries
+        m.counters["cost_usd"] += cost
+        m.hist["latency_ms"].record(latency_s * 1000)
+        if ttft_s is not None:
+            m.hist["ttft_ms"].record(ttft_s * 1000)
+        out_tokens = getattr(usage, "output_tokens", 0) or 0
+        m.hist["input_tokens"].record(getattr(usage, "input_tokens", 0) or 0)
+        m.hist["output_tokens"].record(out_tokens)
+        if latency_s > 0:
+            m.hist["tokens_per_sec"].record(out_tokens / latency_s)
+        for key in ("cache_read_input_tokens", "cache_creation_input_tokens"):
+            m.counters[key] += getattr(usage, key, 0) or 0
+        reason = stop_reason or "unknown"
+        m.stop_reasons[reason] = m.stop_reasons.get(reason, 0) + 1
+
+    def record_error(self, model, error, retries):
+        m = self.model(model)
+        m.counters["calls"] += 1
+        m.counters["errors"] += 1
+        m.counters["retries"] += retries
+        kind = type(error).__name__
+        m.error_types[kind] = m.error_types.get(kind, 0) + 1
+
+    # ── export ───────────────────────────
+    def to_dict(self):
+        wall = time.time() - self.started
+        return {
+            "session": self.session,
+            "tool": self.tool,
+            "started": datetime.fromtimestamp(self.started).isoformat(),
+            "wall_seconds": wall,
+            "models": {name: m.to_dict() for name, m in self.models.items()},
+        }
+
+    def write(self):
+        """Write <session>.json and <session>.prom. Returns the JSON path."""
+        if not self.models:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        data = self.to_dict()
+        base = os.path.join(self.out_dir, self.session)
+        with open(base + ".json", "w") as f:
+            json.dump(data, f, indent=1)
+        with open(base + ".prom", "w") as f:
+            f.write(prometheus_text(data))
+        return base + ".json"
+
+
+def prometheus_text(data):
+    """Prometheus exposition format for one session."""
+    lines = []
+    session = data["session"]
+
+    def label(model, **extra):
+        pairs = [("session", session), ("model", model)] + sorted(extra.items())
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    counters = [
+        ("calls_total", "calls", "Messages calls attempted"),
+        ("errors_total", "errors", "Calls that failed after all retries"),
+        ("retries_total", "retries", "Retried attempts"),
+        ("cost_usd_total", "cost_usd", "Estimated spend in USD"),
+        ("cache_read_input_tokens_total", "cache_read_input_tokens", "Prompt-cache hit tokens"),
+        ("cache_creation_input_tokens_total", "cache_creation_input_tokens", "Prompt-cache write tokens"),
+    ]
+    for metric, key, help_text in counters:
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} counter")
+        for model, m in data["models"].items():
+            lines.append(f"{METRIC_PREFIX}_{metric}{label(model)} {m['counters'][key]:.10g}")
+
+    lines.append(f"# HELP {METRIC_PREFIX}_stop_reason_total Responses by stop_reason")
+    lines.append(f"# TYPE {METRIC_PREFIX}_stop_reason_total counter")
+    for model, m in data["models"].items():
+        for reason, n in sorted(m["stop_reasons"].items()):
+            lines.append(f"{METRIC_PREFIX}_stop_reason_total{label(model, reason=reason)} {n}")
+
+    summaries = [
+        ("latency_seconds", "latency_ms", 0.001, "End-to-end call latency"),
+        ("ttft_seconds", "ttft_ms", 0.001, "Time to first token"),
+        ("input_tokens", "input_tokens", 1, "Input tokens per call"),
+        ("output_tokens", "output_tokens", 1, "Output tokens per call"),
+        ("output_tokens_per_second", "tokens_per_sec", 1, "Output throughput per call"),
+    ]
+    for metric, key, scale, help_text in summaries:
+        lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} summary")
+        for model, m in data["models"].items():
+            h = Histogram.from_dict(m["histograms"][key])
+            if not h.count:
+                continue
+            for q in QUANTILES:
+                lines.append(f"{METRIC_PREFIX}_{metric}{label(model, quantile=q)} "
+                             f"{h.percentile(q) * scale:.6g}")
+            lines.append(f"{METRIC_PREFIX}_{metric}_sum{label(model)} {h.total * scale:.6g}")
+            lines.append(f"{METRIC_PREFIX}_{metric}_count{label(model)} {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────
+# INSTRUMENTED CLIENT
+# ─────────────────────────────────────────
+def _retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _InstrumentedMessages:
+    def __init__(self, inner, telemetry, cost_fn, max_retries, backoff):
+        self._inner = inner
+        self._telemetry = telemetry
+        self._cost_fn = cost_fn
+        self._max_retries = max_retries
+        self._backoff = backoff
+
+    def _call(self, kwargs):
+        """One attempt. Streams when the client supports it, to measure TTFT."""
+        with profiling.span("messages.create", cat="api", model=kwargs.get("model")):
+            return self._attempt(kwargs)
+
+    def _attempt(self, kwargs):
+        start = time.perf_counter()
+        if not hasattr(self._inner, "stream"):
+            return self._inner.create(**kwargs), None, time.perf_counter() - start
+        ttft = None
+        with self._inner.stream(**kwargs) as stream:
+            for event in stream:
+                if ttft is None and getattr(event, "type", "") == "content_block_delta":
+                    ttft = time.perf_counter() - start
+            message = stream.get_final_message()
+        return message, ttft, time.perf_counter() - start
+
+    def create(self, **kwargs):
+        model = kwargs.get("model", "unknown")
+        retries = 0
+        while True:
+            try:
+                message, ttft, latency = self._call(kwargs)
+            except Exception as e:
+                if retries < self._max_retries and _retryable(e):
+                    delay = _retry_after(e) or self._backoff * (2 ** retries)
+                    time.sleep(delay * random.uniform(0.8, 1.2))
+                    retries += 1
+                    continue
+                self._telemetry.record_error(model, e, retries)
+                raise
+            usage = message.usage
+            cost = self._cost_fn(usage.input_tokens, usage.output_tokens)
+            self._telemetry.record_call(model, latency, ttft, usage,
+                                        getattr(message, "stop_reason", None), cost, retries)
+            return message
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class InstrumentedClient:
+    """
+    Wraps a raw SDK (or replay) client. Retries are done here, not in the
+    SDK, so they can be counted — build the SDK client with max_retries=0.
+    """
+
+    def __init__(self, client, telemetry, cost_fn, max_retries=2, backoff=0.5):
+        self._client = client
+        self.telemetry = telemetry
+        self.messages = _InstrumentedMessages(client.messages, telemetry, cost_fn,
+                                              max_retries, backoff)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def session_files(out_dir=TELEMETRY_DIR):
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(f[:-5] for f in os.listdir(out_dir) if f.endswith(".json"))
+
+
+def load_session(ref, out_dir=TELEMETRY_DIR):
+    """ref: session id, unique prefix, path to a .json, 'last' or 'prev'."""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        sessions = session_files(out_dir)
+        if ref in ("last", "prev"):
+            need = 1 if ref == "last" else 2
+            if len(sessions) < need:
+                raise KeyError(f"not enough sessions for '{ref}'")
+            ref = sessions[-need]
+        matches = [s for s in sessions if s.startswith(ref)]
+        if len(matches) != 1:
+            raise KeyError(f"session '{ref}' matches {len(matches)} sessions")
+        path = os.path.join(out_dir, matches[0] + ".json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def session_rows(data):
+    """Flat metrics per model for show/compare."""
+    rows = {}
+    for model, raw in data["models"].items():
+        m = ModelStats.from_dict(raw)
+        c = m.counters
+        lat, ttft, tps = m.hist["latency_ms"], m.hist["ttft_ms"], m.hist["tokens_per_sec"]
+        out_total = m.hist["output_tokens"].total
+        rows[model] = {
+            "calls": c["calls"],
+            "error_rate": c["errors"] / c["calls"] if c["calls"] else 0.0,
+            "retries": c["retries"],
+            "latency_p50_ms": lat.percentile(0.5),
+            "latency_p90_ms": lat.percentile(0.9),
+            "latency_p99_ms": lat.percentile(0.99),
+            "ttft_p50_ms": ttft.percentile(0.5),
+            "ttft_p99_ms": ttft.percentile(0.99),
+            "tokens_per_sec_p50": tps.percentile(0.5),
+            "session_output_tokens_per_sec": out_total / data["wall_seconds"] if data["wall_seconds"] else None,
+            "cost_per_call": c["cost_usd"] / c["ok"] if c["ok"] else None,
+            "cache_read_input_tokens": c["cache_read_input_tokens"],
+        }
+    return rows
+
+
+def _fmt(v):
+    if v is None:
+        return "—"
+    if isinstance(v, float):
+        return f"{v:.4f}" if abs(v) < 1 else f"{v:,.1f}"
+    return f"{v:,}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and compare API telemetry sessions.")
+    parser.add_argument("--dir", default=TELEMETRY_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p = sub.add_parser("show");    p.add_argument("session", nargs="?", default="last")
+    p = sub.add_parser("compare"); p.add_argument("old"); p.add_argument("new")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "list":
+            for s in session_files(args.dir):
+                print(f"  {s}")
+            return 0
+
+        if args.cmd == "show":
+            data = load_session(args.session, args.dir)
+            print(f"Session {data['session']} ({data['wall_seconds']:.1f}s wall)")
+            for model, row in session_rows(data).items():
+                print(f"\n  {model}")
+                for k, v in row.items():
+                    print(f"    {k:<32} {_fmt(v)}")
+                stops = data["models"][model]["stop_reasons"]
+                print(f"    {'stop_reasons':<32} {stops}")
+            return 0
+
+        old, new = load_session(args.old, args.dir), load_session(args.new, args.dir)
+        old_rows, new_rows = session_rows(old), session_rows(new)
+        print(f"Compare {old['session']}  →  {new['session']}")
+        for model in sorted(set(old_rows) | set(new_rows)):
+            a, b = old_rows.get(model, {}), new_rows.get(model, {})
+            print(f"\n  {model}")
+            print(f"    {'metric':<32} {'old':>12} {'new':>12} {'Δ':>9}")
+            for key in (b or a):
+                va, vb = a.get(key), b.get(key)
+                delta = "—"
+                if isinstance(va, (int, float)) and isinstance(vb, (int, float)) and va:
+                    delta = f"{(vb - va) / va:+.1%}"
+                print(f"    {key:<32} {_fmt(va):>12} {_fmt(vb):>12} {delta:>9}")
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
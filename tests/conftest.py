@@ -0,0 +1,29 @@
+import json
+import urllib.request
+
+import pytest
+
+import fake_web
+
+
+@pytest.fixture
+def start_web():
+    """start_web(**FakeWeb options) → (FakeWeb, base URL), stopped after the test."""
+    servers = []
+
+    def start(**options):
+        web = fake_web.FakeWeb(**options)
+        server = fake_web.serve(web, port=0)
+        servers.append(server)
+        host, port = server.server_address[:2]
+        return web, f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return json.load(resp)
@@ -0,0 +1,70 @@
+"""devserver.py rebuilds alongside other runs on a copy of the site."""
+
+import os
+import shutil
+
+import pytest
+
+import devserver
+import staging
+
+SITE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "myhouseisburping")
+PAGE = "pages/is-house-burping-normal.html"
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    root = tmp_path / "site"
+    shutil.copytree(SITE, root, ignore=shutil.ignore_patterns("_*"))
+    monkeypatch.chdir(root)
+    return root
+
+
+def read(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def other_run_edits(path, marker):
+    tx = staging.Transaction("other").begin(overlay=True, recover_stale=False)
+    tx.write(path, read(path).replace("</body>", f"{marker}\n</body>"), newline="")
+    tx.commit()
+
+
+def test_save_racing_another_commit_is_restaged(site, monkeypatch):
+    rebuilder = devserver.Rebuilder()
+    with open(PAGE, "a", encoding="utf-8") as f:
+        f.write('<a href="/radon/">radon</a>\n')
+
+    fix, calls = rebuilder.fix, []
+
+    def racing_fix(tx, path):
+        fix(tx, path)
+        calls.append(path)
+        if len(calls) == 1:
+            other_run_edits(path, "<!-- other run -->")
+
+    monkeypatch.setattr(rebuilder, "fix", racing_fix)
+    written, removed, missing = rebuilder.rebuild([PAGE])
+    assert calls == [PAGE, PAGE]
+    assert PAGE in written
+    html = read(PAGE)
+    assert "<!-- other run -->" in html           # the other run's commit survived
+    assert 'href="/pages/radon-hub.html"' in html  # and the rebuild still applied
+    assert os.listdir(staging.STAGE_DIR) == [staging.COMMIT_LOCK]
+
+
+def test_rebuild_gives_up_after_conflict_retries(site, monkeypatch):
+    rebuilder = devserver.Rebuilder()
+    with open(PAGE, "a", encoding="utf-8") as f:
+        f.write('<a href="/radon/">radon</a>\n')
+    fix = rebuilder.fix
+
+    def always_racing_fix(tx, path):
+        fix(tx, path)
+        other_run_edits(path, "<!-- other run -->")
+
+    monkeypatch.setattr(rebuilder, "fix", always_racing_fix)
+    with pytest.raises(staging.ConflictError):
+        rebuilder.rebuild([PAGE])
+    assert read(PAGE).count("<!-- other run -->") == devserver.CONFLICT_RETRIES
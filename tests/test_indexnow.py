@@ -0,0 +1,170 @@
+"""indexnow.py against fake_web.py's POST /indexnow stand-in."""
+
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+import indexnow
+from site_config import BASE_URL, load_json
+from speculation import url_for
+
+KEY = "0123456789abcdef"
+
+
+def day(text):
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def write_page(root, path, css="styles.css", body="Burping pipes.", when="2026-01-05"):
+    fs_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(fs_path), exist_ok=True)
+    with open(fs_path, "w", encoding="utf-8") as f:
+        f.write(f'<html><head><title>{path}</title>'
+                f'<link rel="canonical" href="{BASE_URL}{url_for(path)}">'
+                f'<link rel="stylesheet" href="/css/{css}"></head>'
+                f'<body><p>{body}</p></body></html>\n')
+    os.utime(fs_path, (day(when), day(when)))
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = str(tmp_path / "site")
+    write_page(root, "index.html")
+    for i in range(5):
+        write_page(root, f"pages/guide-{i}.html")
+    with open(os.path.join(root, f"{KEY}.txt"), "w") as f:
+        f.write(KEY)
+    return root
+
+
+def payload(urls):
+    return {"host": "www.myhouseisburping.com", "key": KEY,
+            "keyLocation": f"{BASE_URL}/{KEY}.txt", "urlList": urls}
+
+
+def urls(n):
+    return [f"{BASE_URL}/pages/guide-{i}.html" for i in range(n)]
+
+
+def test_throttled_then_accepted(start_web):
+    web, base = start_web(indexnow_failures=2)
+    status = indexnow.submit_batch(f"{base}/indexnow", payload(urls(3)), retries=5, backoff=0,
+                                   log=lambda line: None)
+    assert status == 200
+    assert web.indexnow["requests"] == 3
+    assert web.indexnow["throttled"] == 2
+    assert web.indexnow["batches"] == 1
+
+
+@pytest.mark.parametrize("retries", [0, 1])
+def test_retries_below_one_still_sends_once(start_web, retries):
+    web, base = start_web(indexnow_failures=10)
+    status = indexnow.submit_batch(f"{base}/indexnow", payload(urls(1)), retries=retries, backoff=0,
+                                   log=lambda line: None)
+    assert status == 429
+    assert web.indexnow["requests"] == 1
+
+
+def test_rejection_is_not_retried(start_web):
+    web, base = start_web()
+    bad = dict(payload(urls(1)), urlList=["https://elsewhere.example/page.html"])
+    assert indexnow.submit_batch(f"{base}/indexnow", bad, retries=5, backoff=0) == 422
+    assert web.indexnow["requests"] == 1
+
+
+def test_batches_split_at_batch_size(start_web, tmp_path):
+    web, base = start_web()
+    ledger = {"version": indexnow.VERSION, "urls": {}}
+    todo = [f"{BASE_URL}/pages/p{i}.html" for i in range(25)]
+    accepted, failed = indexnow.submit(ledger, todo, KEY, f"{base}/indexnow", batch_size=10, retries=1,
+                                       backoff=0, ledger_file=str(tmp_path / "ledger.json"))
+    assert (accepted, failed) == (25, [])
+    assert web.indexnow["batches"] == 3
+    assert web.indexnow["urls"] == todo
+
+
+def test_interrupted_run_resubmits_only_the_rest(start_web, site, monkeypatch):
+    web, base = start_web()
+    ledger_file = os.path.join(site, "_deploy", "indexnow.json")
+    ledger = indexnow.load_ledger(ledger_file)
+    todo, removed = indexnow.diff(ledger, indexnow.scan(site))
+    assert (len(todo), removed) == (6, [])
+
+    real = indexnow.submit_batch
+    calls = []
+
+    def interrupt_second(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(indexnow, "submit_batch", interrupt_second)
+    with pytest.raises(KeyboardInterrupt):
+        indexnow.submit(ledger, todo, KEY, f"{base}/indexnow", batch_size=4, retries=1, backoff=0,
+                        ledger_file=ledger_file)
+    monkeypatch.undo()
+
+    ledger = indexnow.load_ledger(ledger_file)
+    rest, _ = indexnow.diff(ledger, indexnow.scan(site))
+    assert rest == todo[4:]
+    accepted, failed = indexnow.submit(ledger, rest, KEY, f"{base}/indexnow", batch_size=4, retries=1,
+                                       backoff=0, ledger_file=ledger_file)
+    assert (accepted, failed) == (2, [])
+    assert web.indexnow["urls"] == todo
+    assert indexnow.diff(indexnow.load_ledger(ledger_file), indexnow.scan(site))[0] == []
+
+
+def test_removed_urls_leave_the_ledger_once_accepted(start_web, site, tmp_path):
+    web, base = start_web()
+    ledger_file = str(tmp_path / "ledger.json")
+    ledger = indexnow.load_ledger(ledger_file)
+    todo, _ = indexnow.diff(ledger, indexnow.scan(site))
+    indexnow.mark(ledger, todo, indexnow.now())
+
+    gone = f"{BASE_URL}/pages/guide-4.html"
+    os.remove(os.path.join(site, "pages", "guide-4.html"))
+    todo, removed = indexnow.diff(ledger, indexnow.scan(site))
+    assert todo == removed == [gone]
+    assert ledger["urls"][gone]["removed"]
+
+    assert indexnow.submit(ledger, todo, KEY, f"{base}/indexnow", retries=1, backoff=0,
+                           ledger_file=ledger_file) == (1, [])
+    assert gone not in load_json(ledger_file)["urls"]
+    assert web.indexnow["urls"] == [gone]
+
+
+def test_lastmod_ignores_fingerprinted_asset_names(site):
+    ledger = indexnow.load_ledger(os.path.join(site, "missing.json"))
+    todo, _ = indexnow.diff(ledger, indexnow.scan(site))
+    indexnow.mark(ledger, todo, indexnow.now())
+    path = "pages/guide-0.html"
+    fs_path = os.path.join(site, path)
+    assert indexnow.lastmod(path, fs_path, ledger) == "2026-01-05"
+
+    # A CSS rebuild renames the stylesheet in every page: same content
+    write_page(site, path, css="styles.0123456789.css", when="2026-02-01")
+    assert indexnow.lastmod(path, fs_path, ledger) == "2026-01-05"
+    write_page(site, path, css="styles.abcdef0123.css", when="2026-02-02")
+    assert indexnow.diff(ledger, indexnow.scan(site)) == ([], [])
+    assert indexnow.lastmod(path, fs_path, ledger) == "2026-01-05"
+
+    # A real edit moves it
+    write_page(site, path, css="styles.abcdef0123.css", body="New advice.", when="2026-02-03")
+    assert indexnow.lastmod(path, fs_path, ledger) == "2026-02-03"
+    assert indexnow.diff(ledger, indexnow.scan(site)) == ([f"{BASE_URL}/{path}"], [])
+    assert ledger["urls"][f"{BASE_URL}/{path}"]["lastmod"] == "2026-02-03"
+
+
+def test_cli_submit_then_nothing_changed(start_web, site, monkeypatch, capsys):
+    web, base = start_web(indexnow_failures=1)
+    monkeypatch.chdir(site)
+    args = ["submit", "--endpoint", f"{base}/indexnow", "--batch", "4", "--retries", "0"]
+    # --retries 0 sends each batch once: the throttled first batch stays pending
+    assert indexnow.main(args) == 1
+    assert web.indexnow["requests"] == 2
+    assert indexnow.main(args) == 0
+    assert indexnow.main(args) == 0
+    assert "Nothing changed" in capsys.readouterr().out
+    assert sorted(web.indexnow["urls"]) == sorted(urls(5) + [BASE_URL + "/"])
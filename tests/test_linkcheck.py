@@ -0,0 +1,93 @@
+"""linkcheck.py against fake_web.py: one in-process stand-in answers for every host."""
+
+import time
+
+import linkcheck
+from conftest import get_json
+
+
+def pools(base):
+    return linkcheck.Pools(linkcheck.parse_via(base), delay=0, timeout=5)
+
+
+def check(base, urls, results=None, **options):
+    results = {} if results is None else results
+    linkcheck.check_all(urls, results, pools(base), **options)
+    return results
+
+
+def test_per_host_caps_concurrent_requests(start_web):
+    web, base = start_web(latency_ms=30)
+    urls = [f"https://busy.example/page{i}" for i in range(12)]
+    urls += [f"https://quiet.example/page{i}" for i in range(3)]
+    results = check(base, urls, workers=8, per_host=2)
+
+    assert all(linkcheck.state(results[url]) == "ok" for url in urls)
+    stats = get_json(f"{base}/__stats")
+    assert stats["busy.example"]["requests"] == 12
+    assert stats["busy.example"]["peak_concurrent"] == 2
+    assert stats["busy.example"]["connections"] <= 2
+    assert stats["quiet.example"]["peak_concurrent"] <= 2
+
+
+def test_warm_rerun_is_conditional(start_web):
+    web, base = start_web()
+    urls = [f"https://shop.example/item{i}" for i in range(4)]
+    results = check(base, urls)
+    assert all(results[url].get("etag") and results[url].get("last_modified") for url in urls)
+    assert not any(results[url].get("not_modified") for url in urls)
+
+    results = check(base, urls, results)
+    assert all(results[url].get("not_modified") for url in urls)
+    assert all(results[url]["status"] == 200 for url in urls)
+    assert get_json(f"{base}/__stats")["shop.example"]["not_modified"] == 4
+
+
+def test_head_refused_falls_back_to_get(start_web):
+    web, base = start_web()
+    url = "https://strict.example/nohead/guide.html"
+    results = check(base, [url])
+    assert results[url]["status"] == 200
+    assert "final_url" not in results[url]
+    assert get_json(f"{base}/__stats")["strict.example"]["requests"] == 2
+
+
+def test_redirect_chain_is_followed(start_web):
+    web, base = start_web()
+    url = f"https://moved.example/redirect/{linkcheck.MAX_REDIRECTS}/final.html"
+    results = check(base, [url])
+    assert results[url]["status"] == 200
+    assert results[url]["final_url"] == "https://moved.example/final.html"
+    # Validators belong to the final URL, not the one the page links to
+    assert "etag" not in results[url]
+
+
+def test_too_many_redirects_is_broken(start_web):
+    web, base = start_web()
+    url = f"https://loop.example/redirect/{linkcheck.MAX_REDIRECTS + 1}/final.html"
+    results = check(base, [url])
+    assert results[url]["status"] is None
+    assert "redirects" in results[url]["error"]
+    assert linkcheck.state(results[url]) == "broken"
+
+
+def test_broken_entry_rechecked_sooner(start_web):
+    web, base = start_web()
+    url = "https://gone.example/status/404/page.html"
+    entry = check(base, [url])[url]
+    assert linkcheck.state(entry) == "broken"
+
+    now = entry["checked_at"]
+    soon = now + linkcheck.BROKEN_MAX_AGE_DAYS * 86400 - 60
+    later = now + linkcheck.BROKEN_MAX_AGE_DAYS * 86400 + 60
+    assert not linkcheck.is_stale(entry, soon)
+    assert linkcheck.is_stale(entry, later)
+
+    ok = {"status": 200, "checked_at": now}
+    assert not linkcheck.is_stale(ok, later)
+    assert linkcheck.is_stale(ok, now + linkcheck.MAX_AGE_DAYS * 86400 + 60)
+
+    # Once stale, a re-run checks it again (a 404 has no validators to send)
+    results = check(base, [url], {url: entry})
+    assert results[url]["checked_at"] >= int(time.time()) - 5
+    assert get_json(f"{base}/__stats")["gone.example"]["requests"] == 2
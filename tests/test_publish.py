@@ -0,0 +1,140 @@
+"""publish.py against a DirectoryHost in a temp directory."""
+
+import os
+
+import pytest
+
+import publish
+
+SITE = {
+    "index.html": "<p>home</p>",
+    "pages/guide.html": "<p>guide</p>",
+    "pages/radon/map.html": "<p>map</p>",
+    "css/styles.css": "body{}",
+    "js/main.js": "go();",
+    "sw.js": "self.addEventListener('fetch', f => f);",
+    "_cache/pages.json": "{}",
+    ".env": "SECRET=1",
+}
+
+
+def write(root, path, text):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = str(tmp_path / "site")
+    for path, text in SITE.items():
+        write(root, path, text)
+    return root
+
+
+@pytest.fixture
+def host(tmp_path):
+    return publish.DirectoryHost(str(tmp_path / "host"))
+
+
+class RecordingHost(publish.DirectoryHost):
+    """Remembers every call, and fails the upload after `fail_after` puts."""
+
+    def __init__(self, root, fail_after=None):
+        super().__init__(root)
+        self.calls = []
+        self.fail_after = fail_after
+
+    def put(self, path, src):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise OSError("connection lost")
+        self.calls.append(("put", path))
+        super().put(path, src)
+
+    def delete(self, path):
+        self.calls.append(("delete", path))
+        super().delete(path)
+
+    def save_manifest(self, files, deployed_at):
+        self.calls.append(("manifest", None))
+        super().save_manifest(files, deployed_at)
+
+
+def deploy(site, host):
+    local = publish.build_manifest(site)
+    plan = publish.plan(local, host.manifest())
+    publish.publish(plan, host, local, site, deployed_at="2026-01-05T12:00:00")
+    return plan
+
+
+def test_tool_state_and_dotfiles_stay_local(site):
+    assert "_cache/pages.json" not in publish.output_files(site)
+    assert ".env" not in publish.output_files(site)
+
+
+def test_one_file_change_plans_one_upload(site, host):
+    first = deploy(site, host)
+    assert len(first["added"]) == 6
+    assert publish.plan(publish.build_manifest(site), host.manifest()) == \
+        {"added": [], "changed": [], "removed": []}
+
+    write(site, "pages/guide.html", "<p>better guide</p>")
+    plan = publish.plan(publish.build_manifest(site), host.manifest())
+    assert plan == {"added": [], "changed": ["pages/guide.html"], "removed": []}
+    assert publish.upload_order(plan) == ["pages/guide.html"]
+
+
+def test_upload_order_assets_then_html_then_service_worker(site, tmp_path):
+    host = RecordingHost(str(tmp_path / "host"))
+    deploy(site, host)
+    assert host.calls == [("put", "css/styles.css"), ("put", "js/main.js"),
+                          ("put", "index.html"), ("put", "pages/guide.html"),
+                          ("put", "pages/radon/map.html"), ("put", "sw.js"),
+                          ("manifest", None)]
+
+
+def test_removals_after_uploads_and_prune_empty_dirs(site, tmp_path):
+    host = RecordingHost(str(tmp_path / "host"))
+    deploy(site, host)
+    os.remove(os.path.join(site, "pages", "radon", "map.html"))
+    os.rmdir(os.path.join(site, "pages", "radon"))
+    write(site, "css/styles.css", "body{margin:0}")
+
+    host.calls = []
+    plan = deploy(site, host)
+    assert plan["removed"] == ["pages/radon/map.html"]
+    assert host.calls == [("put", "css/styles.css"), ("delete", "pages/radon/map.html"),
+                          ("manifest", None)]
+    assert not os.path.exists(os.path.join(host.root, "pages", "radon"))
+    assert os.path.isfile(os.path.join(host.root, "pages", "guide.html"))
+
+
+def test_interrupted_publish_replans_the_same_files(site, tmp_path):
+    host = publish.DirectoryHost(str(tmp_path / "host"))
+    deploy(site, host)
+    write(site, "css/styles.css", "body{color:red}")
+    write(site, "pages/guide.html", "<p>red guide</p>")
+    write(site, "sw.js", "// v2")
+    local = publish.build_manifest(site)
+    plan = publish.plan(local, host.manifest())
+
+    flaky = RecordingHost(host.root, fail_after=1)
+    with pytest.raises(OSError):
+        publish.publish(plan, flaky, local, site)
+    assert flaky.calls == [("put", "css/styles.css")]
+
+    assert publish.plan(publish.build_manifest(site), host.manifest()) == plan
+    deploy(site, host)
+    assert publish.plan(publish.build_manifest(site), host.manifest()) == \
+        {"added": [], "changed": [], "removed": []}
+
+
+def test_verify_reports_drift(site, host):
+    deploy(site, host)
+    assert host.drift() == []
+
+    write(host.root, "pages/guide.html", "<p>edited on the host</p>")
+    os.remove(os.path.join(host.root, "js", "main.js"))
+    assert host.drift() == ["js/main.js: missing on host",
+                            "pages/guide.html: differs from deployed manifest"]
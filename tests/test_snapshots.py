@@ -0,0 +1,81 @@
+"""snapshots.py: the stat cache must never hand back a stale hash."""
+
+import os
+import time
+
+import pytest
+
+import snapshots
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write(path, text, mtime_ns=None):
+    with open(path, "w") as f:
+        f.write(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def hour_ago():
+    return time.time_ns() - 3600 * 10**9
+
+
+def test_same_size_rewrite_with_same_mtime_is_rehashed(site):
+    cache = snapshots.StatCache("_snapshots/stat_cache.json")
+    mtime = hour_ago()
+    write("page.html", "aaaa", mtime)
+    assert cache.digest("page.html") == snapshots.sha256_file("page.html")
+
+    write("page.html", "bbbb", mtime)   # same size, same mtime: only ctime moved
+    assert cache.digest("page.html") == snapshots.sha256_file("page.html")
+
+
+def test_recent_mtime_is_not_trusted(site, monkeypatch):
+    calls = []
+    real = snapshots.sha256_file
+    monkeypatch.setattr(snapshots, "sha256_file", lambda path: calls.append(path) or real(path))
+    cache = snapshots.StatCache("_snapshots/stat_cache.json")
+
+    write("fresh.html", "new")
+    cache.digest("fresh.html")
+    cache.digest("fresh.html")
+    assert calls == ["fresh.html", "fresh.html"]   # within RACY_NS of hashing: re-read
+
+    calls.clear()
+    write("old.html", "old", hour_ago())
+    cache.digest("old.html")
+    cache.digest("old.html")
+    assert calls == ["old.html"]
+
+
+def test_cache_survives_save_and_reload(site, monkeypatch):
+    write("old.html", "old", hour_ago())
+    cache = snapshots.StatCache("_snapshots/stat_cache.json")
+    sha = cache.digest("old.html")
+    cache.save()
+
+    monkeypatch.setattr(snapshots, "sha256_file", lambda path: pytest.fail("re-read"))
+    assert snapshots.StatCache("_snapshots/stat_cache.json").digest("old.html") == sha
+
+
+def test_rollback_restores_the_bytes_the_run_replaced(site):
+    mtime = hour_ago()
+    write("page.html", "aaaa", mtime)
+    first = snapshots.begin_run("first")
+    first.add("page.html")
+    first.save()
+
+    write("page.html", "bbbb", mtime)
+    second = snapshots.begin_run("second")
+    second.add("page.html")
+    second.save()
+    write("page.html", "cccc")
+
+    snapshots.SnapshotStore().rollback(second.id)
+    with open("page.html") as f:
+        assert f.read() == "bbbb"
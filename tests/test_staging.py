@@ -0,0 +1,88 @@
+"""staging.py: concurrent transactions must not lose each other's commits."""
+
+import os
+
+import pytest
+
+import staging
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("pages")
+    for path in ("index.html", "pages/a.html", "pages/b.html"):
+        with open(path, "w") as f:
+            f.write(f"<html><p>{path}</p></html>\n")
+    return tmp_path
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("overlay", [False, True])
+def test_second_commit_of_the_same_file_conflicts(site, overlay):
+    first = staging.Transaction("first").begin(overlay=overlay)
+    second = staging.Transaction("second").begin(overlay=overlay, recover_stale=False)
+    first.write("pages/a.html", first.read("pages/a.html").replace("<p>", "<p>first "))
+    second.write("pages/a.html", second.read("pages/a.html").replace("<p>", "<p>second "))
+    first.commit()
+
+    with pytest.raises(staging.ConflictError) as e:
+        second.commit()
+    second.abort()
+    assert e.value.paths == ["pages/a.html"]
+    assert "first" in read("pages/a.html") and "second" not in read("pages/a.html")
+    assert os.listdir(staging.STAGE_DIR) == [staging.COMMIT_LOCK]
+
+
+@pytest.mark.parametrize("overlay", [False, True])
+def test_different_files_both_commit(site, overlay):
+    first = staging.Transaction("first").begin(overlay=overlay)
+    second = staging.Transaction("second").begin(overlay=overlay, recover_stale=False)
+    first.write("pages/a.html", "<html><p>A</p></html>\n")
+    second.write("pages/b.html", "<html><p>B</p></html>\n")
+    second.remove("index.html")
+    first.commit()
+    second.commit()
+    assert read("pages/a.html") == "<html><p>A</p></html>\n"
+    assert read("pages/b.html") == "<html><p>B</p></html>\n"
+    assert not os.path.exists("index.html")
+
+
+def test_removed_file_recreated_by_another_run_conflicts(site):
+    first = staging.Transaction("first").begin()
+    second = staging.Transaction("second").begin(recover_stale=False)
+    first.remove("pages/b.html")
+    first.commit()
+    second.write("pages/b.html", "<html><p>stale</p></html>\n")
+    with pytest.raises(staging.ConflictError):
+        second.commit()
+    second.abort()
+    assert not os.path.exists("pages/b.html")
+
+
+def test_new_file_created_by_both_conflicts(site):
+    first = staging.Transaction("first").begin(overlay=True)
+    second = staging.Transaction("second").begin(overlay=True, recover_stale=False)
+    first.write("pages/new.html", "<html><p>one</p></html>\n")
+    second.write("pages/new.html", "<html><p>two</p></html>\n")
+    first.commit()
+    with pytest.raises(staging.ConflictError):
+        second.commit()
+    second.abort()
+    assert read("pages/new.html") == "<html><p>one</p></html>\n"
+
+
+def test_edit_in_place_after_read_conflicts(site):
+    tx = staging.Transaction("tx").begin(overlay=True)
+    text = tx.read("pages/a.html")
+    with open("pages/a.html", "a") as f:   # an editor saving over the same inode
+        f.write("<!-- edited -->\n")
+    tx.write("pages/a.html", text.replace("<p>", "<p>fixed "))
+    with pytest.raises(staging.ConflictError):
+        tx.commit()
+    tx.abort()
+    assert read("pages/a.html").endswith("<!-- edited -->\n")
@@ -0,0 +1,38 @@
+"""
+`--help` must not import what only a run needs.
+
+Each command's --help runs under `python -X importtime` and fails if it
+loads one of bench.HEAVY_IMPORTS (the anthropic SDK, http.server,
+sqlite3). `burp serve` is the HTTP server, so it is the one exception.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import cli
+from bench import CLI, HEAVY_IMPORTS, SOURCE_SITE
+
+ROOT = os.path.dirname(CLI)
+SERVERS = {"serve"}
+
+
+def loaded_modules(argv):
+    """Every module `python -X importtime <argv>` imports."""
+    out = subprocess.run([sys.executable, "-X", "importtime"] + argv, cwd=os.path.join(ROOT, SOURCE_SITE),
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True).stderr
+    return {line.rsplit("|", 1)[-1].strip() for line in out.splitlines() if "|" in line}
+
+
+@pytest.mark.parametrize("command", sorted(set(cli.COMMANDS) - SERVERS))
+def test_burp_help_skips_heavy_imports(command):
+    loaded = loaded_modules([CLI, command, "--help"])
+    assert [m for m in HEAVY_IMPORTS if m in loaded] == []
+
+
+@pytest.mark.parametrize("script", ["generate_articles.py", "rewrite_site.py", "traffic.py"])
+def test_script_help_skips_heavy_imports(script):
+    loaded = loaded_modules([os.path.join(ROOT, script), "--help"])
+    assert [m for m in HEAVY_IMPORTS if m in loaded] == []
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+MyHouseIsBurping.com — Search Console + Access Log Store
+Run from the ROOT of your site directory: python3 traffic.py import <files>
+
+The TIER ordering in generate_articles.py and rewrite_site.py's PAGES were
+picked by hand from GSC screenshots. This imports the raw data instead
+and keeps it in one indexed SQLite file (_cache/traffic.sqlite):
+
+  · GSC performance exports (CSV) — Queries.csv, Pages.csv, or a
+    page+query export (e.g. the bulk export / Looker table). Columns are
+    matched by name, so any of them works; rows without a page or query
+    are stored under "".
+  · Access logs — Vercel log-drain JSON lines or Combined Log Format,
+    plain or .gz. Page views are counted per URL; bots separately.
+
+Files are streamed row by row and aggregated in batches of BATCH rows
+(UPSERTs into the store), so memory stays flat however large the export.
+A file whose content was already imported is skipped; --replace clears
+that kind of data first (a new GSC export covers the same dates again).
+
+Opportunity = extra clicks a query would earn at TARGET_POSITION:
+impressions × (CTR at target − CTR at its current position), from
+CTR_BY_POSITION. Quick wins — lots of impressions, ranking 5–20 — score
+highest; queries already at the top score ~0.
+
+generate_articles.py and rewrite_site.py order their todo lists by this
+score when the store exists, and with --fill add entries for pages or
+queries that aren't in their hand-written lists yet.
+
+  python3 traffic.py import Queries.csv Pages.csv [--replace]
+  python3 traffic.py import access.log.gz
+  python3 traffic.py top [-n 20]           # pages by opportunity
+  python3 traffic.py queries /pages/attic-noises-at-night.html
+  python3 traffic.py gaps                  # queries with no page ranking for them
+"""
+
+import os
+import re
+import csv
+import sys
+import gzip
+import json
+import argparse
+from datetime import datetime
+
+import snapshots
+from site_config import SITE_HOSTS
+
+# ─────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────
+DB_FILE = os.path.join("_cache", "traffic.sqlite")
+BATCH = 50_000
+
+# Typical organic CTR by position (positions past the table use the last value)
+CTR_BY_POSITION = [0.28, 0.15, 0.11, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03, 0.025,
+                   0.015, 0.012, 0.01, 0.008, 0.007, 0.006, 0.005, 0.005, 0.004, 0.004]
+TARGET_POSITION = 3
+GAP_POSITION = 20          # best page ranks worse than this → no real page for the query
+MIN_IMPRESSIONS = 50       # ignore long-tail noise for --fill entries
+MATCH_SHARE = 0.6          # share of a query's words an article keyword must contain
+
+# GSC column names (lowercased) → field
+GSC_COLUMNS = {
+    "top pages": "url", "page": "url", "url": "url", "landing page": "url",
+    "top queries": "query", "query": "query", "queries": "query",
+    "clicks": "clicks", "impressions": "impressions",
+    "position": "position", "avg. position": "position", "average position": "position",
+    "sum_top_position": "sum_top_position",
+}
+
+BOT_RE = re.compile(r"bot|crawl|spider|slurp|preview|monitor|curl|wget|python", re.I)
+CLF_RE = re.compile(r'^\S+ \S+ \S+ \[[^\]]+\] "(?:GET|HEAD) (\S+)[^"]*" (\d{3}) \S+(?: "[^"]*" "([^"]*)")?')
+STOP_WORDS = {"a", "an", "and", "the", "is", "it", "my", "in", "of", "to", "for", "do",
+              "does", "why", "what", "how", "when", "i", "on", "or", "your", "can", "with"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gsc (
+    url TEXT NOT NULL, query TEXT NOT NULL,
+    impressions INTEGER NOT NULL, clicks INTEGER NOT NULL, pos_sum REAL NOT NULL,
+    PRIMARY KEY (url, query)
+);
+CREATE INDEX IF NOT EXISTS gsc_query ON gsc (query);
+CREATE TABLE IF NOT EXISTS hits (
+    url TEXT PRIMARY KEY, views INTEGER NOT NULL, bot_views INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    sha256 TEXT PRIMARY KEY, file TEXT, kind TEXT, rows INTEGER, imported_at TEXT
+);
+"""
+
+
+# ─────────────────────────────────────────
+# STORE
+# ─────────────────────────────────────────
+def connect(path=DB_FILE):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    import sqlite3  # only once a database is opened, not for --help
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def exists(path=DB_FILE):
+    return os.path.exists(path)
+
+
+def normalize_url(url):
+    """Root-relative page URL: scheme/host, query and fragment dropped."""
+    url = url.strip().split("#")[0].split("?")[0]
+    if "//" in url:
+        host_and_path = url.split("//", 1)[1]
+        host, _, path = host_and_path.partition("/")
+        if host.lower() not in SITE_HOSTS:
+            return None
+        url = "/" + path
+    if not url.startswith("/"):
+        return None
+    return url
+
+
+def ctr(position):
+    i = max(1, int(round(position))) - 1
+    return CTR_BY_POSITION[min(i, len(CTR_BY_POSITION) - 1)]
+
+
+def opportunity(impressions, position):
+    """Extra clicks at TARGET_POSITION for a query seen `impressions` times at `position`."""
+    if not impressions:
+        return 0.0
+    return impressions * max(0.0, ctr(TARGET_POSITION) - ctr(position))
+
+
+# ─────────────────────────────────────────
+# IMPORT
+# ─────────────────────────────────────────
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def detect_kind(path):
+    with _open(path) as f:
+        first = f.readline().strip()
+    if first.startswith("{") or CLF_RE.match(first):
+        return "log"
+    if any(name in first.lower() for name in ("impressions", "clicks")):
+        return "gsc"
+    return None
+
+
+def _number(text):
+    text = (text or "").strip().replace(",", "")
+    if text.endswith("%"):
+        return float(text[:-1]) / 100
+    return float(text) if text else 0.0
+
+
+def gsc_rows(f):
+    """(url, query, impressions, clicks, pos_sum) per CSV row, streamed."""
+    reader = csv.reader(f)
+    header = next(reader, None) or []
+    fields = [GSC_COLUMNS.get(h.strip().lower()) for h in header]
+    if "impressions" not in fields:
+        raise ValueError("no Impressions column — not a Search Console export")
+    for row in reader:
+        r = {field: value for field, value in zip(fields, row) if field}
+        url = normalize_url(r["url"]) if r.get("url") else ""
+        if url is None:
+            continue  # another property's page
+        impressions = int(_number(r.get("impressions")))
+        if "sum_top_position" in r:
+            pos_sum = _number(r["sum_top_position"]) + impressions  # bulk export is 0-based
+        else:
+            pos_sum = _number(r.get("position")) * impressions
+        yield url, (r.get("query") or "").strip().lower(), impressions, int(_number(r.get("clicks"))), pos_sum
+
+
+def log_rows(f):
+    """(url, is_bot) per successful page view, streamed."""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                e = json.loads(line)
+            except ValueError:
+                continue
+            proxy = e.get("proxy") or {}
+            path = proxy.get("path") or e.get("path") or ""
+            status = proxy.get("statusCode") or e.get("statusCode") or 200
+            agent = proxy.get("userAgent") or e.get("userAgent") or ""
+            if isinstance(agent, list):
+                agent = " ".join(agent)
+        else:
+            m = CLF_RE.match(line)
+            if not m:
+                continue
+            path, status, agent = m.group(1), m.group(2), m.group(3) or ""
+        url = normalize_url(path)
+        if url is None or int(status) >= 400:
+            continue
+        name = url.rsplit("/", 1)[1]
+        if "." in name and not name.endswith(".html"):
+            continue  # assets, feeds, robots.txt
+        yield url, bool(BOT_RE.search(agent))
+
+
+def _flush_gsc(db, agg):
+    db.executemany(
+        """INSERT INTO gsc VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (url, query) DO UPDATE SET
+             impressions = impressions + excluded.impressions,
+             clicks = clicks + excluded.clicks,
+             pos_sum = pos_sum + excluded.pos_sum""",
+        [(u, q, *v) for (u, q), v in agg.items()])
+    agg.clear()
+
+
+def _flush_hits(db, agg):
+    db.executemany(
+        """INSERT INTO hits VALUES (?, ?, ?)
+           ON CONFLICT (url) DO UPDATE SET
+             views = views + excluded.views, bot_views = bot_views + excluded.bot_views""",
+        [(u, *v) for u, v in agg.items()])
+    agg.clear()
+
+
+def import_file(db, path, kind=None):
+    """Stream one file into the store. Returns (kind, rows), rows=None if already imported."""
+    sha = snapshots.sha256_file(path)
+    if db.execute("SELECT 1 FROM imports WHERE sha256 = ?", (sha,)).fetchone():
+        return kind or detect_kind(path), None
+    kind = kind or detect_kind(path)
+    if kind is None:
+        raise ValueError("can't tell whether this is a GSC export or an access log")
+
+    rows, agg = 0, {}
+    with db, _open(path) as f:
+        if kind == "gsc":
+            for url, query, impressions, clicks, pos_sum in gsc_rows(f):
+                v = agg.setdefault((url, query), [0, 0, 0.0])
+                v[0] += impressions; v[1] += clicks; v[2] += pos_sum
+                rows += 1
+                if len(agg) >= BATCH:
+                    _flush_gsc(db, agg)
+            _flush_gsc(db, agg)
+        else:
+            for url, bot in log_rows(f):
+                v = agg.setdefault(url, [0, 0])
+                v[1 if bot else 0] += 1
+                rows += 1
+                if len(agg) >= BATCH:
+                    _flush_hits(db, agg)
+            _flush_hits(db, agg)
+        db.execute("INSERT INTO imports VALUES (?, ?, ?, ?, ?)",
+                   (sha, os.path.basename(path), kind, rows, datetime.now().isoformat(timespec="seconds")))
+    return kind, rows
+
+
+def clear(db, kind):
+    with db:
+        db.execute("DELETE FROM gsc" if kind == "gsc" else "DELETE FROM hits")
+        db.execute("DELETE FROM imports WHERE kind = ?", (kind,))
+
+
+# ─────────────────────────────────────────
+# QUERIES
+# ─────────────────────────────────────────
+def page_scores(db):
+    """
+    {url: {"impressions", "clicks", "position", "opportunity", "views"}}.
+    Per-query rows are scored individually; a page with only a Pages.csv
+    row ("" query) is scored from that row.
+    """
+    out = {}
+    rows = db.execute(
+        """SELECT url, query, impressions, clicks, pos_sum FROM gsc g
+           WHERE url != '' AND (query != '' OR NOT EXISTS
+               (SELECT 1 FROM gsc q WHERE q.url = g.url AND q.query != ''))""")
+    for url, query, impressions, clicks, pos_sum in rows:
+        s = out.setdefault(url, {"impressions": 0, "clicks": 0, "pos_sum": 0.0,
+                                 "opportunity": 0.0, "views": 0})
+        s["impressions"] += impressions
+        s["clicks"] += clicks
+        s["pos_sum"] += pos_sum
+        s["opportunity"] += opportunity(impressions, pos_sum / impressions if impressions else 0)
+    for url, views in db.execute("SELECT url, views FROM hits"):
+        out.setdefault(url, {"impressions": 0, "clicks": 0, "pos_sum": 0.0,
+                             "opportunity": 0.0, "views": 0})["views"] = views
+    for s in out.values():
+        s["position"] = s.pop("pos_sum") / s["impressions"] if s["impressions"] else 0.0
+    return out
+
+
+def query_stats(db, url=None):
+    """[(query, impressions, clicks, position, opportunity)] best first, summed over pages."""
+    where, params = ("WHERE query != '' AND url = ?", (url,)) if url else ("WHERE query != ''", ())
+    rows = db.execute(f"""SELECT query, SUM(impressions), SUM(clicks), SUM(pos_sum), MIN(url)
+                          FROM gsc {where} GROUP BY query""", params)
+    out = []
+    for query, impressions, clicks, pos_sum, _ in rows:
+        position = pos_sum / impressions if impressions else 0.0
+        out.append((query, impressions, clicks, position, opportunity(impressions, position)))
+    out.sort(key=lambda r: (-r[4], -r[1], r[0]))
+    return out
+
+
+def best_positions(db):
+    """{query: (best position across pages, url)} for pages that rank for it."""
+    best = {}
+    for query, url, impressions, pos_sum in db.execute(
+            "SELECT query, url, impressions, pos_sum FROM gsc WHERE query != '' AND url != '' AND impressions > 0"):
+        position = pos_sum / impressions
+        if query not in best or position < best[query][0]:
+            best[query] = (position, url)
+    return best
+
+
+def words(text):
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOP_WORDS}
+
+
+def keyword_score(keyword, queries):
+    """Opportunity of every query whose words the keyword (mostly) covers."""
+    kw = words(keyword)
+    total = 0.0
+    for query, _, _, _, opp in queries:
+        qw = words(query)
+        if qw and len(qw & kw) >= MATCH_SHARE * len(qw):
+            total += opp
+    return total
+
+
+# ─────────────────────────────────────────
+# TODO LISTS (used by generate_articles.py and rewrite_site.py)
+# ─────────────────────────────────────────
+def order_articles(articles, db=None):
+    """ARTICLES entries by keyword opportunity, plan order kept for ties."""
+    db = db or connect()
+    queries = query_stats(db)
+    pages = page_scores(db)
+    def score(a):
+        own = pages.get(f"/pages/{a['slug']}.html", {}).get("opportunity", 0.0)
+        return own + keyword_score(a["keyword"], queries)
+    scored = [(score(a), i, a) for i, a in enumerate(articles)]
+    return [a for _, _, a in sorted(scored, key=lambda t: (-t[0], t[1]))]
+
+
+def order_pages(pages_plan, db=None):
+    """rewrite_site PAGES entries by their page's opportunity, list order kept for ties."""
+    db = db or connect()
+    pages = page_scores(db)
+    scored = [(pages.get("/" + p["file"], {}).get("opportunity", 0.0), i, p)
+              for i, p in enumerate(pages_plan)]
+    return [p for _, _, p in sorted(scored, key=lambda t: (-t[0], t[1]))]
+
+
+def _is_question(query):
+    return query.split(" ", 1)[0] in ("what", "why", "how", "is", "are", "can", "should",
+                                      "do", "does", "when", "where", "which", "will")
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def gap_articles(known_keywords, db=None, limit=20):
+    """
+    ARTICLES-shaped entries for queries with real demand but no page
+    ranking in the top GAP_POSITION, skipping ones a planned keyword covers.
+    """
+    db = db or connect()
+    best = best_positions(db)
+    out = []
+    known = [words(k) for k in known_keywords]
+    for query, impressions, _, _, _ in query_stats(db):
+        if impressions < MIN_IMPRESSIONS or best.get(query, (GAP_POSITION + 1, None))[0] <= GAP_POSITION:
+            continue
+        qw = words(query)
+        if not qw or any(len(qw & kw) >= MATCH_SHARE * len(qw) for kw in known):
+            continue
+        title = query[0].upper() + query[1:] + ("?" if _is_question(query) else "")
+        ranking = best.get(query, (None, None))[1]
+        links = [(ranking, "related guide")] if ranking else []
+        out.append({
+            "slug": slugify(query)[:70].rstrip("-"),
+            "title": title,
+            "keyword": query,
+            "intent": f"Searchers asking \"{query}\" ({impressions} impressions, no page in the top "
+                      f"{GAP_POSITION}). Answer the question directly, then explain causes and fixes.",
+            "internal_links": links + [("/pages/when-to-call-a-professional.html", "when to call a professional")],
+            "word_count": 1500,
+            "schema_type": "FAQPage",
+        })
+        known.append(qw)
+        if len(out) >= limit:
+            break
+    return out
+
+
+def rewrite_candidates(planned_files, db=None, limit=20, root="."):
+    """
+    rewrite_site PAGES-shaped entries for existing pages with opportunity
+    that PAGES doesn't list: keyword = top query, AEO questions = its
+    question-shaped queries.
+    """
+    from radon_states import STATE_PAGE_RE
+    from hubs import TOPIC_PAGE_RE
+    db = db or connect()
+    planned = {"/" + f for f in planned_files}
+    out = []
+    ranked = sorted(page_scores(db).items(), key=lambda kv: (-kv[1]["opportunity"], kv[0]))
+    for url, s in ranked:
+        if url in planned or s["opportunity"] <= 0 or s["impressions"] < MIN_IMPRESSIONS:
+            continue
+        path = url.lstrip("/")
+        if not path.endswith(".html") or not os.path.isfile(os.path.join(root, path)):
+            continue
+        if STATE_PAGE_RE.match(path) or TOPIC_PAGE_RE.match(path):
+            continue  # rendered by radon_states.py / hubs.py; a rewrite would be overwritten
+        queries = query_stats(db, url)
+        if not queries:
+            continue
+        questions = [q[0] + "?" for q in queries if _is_question(q[0])][:3]
+        out.append({
+            "file": path,
+            "keyword": queries[0][0],
+            "add_links": [("/pages/index.html", "all house noise guides")],
+            "aeo_questions": [q[0].upper() + q[1:] for q in questions],
+            "schema": "FAQPage",
+        })
+        if len(out) >= limit:
+            break
+    return out
+
+
+# ─────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import GSC exports and access logs; rank opportunities.")
+    parser.add_argument("--db", default=DB_FILE, help=f"store (default {DB_FILE})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--kind", choices=["gsc", "log"], help="skip auto-detection")
+    p.add_argument("--replace", action="store_true", help="clear this kind of data before importing")
+    p = sub.add_parser("top"); p.add_argument("-n", type=int, default=20)
+    p = sub.add_parser("queries"); p.add_argument("url"); p.add_argument("-n", type=int, default=20)
+    p = sub.add_parser("gaps"); p.add_argument("-n", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("index.html"):
+        print("❌ Run from site root (index.html not found)")
+        return 1
+    if args.cmd != "import" and not exists(args.db):
+        print("❌ No data yet — run: python3 traffic.py import <GSC export or access log>")
+        return 1
+    db = connect(args.db)
+    try:
+        return COMMANDS[args.cmd](db, args)
+    finally:
+        db.close()
+
+
+def cmd_import(db, args):
+    cleared = set()
+    for path in args.files:
+        try:
+            kind = args.kind or detect_kind(path)
+            if args.replace and kind and kind not in cleared:
+                clear(db, kind)
+                cleared.add(kind)
+            kind, rows = import_file(db, path, kind)
+        except (OSError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            return 1
+        if rows is None:
+            print(f"⏭️  {path}: already imported")
+        else:
+            print(f"✅ {path}: {rows:,} {kind} rows")
+    n_gsc = db.execute("SELECT COUNT(*) FROM gsc").fetchone()[0]
+    n_hits = db.execute("SELECT COUNT(*) FROM hits").fetchone()[0]
+    print(f"   Store: {n_gsc:,} page×query rows, {n_hits:,} pages with views → {args.db}")
+    return 0
+
+
+def cmd_top(db, args):
+    ranked = sorted(page_scores(db).items(), key=lambda kv: (-kv[1]["opportunity"], -kv[1]["views"], kv[0]))
+    print(f"{'Opportunity':>11} {'Impr':>8} {'Clicks':>7} {'Pos':>5} {'Views':>7}  Page")
+    for url, s in ranked[:args.n]:
+        print(f"{s['opportunity']:>11.1f} {s['impressions']:>8,} {s['clicks']:>7,} "
+              f"{s['position']:>5.1f} {s['views']:>7,}  {url}")
+    return 0
+
+
+def cmd_queries(db, args):
+    url = normalize_url(args.url) or args.url
+    print(f"{'Opportunity':>11} {'Impr':>8} {'Clicks':>7} {'Pos':>5}  Query ({url})")
+    for query, impressions, clicks, position, opp in query_stats(db, url)[:args.n]:
+        print(f"{opp:>11.1f} {impressions:>8,} {clicks:>7,} {position:>5.1f}  {query}")
+    return 0
+
+
+def cmd_gaps(db, args):
+    gaps = gap_articles([], db, limit=args.n)
+    if not gaps:
+        print(f"✅ Every query with {MIN_IMPRESSIONS}+ impressions has a page in the top {GAP_POSITION}")
+        return 0
+    print(f"🕳️  Queries with no page in the top {GAP_POSITION} (generate_articles.py --fill adds these):")
+    for a in gaps:
+        print(f"   {a['keyword']:<60} → pages/{a['slug']}.html")
+    return 0
+
+
+COMMANDS = {"import": cmd_import, "top": cmd_top, "queries": cmd_queries, "gaps": cmd_gaps}
+
+
+if __name__ == "__main__":
+    sys.exit(main())